@@ -0,0 +1,189 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Расширения входных файлов, которые берутся из переданных каталогов
+INPUT_EXTENSIONS = ('.txt', '.fig')
+
+# Расширение файла раскладки для каждого формата layout_io
+OUTPUT_EXTENSIONS = {'json': '.json', 'jsonl': '.jsonl', 'binary': '.lay'}
+
+
+def expand_inputs(patterns):
+    """
+    Список входных файлов по аргументам командной строки: файлы, шаблоны
+    glob (в том числе с **) и каталоги (берутся файлы INPUT_EXTENSIONS).
+    Порядок сохраняется, повторы отбрасываются.
+    """
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = sorted(os.path.join(pattern, name) for name in os.listdir(pattern)
+                             if name.lower().endswith(INPUT_EXTENSIONS))
+        else:
+            matches = sorted(glob.glob(pattern, recursive=True)) or [pattern]
+        paths.extend(path for path in matches if os.path.isfile(path) or path == pattern)
+    return list(dict.fromkeys(paths))
+
+
+def output_names(paths):
+    """Уникальное имя выходных файлов для каждого входа: имя без расширения, при совпадении — с номером."""
+    names, used = {}, set()
+    for path in paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        name, k = stem, 2
+        while name in used:
+            name, k = f"{stem}-{k}", k + 1
+        used.add(name)
+        names[path] = name
+    return names
+
+
+def run_job(path, algorithm, output_base, fmt, render_ext, params):
+    """
+    Одно задание (вход × алгоритм) в рабочем процессе: чтение, упаковка,
+    запись раскладки и, если задан render_ext, отрисовка.
+    Тяжёлые модули импортируются здесь, а не при запуске CLI.
+    """
+    from figure_io import load_input
+    from packers import get_packer
+    from metrics import layout_metrics
+    import layout_io
+
+    start = time.perf_counter()
+    sheet_w, sheet_h, padding, figure_set = load_input(path)
+    figures = list(figure_set)
+
+    pack_start = time.perf_counter()
+    placed, not_placed = get_packer(algorithm)(sheet_w, sheet_h, padding, figures, **params)
+    pack_time = time.perf_counter() - pack_start
+
+    layout_path = output_base + OUTPUT_EXTENSIONS[fmt]
+    # Растровый движок поворачивает фигуры на любой угол из ROTATIONS
+    fields = layout_io.ANGLE_FIELDS if algorithm == 'raster' else layout_io.DEFAULT_FIELDS
+    with layout_io.LayoutWriter(layout_path, fmt, fields) as writer:
+        writer.write_many(placed)
+    render_path = None
+    if render_ext:
+        from render import render
+        render_path = output_base + render_ext
+        render(sheet_w, sheet_h, placed, padding, render_path)
+
+    return {
+        'input': path,
+        'algorithm': algorithm,
+        'placed': len(placed),
+        'total': len(figures),
+        'not_placed': [f.id for f in not_placed],
+        'percent': layout_metrics(sheet_w, sheet_h, figure_set.take(
+            [f.index for f in placed]))['percent'],
+        'pack_time': pack_time,
+        'time': time.perf_counter() - start,
+        'layout': layout_path,
+        'render': render_path,
+    }
+
+
+def run_batch(paths, algorithms, out_dir='batch_output', fmt='json', render_ext=None,
+              workers=None, params=None, on_result=None):
+    """
+    Выполняет все задания (каждый вход × каждый алгоритм) в пуле процессов.
+    Выходные файлы: out_dir/<имя входа>.<алгоритм>.<расширение>.
+    on_result(result) вызывается по мере завершения заданий.
+    Возвращает (results, summary): results — в порядке завершения,
+    у неудачных заданий есть ключ error.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    names = output_names(paths)
+    jobs = [(path, algorithm, os.path.join(out_dir, f"{names[path]}.{algorithm}"))
+            for path in paths for algorithm in algorithms]
+
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(workers) as executor:
+        futures = {executor.submit(run_job, path, algorithm, base, fmt, render_ext, params or {}):
+                   (path, algorithm) for path, algorithm, base in jobs}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                path, algorithm = futures[future]
+                result = {'input': path, 'algorithm': algorithm, 'error': f"{type(e).__name__}: {e}"}
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+    wall = time.perf_counter() - start
+
+    done = [r for r in results if 'error' not in r]
+    summary = {
+        'jobs': len(results),
+        'failed': len(results) - len(done),
+        'wall_time': wall,
+        'jobs_per_second': len(results) / wall if wall > 0 else 0.0,
+        'job_time_total': sum(r['time'] for r in done),
+        'job_time_max': max((r['time'] for r in done), default=0.0),
+    }
+    return results, summary
+
+
+def _print_result(r):
+    if 'error' in r:
+        print(f"❌ {r['input']} [{r['algorithm']}]: {r['error']}")
+    else:
+        print(f"✔️ {r['input']} [{r['algorithm']}]: {r['placed']}/{r['total']}, "
+              f"{r['percent']:.2f}%, упаковка {r['pack_time']:.4f} с, всего {r['time']:.4f} с "
+              f"→ {r['layout']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Пакетная упаковка входных файлов")
+    parser.add_argument('inputs', nargs='+', help="файлы, шаблоны glob или каталоги")
+    parser.add_argument('-a', '--algorithms', nargs='+', default=['maxrects'],
+                        help="упаковщики из packers.PACKERS")
+    parser.add_argument('-o', '--out-dir', default='batch_output')
+    parser.add_argument('-f', '--format', choices=list(OUTPUT_EXTENSIONS), default='json')
+    parser.add_argument('-r', '--render', choices=('png', 'svg'),
+                        help="сохранить изображение раскладки")
+    parser.add_argument('-j', '--workers', type=int)
+    parser.add_argument('--summary', help="сохранить итоги в JSON")
+    args = parser.parse_args(argv)
+
+    paths = expand_inputs(args.inputs)
+    missing = [path for path in paths if not os.path.isfile(path)]
+    if missing or not paths:
+        print(f"Файлы не найдены: {', '.join(missing or args.inputs)}. Завершение.")
+        return 1
+
+    # Проверка имён — после разбора аргументов: --help не импортирует упаковщики
+    from packers import get_packer
+    try:
+        for algorithm in args.algorithms:
+            get_packer(algorithm)
+    except ValueError as e:
+        print(f"❗️ {e}")
+        return 2
+
+    render_ext = f".{args.render}" if args.render else None
+    results, summary = run_batch(paths, args.algorithms, args.out_dir, args.format, render_ext,
+                                 args.workers, on_result=_print_result)
+
+    print(f"\n📊 Заданий: {summary['jobs']} (ошибок: {summary['failed']}), "
+          f"время: {summary['wall_time']:.2f} с, "
+          f"пропускная способность: {summary['jobs_per_second']:.2f} заданий/с")
+    slowest = sorted((r for r in results if 'error' not in r), key=lambda r: r['time'], reverse=True)
+    for r in slowest[:5]:
+        print(f"⏱ {r['time']:.4f} с — {r['input']} [{r['algorithm']}]")
+
+    if args.summary:
+        with open(args.summary, 'w', encoding='utf-8') as f:
+            json.dump({'summary': summary, 'jobs': results}, f, indent=2, ensure_ascii=False)
+        print(f"✅ Итоги сохранены в '{args.summary}'.")
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+import argparse
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+import numpy as np
+from utils import Figure
+from figure_set import FigureSet
+from packers import PACKERS
+from metrics import shape_areas, layout_metrics
+
+KINDS = ('rectangle', 'circle', 'triangle', 'polygon', 'mixed')
+DISTRIBUTIONS = ('uniform', 'normal', 'lognormal', 'bimodal')
+DEFAULT_COUNTS = (10, 100, 1000, 10000, 100000)
+
+
+def _sizes(rng, count, distribution, min_size, max_size):
+    """Характерные размеры фигур по выбранному распределению."""
+    mid = (min_size + max_size) / 2
+    if distribution == 'uniform':
+        sizes = rng.uniform(min_size, max_size, count)
+    elif distribution == 'normal':
+        sizes = rng.normal(mid, (max_size - min_size) / 6, count)
+    elif distribution == 'lognormal':
+        sizes = min_size * rng.lognormal(0.0, 0.6, count)
+    elif distribution == 'bimodal':
+        big = rng.random(count) < 0.2
+        sizes = np.where(big, rng.uniform(0.7 * max_size, max_size, count),
+                         rng.uniform(min_size, 0.3 * max_size + 0.7 * min_size, count))
+    else:
+        raise ValueError(f"Unknown distribution: {distribution}")
+    return np.clip(np.rint(sizes), min_size, max_size).astype(int)
+
+
+def _polygon(rng, size, corners):
+    """Звёздный многоугольник: вершины на окружности со случайными радиусами."""
+    angles = np.sort(rng.uniform(0, 2 * math.pi, corners))
+    radii = rng.uniform(0.5, 1.0, corners) * size / 2
+    xs = np.rint(radii * np.cos(angles)).astype(int)
+    ys = np.rint(radii * np.sin(angles)).astype(int)
+    return list(zip(xs.tolist(), ys.tolist()))
+
+
+def _degenerate(vertices):
+    """Нулевая ширина, высота или площадь (коллинеарные вершины)."""
+    xs, ys = zip(*vertices)
+    if max(xs) == min(xs) or max(ys) == min(ys):
+        return True
+    n = len(vertices)
+    twice_area = sum(xs[i] * ys[(i + 1) % n] - xs[(i + 1) % n] * ys[i] for i in range(n))
+    return twice_area == 0
+
+
+def generate_figures(kind, count, seed=0, distribution='uniform', min_size=10, max_size=100):
+    """
+    Синтетический набор фигур для бенчмарка (воспроизводимый по seed).
+    kind — 'rectangle', 'circle', 'triangle', 'polygon' или 'mixed'.
+    Размеры выбираются по распределению distribution в [min_size, max_size].
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Unknown figure kind: {kind}")
+    rng = np.random.default_rng(seed)
+    sizes = _sizes(rng, count, distribution, min_size, max_size)
+    kinds = rng.choice(KINDS[:-1], count) if kind == 'mixed' else [kind] * count
+
+    figures = []
+    for i, (k, size) in enumerate(zip(kinds, sizes.tolist()), start=1):
+        if k == 'rectangle':
+            aspect = rng.uniform(0.3, 1.0)
+            figures.append(Figure(i, k, size, max(1, int(size * aspect))))
+        elif k == 'circle':
+            figures.append(Figure(i, k, max(1, size // 2)))
+        else:
+            vertices = _polygon(rng, size, 3 if k == 'triangle' else int(rng.integers(4, 9)))
+            if _degenerate(vertices):
+                vertices = [(0, 0), (size, 0), (0, size)]
+            figures.append(Figure(i, k, vertices=vertices))
+    return figures
+
+
+def sheet_for(figures, padding, slack=1.3):
+    """Квадратный лист, площадь которого в slack раз больше суммы габаритов."""
+    area = sum((f.width + 2 * padding) * (f.height + 2 * padding) for f in figures)
+    side = max(int(math.sqrt(area * slack)) + 1,
+               max(max(f.width, f.height) for f in figures) + 2 * padding)
+    return side, side
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def measure(algorithm, sheet_w, sheet_h, padding, figure_set, repeats=3, warmup=1, **params):
+    """
+    Замеряет один алгоритм на одном наборе: warmup холостых прогонов,
+    затем repeats прогонов по времени и отдельный прогон под tracemalloc
+    (он замедляет код, поэтому в замеры времени не входит).
+    utilization — доля листа под точными площадями фигур (metrics).
+    """
+    if repeats < 1:
+        raise ValueError(f"repeats must be at least 1, got {repeats}")
+    packer = PACKERS[algorithm]
+    for _ in range(warmup):
+        packer(sheet_w, sheet_h, padding, list(figure_set.copy()), **params)
+
+    times = []
+    for _ in range(repeats):
+        figures = list(figure_set.copy())
+        start = time.perf_counter()
+        placed, not_placed = packer(sheet_w, sheet_h, padding, figures, **params)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    packer(sheet_w, sheet_h, padding, list(figure_set.copy()), **params)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    rows = [f.index for f in placed]
+    metrics = layout_metrics(sheet_w, sheet_h, figure_set.take(rows),
+                             areas=shape_areas(figure_set)[rows])
+    return {
+        'times': times,
+        'median': statistics.median(times),
+        'min': min(times),
+        'peak_bytes': peak,
+        'placed': len(placed),
+        'utilization': metrics['percent'],
+    }
+
+
+def run_benchmark(algorithms=None, kinds=('rectangle',), counts=DEFAULT_COUNTS,
+                  distribution='uniform', padding=2, repeats=3, warmup=1, seed=0,
+                  budget=30.0, history='benchmark_history.jsonl', params=None):
+    """
+    Прогоняет алгоритмы на наборах растущего размера и дописывает результаты
+    в файл истории (JSON Lines). Если медианное время алгоритма превысило
+    budget секунд, большие размеры для него пропускаются.
+    params — параметры упаковщика (например, {'heuristic': 'min_waste'}).
+    Возвращает список записей.
+    """
+    algorithms = list(algorithms or PACKERS)
+    params = params or {}
+    run = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'revision': _git_revision(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+    }
+    records = []
+    for kind in kinds:
+        exhausted = set()
+        for count in counts:
+            figures = generate_figures(kind, count, seed, distribution)
+            sheet_w, sheet_h = sheet_for(figures, padding)
+            figure_set = FigureSet.from_figures(figures)
+            for algorithm in algorithms:
+                record = dict(run, algorithm=algorithm, kind=kind, distribution=distribution,
+                              count=count, sheet_w=sheet_w, sheet_h=sheet_h, padding=padding,
+                              seed=seed, repeats=repeats, params=params)
+                if algorithm in exhausted:
+                    record['skipped'] = True
+                else:
+                    record.update(measure(algorithm, sheet_w, sheet_h, padding, figure_set,
+                                          repeats, warmup, **params))
+                    if record['median'] > budget:
+                        exhausted.add(algorithm)
+                records.append(record)
+                print(_format(record))
+
+    if history:
+        with open(history, 'a', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        print(f"✅ Результаты добавлены в '{history}'.")
+    return records
+
+
+def _format(record):
+    head = f"{record['algorithm']:<9} | {record['kind']:<9} | {record['count']:>7}"
+    if record.get('skipped'):
+        return f"{head} | пропущено (превышен бюджет времени)"
+    return (f"{head} | {record['median']:>9.4f} с | {record['peak_bytes'] / 2**20:>8.2f} МБ | "
+            f"{record['placed']:>7} | {record['utilization']:>6.2f}%")
+
+
+def scaling_report(records):
+    """
+    Показатель роста времени между соседними размерами: k в t ~ n^k.
+    Резкий скачок k показывает, где кривая алгоритма «взлетает».
+    """
+    series = {}
+    for r in records:
+        if not r.get('skipped'):
+            series.setdefault((r['algorithm'], r['kind']), []).append((r['count'], r['median']))
+
+    print("\n📈 Рост времени (t ~ n^k):")
+    for (algorithm, kind), points in series.items():
+        points.sort()
+        steps = []
+        for (n1, t1), (n2, t2) in zip(points, points[1:]):
+            if t1 > 0 and n2 > n1:
+                steps.append(f"{n1}→{n2}: k={math.log(t2 / t1) / math.log(n2 / n1):.2f}")
+        print(f"{algorithm:<9} | {kind:<9} | " + ('; '.join(steps) or '—'))
+
+
+def _param(text):
+    """Параметр упаковщика из командной строки: 'key=value'."""
+    key, sep, value = text.partition('=')
+    if not sep:
+        raise argparse.ArgumentTypeError(f"expected key=value, got {text!r}")
+    try:
+        value = json.loads(value)
+    except ValueError:
+        pass
+    return key, value
+
+
+def load_history(path='benchmark_history.jsonl'):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк алгоритмов упаковки")
+    parser.add_argument('--algorithms', nargs='+', choices=list(PACKERS), default=list(PACKERS))
+    parser.add_argument('--kinds', nargs='+', choices=KINDS, default=['rectangle'])
+    parser.add_argument('--counts', nargs='+', type=int, default=list(DEFAULT_COUNTS))
+    parser.add_argument('--distribution', choices=DISTRIBUTIONS, default='uniform')
+    parser.add_argument('--padding', type=int, default=2)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--budget', type=float, default=30.0)
+    parser.add_argument('--history', default='benchmark_history.jsonl')
+    parser.add_argument('--params', nargs='*', type=_param, default=[],
+                        help="параметры упаковщика, например heuristic=min_waste")
+    args = parser.parse_args()
+
+    records = run_benchmark(args.algorithms, args.kinds, args.counts, args.distribution,
+                            args.padding, args.repeats, args.warmup, args.seed,
+                            args.budget, args.history, dict(args.params))
+    scaling_report(records)
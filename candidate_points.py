@@ -0,0 +1,134 @@
+from bisect import bisect_left, bisect_right
+from spatial_index import SpatialIndex
+import profiling
+
+
+class CandidatePoints:
+    """
+    Генератор позиций-кандидатов для жадной упаковки (bottom-left).
+    Первая допустимая позиция в порядке перебора greedy_pack (y сверху вниз,
+    x слева направо) всегда упирается в край листа или в край уже
+    размещённой фигуры с учётом отступа:
+    - x = padding или x = pf.x + pf.width + padding;
+    - y = sheet_h - h - padding или y = pf.y - padding - h.
+    Поэтому достаточно проверять только такие точки, а их число зависит
+    от количества размещённых фигур, а не от площади листа.
+
+    Строки, в которые не помещается даже самая маленькая фигура
+    (min_size × min_size), отбрасываются навсегда: фигуры только
+    добавляются, поэтому такая строка больше не освободится.
+    """
+    def __init__(self, sheet_w, sheet_h, padding, cell_size, min_size=0):
+        self.sheet_w = sheet_w
+        self.sheet_h = sheet_h
+        self.padding = padding
+        self.min_size = min_size
+        # Индекс размещённых фигур: горизонтальные полосы на всю ширину листа
+        self.index = SpatialIndex(sheet_w + padding + 1, cell_size)
+        # Отсортированные уникальные координаты краёв по y
+        self.y_edges = [sheet_h - padding]
+        # Край строки -> [(высота полосы, наибольший свободный промежуток)]
+        self.max_gap = {}
+
+    def add(self, f):
+        """Добавляет размещённую фигуру и её края."""
+        self.index.insert_figure(f, self.padding)
+
+        edge = f.y - self.padding
+        i = bisect_left(self.y_edges, edge)
+        if i == len(self.y_edges) or self.y_edges[i] != edge:
+            self.y_edges.insert(i, edge)
+
+    def blockers(self, y, h):
+        """Расширенные габариты фигур, пересекающие полосу [y, y + h)."""
+        boxes = self.index.boxes
+        return [boxes[key] for key in self.index.query(0, y, self.sheet_w, y + h)]
+
+    def row_gaps(self, y, h):
+        """
+        Свободные промежутки в полосе [y, y + h): список (x, ширина).
+        Фигура в полосе запрещает окну пересекать [x0, x1), поэтому
+        промежутки начинаются в x = padding или x = x1 (правые края фигур
+        с отступом) — это и есть кандидаты по x.
+        """
+        p = self.padding
+        right = self.sheet_w - p
+        gaps = []
+        x = p
+        for x0, _, x1, _ in sorted(self.blockers(y, h)):
+            if x0 > x:
+                gaps.append((x, min(x0, right) - x))
+            if x1 > x:
+                x = x1
+                if x >= right:
+                    break
+        if x < right:
+            gaps.append((x, right - x))
+        return gaps
+
+    def first_in_row(self, y, w, h):
+        """Наименьший допустимый x для окна w×h в строке y или None."""
+        for x, gap in self.row_gaps(y, h):
+            if gap >= w:
+                return x
+        return None
+
+    def _known_full(self, edge, w, h):
+        """Известно ли, что окно w×h не помещается в строку с краем edge."""
+        for hc, gap in self.max_gap.get(edge, ()):
+            if hc <= h and gap < w:
+                return True
+        return False
+
+    def _remember(self, edge, h, gap):
+        entries = [(hc, g) for hc, g in self.max_gap.get(edge, ()) if hc < h or g < gap]
+        entries.append((h, gap))
+        self.max_gap[edge] = entries
+
+    def _row_max_gap(self, edge, h):
+        gap = max((g for _, g in self.row_gaps(edge - h, h)), default=0)
+        self._remember(edge, h, gap)
+        return gap
+
+    def find_first(self, w, h):
+        """
+        Первая допустимая позиция (x, y) среди кандидатов или None.
+        Строки перебираются по убыванию y. Для каждой проверенной строки
+        запоминается наибольший свободный промежуток: фигуры только
+        добавляются, поэтому эта оценка сверху остаётся верной, и строка
+        пропускается без запроса к индексу, пока в неё ничего не влезет.
+        """
+        p = self.padding
+        m = self.min_size
+        if w + 2 * p > self.sheet_w:
+            return None
+
+        edges = self.y_edges
+        lo = bisect_left(edges, p + h)
+        hi = bisect_right(edges, self.sheet_h - p)
+        queries = removed = 0
+        try:
+            for i in range(hi - 1, lo - 1, -1):
+                edge = edges[i]
+                if self._known_full(edge, w, h):
+                    continue
+                queries += 1
+                gaps = self.row_gaps(edge - h, h)
+                for x, gap in gaps:
+                    if gap >= w:
+                        return x, edge - h
+                gap = max((g for _, g in gaps), default=0)
+                self._remember(edge, h, gap)
+                if gap < m and (
+                        edge - m < p or self._row_max_gap(edge, m) < m):
+                    # Строка не вместит даже самую маленькую фигуру
+                    del edges[i]
+                    self.max_gap.pop(edge, None)
+                    removed += 1
+            return None
+        finally:
+            rec = profiling.current
+            if rec is not None:
+                rec.count('candidates.rows', hi - lo)
+                rec.count('candidates.row_queries', queries)
+                rec.count('candidates.rows_removed', removed)
@@ -2,80 +2,97 @@ import os
 import sys
 import json
 import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from utils import read_input
-from shelf_packer import shelf_pack, calculate_area_stats as shelf_stats
-from greedy_packer import greedy_pack, calculate_area_stats as greedy_stats
-from maximal_rectangles_packer import maximal_rectangles_packer, calculate_area_stats as maxrects_stats
+from packers import PACKERS
 from visualize import visualize
-from copy import deepcopy
+from figure_set import FigureSet
+from profiling import Recorder, format_counters
+from metrics import shape_areas, layout_metrics
 
+# Отображаемое имя алгоритма -> имя в packers.PACKERS
+ALGORITHMS = {
+    'Shelf': 'shelf',
+    'Greedy': 'greedy',
+    'MaxRects': 'maxrects',
+    'Skyline': 'skyline',
+}
 
-def compare_algorithms(input_file):
+# Набор фигур рабочего процесса: передаётся один раз при запуске процесса
+_figure_set = None
+
+
+def _init_worker(figure_set):
+    global _figure_set
+    _figure_set = figure_set
+
+
+def _run_algorithm(algorithm, sheet_w, sheet_h, padding):
+    """
+    Запускает один алгоритм в рабочем процессе на копии набора фигур.
+    Время замеряется только вокруг упаковки. Возвращает порядок размещённых
+    и неразмещённых строк, итоговые столбцы, время и счётчики профиля.
+    """
+    run = _figure_set.copy()
+    figures = list(run)
+    with Recorder() as recorder, recorder.phase('pack'):
+        start_time = time.perf_counter()
+        placed, not_placed = PACKERS[algorithm](sheet_w, sheet_h, padding, figures)
+        elapsed = time.perf_counter() - start_time
+
+    order = np.array([f.index for f in placed], dtype=np.int64)
+    rest = np.array([f.index for f in not_placed], dtype=np.int64)
+    return (order, rest, run.x, run.y, run.width, run.height, run.rotated, elapsed,
+            recorder.to_dict())
+
+
+def compare_algorithms(input_file, workers=None, free_space=False):
+    """
+    Сравнивает алгоритмы ALGORITHMS на одном входном файле.
+    free_space=True добавляет наибольшее свободное окно и фрагментацию
+    (долго на тысячах деталей; в консоли — флаг --free-space).
+    """
     # Чтение входных данных
     if not os.path.exists(input_file):
         print(f"Файл '{input_file}' не найден. Завершение.")
         sys.exit(1)
 
-    sheet_w, sheet_h, padding, figures = read_input(input_file)
+    recorder = Recorder()
+    with recorder:
+        sheet_w, sheet_h, padding, figures = read_input(input_file)
+    figure_set = FigureSet.from_figures(figures)
     total_count = len(figures)
-    total_area = sheet_w * sheet_h
 
     # Словарь для хранения результатов
-    results = {
-        'Shelf': {'placed': None, 'not_placed': None, 'used_area': 0, 'percent': 0, 'time': 0},
-        'Greedy': {'placed': None, 'not_placed': None, 'used_area': 0, 'percent': 0, 'time': 0},
-        'MaxRects': {'placed': None, 'not_placed': None, 'used_area': 0, 'percent': 0, 'time': 0}
-    }
-
-    # Запуск Shelf Algorithm
-    figures_copy = deepcopy(figures)
-    start_time = time.perf_counter()
-    placed, not_placed = shelf_pack(sheet_w, sheet_h, padding, figures_copy)
-    results['Shelf']['time'] = time.perf_counter() - start_time
-    results['Shelf']['placed'] = placed
-    results['Shelf']['not_placed'] = not_placed
-    visualize(sheet_w, sheet_h, placed, padding, output_file='layout_shelf.png')
-
-    # Запуск Greedy Placement
-    figures_copy = deepcopy(figures)
-    start_time = time.perf_counter()
-    placed, not_placed = greedy_pack(sheet_w, sheet_h, padding, figures_copy)
-    results['Greedy']['time'] = time.perf_counter() - start_time
-    results['Greedy']['placed'] = placed
-    results['Greedy']['not_placed'] = not_placed
-    visualize(sheet_w, sheet_h, placed, padding, output_file='layout_greedy.png')
-
-    # Запуск Maximal Rectangles
-    figures_copy = deepcopy(figures)
-    start_time = time.perf_counter()
-    placed, not_placed = maximal_rectangles_packer(sheet_w, sheet_h, padding, figures_copy)
-    results['MaxRects']['time'] = time.perf_counter() - start_time
-    results['MaxRects']['placed'] = placed
-    results['MaxRects']['not_placed'] = not_placed
-    visualize(sheet_w, sheet_h, placed, padding, output_file='layout_maxrects.png')
-
-    # Сбор статистики
-    for algo in results:
-        placed = results[algo]['placed']
-        not_placed = results[algo]['not_placed']
-        used_area = 0
-        for f in placed:
-            pad = padding * 2
-            if f.type == 'rectangle':
-                used_area += (f.width + pad) * (f.height + pad)
-            elif f.type == 'circle':
-                used_area += 3.14159 * (f.radius + padding) ** 2
-            elif f.type in ('triangle', 'polygon'):
-                verts = f.vertices
-                area = 0
-                n = len(verts)
-                for i in range(n):
-                    x1, y1 = verts[i]
-                    x2, y2 = verts[(i + 1) % n]
-                    area += x1 * y2 - x2 * y1
-                used_area += abs(area) / 2 + pad * max(f.width, f.height)
-        results[algo]['used_area'] = used_area
-        results[algo]['percent'] = (used_area / total_area * 100) if total_area > 0 else 0
+    results = {algo: {'placed': None, 'not_placed': None, 'metrics': None, 'time': 0,
+                      'profile': None}
+               for algo in ALGORITHMS}
+
+    # Все алгоритмы запускаются одновременно, каждый в своём процессе;
+    # набор фигур передаётся в процесс один раз в компактном виде
+    with ProcessPoolExecutor(max_workers=workers or len(ALGORITHMS), initializer=_init_worker,
+                             initargs=(figure_set,)) as executor:
+        futures = {algo: executor.submit(_run_algorithm, name, sheet_w, sheet_h, padding)
+                   for algo, name in ALGORITHMS.items()}
+        for algo, future in futures.items():
+            order, rest, x, y, width, height, rotated, elapsed, profile = future.result()
+            run = figure_set.copy()
+            run.set_placement(np.arange(len(run)), x, y, width, height, rotated)
+            results[algo]['time'] = elapsed
+            results[algo]['profile'] = profile
+            results[algo]['placed'] = [run[i] for i in order]
+            results[algo]['not_placed'] = [run[i] for i in rest]
+            results[algo]['rows'] = (run, order)
+
+    # Сбор статистики: площади фигур считаются один раз на набор
+    with recorder.phase('stats'):
+        areas = shape_areas(figure_set)
+        for algo in results:
+            run, order = results[algo].pop('rows')
+            results[algo]['metrics'] = layout_metrics(sheet_w, sheet_h, run.take(order),
+                                                      areas=areas[order], padding=padding,
+                                                      free_space=free_space)
 
     # Вывод сравнения в консоль
     print("\n📊 Сравнение алгоритмов упаковки:")
@@ -85,7 +102,8 @@ def compare_algorithms(input_file):
     comparison_data = []
     for algo in results:
         placed_count = len(results[algo]['placed'])
-        percent = results[algo]['percent']
+        metrics = results[algo]['metrics']
+        percent = metrics['percent']
         time_taken = results[algo]['time']
         not_placed_ids = [f.id for f in results[algo]['not_placed']]
         print(f"{algo:<12} | {placed_count:<10} | {percent:<12.2f} | {time_taken:<10.4f} | {not_placed_ids}")
@@ -93,17 +111,34 @@ def compare_algorithms(input_file):
             'Algorithm': algo,
             'Placed': placed_count,
             'Percent': percent,
+            'EnvelopeWaste': metrics['envelope_waste'],
+            'LargestFree': metrics.get('largest_free_area'),
+            'Fragmentation': metrics.get('fragmentation'),
             'Time': time_taken,
-            'NotPlacedIDs': not_placed_ids
+            'NotPlacedIDs': not_placed_ids,
+            'Profile': results[algo]['profile'],
         })
 
+    # Счётчики горячих участков рядом со временем упаковки
+    print("\n🔬 Счётчики алгоритмов:")
+    for algo in results:
+        profile = results[algo]['profile']
+        phases = ', '.join(f"{name}={value:.4f} с" for name, value in sorted(profile['phases'].items()))
+        print(f"{algo:<12} | {results[algo]['time']:<10.4f} | {phases} | {format_counters(profile)}")
+
     # Сохранение результатов в JSON
     with open('comparison_results.json', 'w', encoding='utf-8') as f:
         json.dump(comparison_data, f, indent=2, ensure_ascii=False)
     print(f"\n✅ Результаты сравнения сохранены в 'comparison_results.json'.")
-    print("📈 Визуализации сохранены как 'layout_shelf.png', 'layout_greedy.png', 'layout_maxrects.png'.")
+
+    # Отрисовка — после замеров, вне измеряемой части
+    with recorder:
+        for algo, name in ALGORITHMS.items():
+            visualize(sheet_w, sheet_h, results[algo]['placed'], padding, output_file=f'layout_{name}.png')
+    print("📈 Визуализации сохранены как 'layout_shelf.png', 'layout_greedy.png', 'layout_maxrects.png', 'layout_skyline.png'.")
+    print("⏱ Фазы: " + ', '.join(f"{name}={value:.4f} с" for name, value in recorder.phases.items()))
 
 
 if __name__ == "__main__":
     input_file = input("Введите имя входного файла (например, input.txt): ").strip()
-    compare_algorithms(input_file)
\ No newline at end of file
+    compare_algorithms(input_file, free_space='--free-space' in sys.argv)
\ No newline at end of file
@@ -0,0 +1,213 @@
+import struct
+import sys
+import numpy as np
+from figure_set import FigureSet, TYPE_CODES
+from utils import open_input
+
+# Двоичный столбцовый формат входных данных:
+#   заголовок  — MAGIC, sheet_w, sheet_h, padding, число фигур n, число вершин m;
+#   столбцы    — ids, width, height, radius (int64[n]), offsets (int64[n + 1]),
+#                vertices (int64[m × 2]), types (int8[n]).
+# Все столбцы int64 лежат по границе 8 байт, поэтому файл открывается через
+# np.memmap без копирования: фигура читается прямо со страниц файла.
+MAGIC = b'FIGCOL1\0'
+HEADER = struct.Struct('<8sqqqqq')
+
+# Сколько строк текстового файла разбирается за один пакет
+BATCH_SIZE = 65536
+
+
+def _layout(count, vertex_count):
+    """Смещение, dtype и форма каждого столбца в файле."""
+    columns = [('ids', np.int64, (count,)), ('width', np.int64, (count,)),
+               ('height', np.int64, (count,)), ('radius', np.int64, (count,)),
+               ('offsets', np.int64, (count + 1,)), ('vertices', np.int64, (vertex_count, 2)),
+               ('types', np.int8, (count,))]
+    offset = HEADER.size
+    layout = {}
+    for name, dtype, shape in columns:
+        layout[name] = (offset, dtype, shape)
+        offset += int(np.prod(shape)) * np.dtype(dtype).itemsize
+    return layout, offset
+
+
+def _map_columns(path, count, vertex_count, mode):
+    layout, _ = _layout(count, vertex_count)
+    columns = {}
+    for name, (offset, dtype, shape) in layout.items():
+        if 0 in shape:
+            columns[name] = np.zeros(shape, dtype=dtype)
+        else:
+            columns[name] = np.memmap(path, dtype=dtype, mode=mode, offset=offset, shape=shape)
+    return columns
+
+
+def _allocate(path, sheet_w, sheet_h, padding, count, vertex_count):
+    """Создаёт файл нужного размера с заголовком и открывает столбцы на запись."""
+    _, size = _layout(count, vertex_count)
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, sheet_w, sheet_h, padding, count, vertex_count))
+        f.truncate(size)
+    return _map_columns(path, count, vertex_count, 'r+')
+
+
+def _parse_batch(lines):
+    """
+    Разбирает пакет строк сразу в столбцы, без создания объектов Figure.
+    Многоугольники нормализуются так же, как в Figure: вершины сдвигаются
+    к (0, 0), габариты считаются по вершинам.
+    """
+    n = len(lines)
+    ids = np.empty(n, dtype=np.int64)
+    types = np.empty(n, dtype=np.int8)
+    width = np.empty(n, dtype=np.int64)
+    height = np.empty(n, dtype=np.int64)
+    radius = np.zeros(n, dtype=np.int64)
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    vertices = []
+
+    for i, line in enumerate(lines):
+        parts = line.split()
+        fig_id = int(parts[0])
+        fig_type = parts[1].lower()
+        ids[i] = fig_id
+
+        if fig_type == 'rectangle':
+            width[i], height[i] = int(parts[2]), int(parts[3])
+
+        elif fig_type == 'circle':
+            radius[i] = int(parts[2])
+            width[i] = height[i] = 2 * radius[i]
+
+        elif fig_type in ('triangle', 'polygon'):
+            coords = list(map(int, parts[2:]))
+            if len(coords) < 6 or len(coords) % 2 != 0:
+                raise ValueError(f"Invalid number of coordinates for {fig_type} ID {fig_id}")
+            xs, ys = coords[0::2], coords[1::2]
+            min_x, min_y = min(xs), min(ys)
+            width[i], height[i] = max(xs) - min_x, max(ys) - min_y
+            vertices.extend((x - min_x, y - min_y) for x, y in zip(xs, ys))
+
+        else:
+            raise ValueError(f"Unsupported figure type: {fig_type}")
+
+        types[i] = TYPE_CODES[fig_type]
+        offsets[i + 1] = len(vertices)
+
+    return FigureSet(ids, types, width, height, radius, vertices=vertices, offsets=offsets)
+
+
+def _chunks(lines, batch_size):
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _batches(lines, batch_size):
+    try:
+        for chunk in _chunks(lines, batch_size):
+            yield _parse_batch(chunk)
+    finally:
+        lines.close()
+
+
+def iter_batches(file_path, batch_size=BATCH_SIZE):
+    """
+    Потоковое чтение текстового входного файла пакетами.
+    Возвращает (sheet_w, sheet_h, padding, генератор FigureSet по batch_size фигур).
+    Файл закрывается, когда генератор исчерпан, при ошибке разбора строки
+    и при close() генератора (код, прервавший перебор, закрывает его сам).
+    """
+    sheet_w, sheet_h, padding, lines = open_input(file_path)
+    return sheet_w, sheet_h, padding, _batches(lines, batch_size)
+
+
+def write_binary(path, sheet_w, sheet_h, padding, figure_set):
+    """Сохраняет набор фигур в двоичном столбцовом формате."""
+    columns = _allocate(path, sheet_w, sheet_h, padding, len(figure_set), len(figure_set.vertices))
+    for name, column in columns.items():
+        column[...] = getattr(figure_set, name)
+        if isinstance(column, np.memmap):
+            column.flush()
+    return path
+
+
+def read_binary(path, mode='c'):
+    """
+    Открывает двоичный файл через np.memmap, без копирования данных.
+    По умолчанию mode='c' (copy-on-write): упаковщики могут менять
+    width/height при повороте, но файл на диске остаётся прежним.
+    Возвращает (sheet_w, sheet_h, padding, FigureSet).
+    """
+    with open(path, 'rb') as f:
+        magic, sheet_w, sheet_h, padding, count, vertex_count = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a binary figure file")
+
+    columns = _map_columns(path, count, vertex_count, mode)
+    figure_set = FigureSet(columns['ids'], columns['types'], columns['width'], columns['height'],
+                           columns['radius'], vertices=columns['vertices'],
+                           offsets=columns['offsets'])
+    return sheet_w, sheet_h, padding, figure_set
+
+
+def is_binary(path):
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def load_input(path, batch_size=BATCH_SIZE):
+    """
+    Загружает входные данные любого формата в виде FigureSet:
+    двоичный файл открывается через memmap, текстовый читается пакетами.
+    Возвращает (sheet_w, sheet_h, padding, FigureSet).
+    """
+    if is_binary(path):
+        return read_binary(path)
+    sheet_w, sheet_h, padding, lines = open_input(path)
+    with lines:
+        batches = [_parse_batch(chunk) for chunk in _chunks(lines, batch_size)]
+    return sheet_w, sheet_h, padding, FigureSet.concatenate(batches)
+
+
+def convert(text_path, binary_path, batch_size=BATCH_SIZE):
+    """
+    Переводит текстовый входной файл в двоичный формат.
+    Два прохода: первый считает фигуры и вершины, второй пишет пакеты
+    прямо в отображённый файл — в памяти держится только один пакет.
+    Возвращает число фигур.
+    """
+    count = vertex_count = 0
+    _, _, _, batches = iter_batches(text_path, batch_size)
+    for batch in batches:
+        count += len(batch)
+        vertex_count += len(batch.vertices)
+
+    sheet_w, sheet_h, padding, batches = iter_batches(text_path, batch_size)
+    columns = _allocate(binary_path, sheet_w, sheet_h, padding, count, vertex_count)
+    row = vertex = 0
+    for batch in batches:
+        n, m = len(batch), len(batch.vertices)
+        for name in ('ids', 'types', 'width', 'height', 'radius'):
+            columns[name][row:row + n] = getattr(batch, name)
+        columns['offsets'][row + 1:row + n + 1] = batch.offsets[1:] + vertex
+        columns['vertices'][vertex:vertex + m] = batch.vertices
+        row, vertex = row + n, vertex + m
+
+    for column in columns.values():
+        if isinstance(column, np.memmap):
+            column.flush()
+    return count
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Использование: python figure_io.py input.txt input.fig")
+        sys.exit(1)
+    count = convert(sys.argv[1], sys.argv[2])
+    print(f"✅ {count} фигур записано в '{sys.argv[2]}'.")
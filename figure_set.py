@@ -0,0 +1,257 @@
+import numpy as np
+from utils import Figure, rotate_vertices
+
+# Коды типов фигур в столбце types
+TYPE_NAMES = ('rectangle', 'circle', 'triangle', 'polygon')
+TYPE_CODES = {name: code for code, name in enumerate(TYPE_NAMES)}
+
+# Значение x/y для ещё не размещённой фигуры (в Figure это None)
+NO_POS = np.iinfo(np.int64).min
+
+
+class FigureView:
+    """
+    Лёгкое представление одной фигуры из FigureSet.
+    Поддерживает те же атрибуты, что и Figure (id, type, width, height,
+    radius, vertices, x, y, rotated, angle), но хранит только ссылку на набор
+    и номер строки — все значения читаются и пишутся прямо в столбцы.
+    """
+    __slots__ = ('_set', '_i')
+
+    def __init__(self, figure_set, index):
+        self._set = figure_set
+        self._i = index
+
+    def __eq__(self, other):
+        return (isinstance(other, FigureView) and
+                self._set is other._set and self._i == other._i)
+
+    def __hash__(self):
+        return hash((id(self._set), self._i))
+
+    def __repr__(self):
+        return f"FigureView(id={self.id}, type={self.type!r}, x={self.x}, y={self.y})"
+
+    @property
+    def index(self):
+        return self._i
+
+    @property
+    def id(self):
+        return int(self._set.ids[self._i])
+
+    @property
+    def type(self):
+        return TYPE_NAMES[self._set.types[self._i]]
+
+    @property
+    def width(self):
+        return int(self._set.width[self._i])
+
+    @width.setter
+    def width(self, value):
+        self._set.width[self._i] = value
+
+    @property
+    def height(self):
+        return int(self._set.height[self._i])
+
+    @height.setter
+    def height(self, value):
+        self._set.height[self._i] = value
+
+    @property
+    def radius(self):
+        return int(self._set.radius[self._i])
+
+    @property
+    def x(self):
+        value = self._set.x[self._i]
+        return None if value == NO_POS else int(value)
+
+    @x.setter
+    def x(self, value):
+        self._set.x[self._i] = NO_POS if value is None else value
+
+    @property
+    def y(self):
+        value = self._set.y[self._i]
+        return None if value == NO_POS else int(value)
+
+    @y.setter
+    def y(self, value):
+        self._set.y[self._i] = NO_POS if value is None else value
+
+    @property
+    def rotated(self):
+        return bool(self._set.rotated[self._i])
+
+    @rotated.setter
+    def rotated(self, value):
+        self._set.rotated[self._i] = value
+        self._set.angle[self._i] = 90 if value else 0
+
+    @property
+    def angle(self):
+        return int(self._set.angle[self._i])
+
+    @angle.setter
+    def angle(self, value):
+        self._set.angle[self._i] = value
+        self._set.rotated[self._i] = value != 0
+
+    @property
+    def vertices(self):
+        start, end = self._set.offsets[self._i], self._set.offsets[self._i + 1]
+        return [tuple(v) for v in self._set.vertices[start:end].tolist()]
+
+    @vertices.setter
+    def vertices(self, value):
+        start, end = self._set.offsets[self._i], self._set.offsets[self._i + 1]
+        if len(value) != end - start:
+            raise ValueError("Vertex count of a figure in a FigureSet cannot change")
+        self._set.vertices[start:end] = value
+
+
+class FigureSet:
+    """
+    Набор фигур в виде столбцов NumPy (struct-of-arrays):
+    - ids, types, width, height, radius, x, y, rotated, angle — по строке
+      на фигуру (angle — угол поворота в градусах, rotated = angle != 0);
+    - vertices — общий буфер вершин (N × 2), offsets — границы фигур в нём.
+    Копия набора для очередного прогона алгоритма — это копия массивов,
+    а не рекурсивный deepcopy объектов. Индексация и перебор возвращают
+    FigureView, поэтому упаковщики работают с набором без изменений.
+    """
+    COLUMNS = ('ids', 'types', 'width', 'height', 'radius', 'x', 'y', 'rotated',
+               'vertices', 'offsets', 'angle')
+
+    def __init__(self, ids, types, width, height, radius, x=None, y=None,
+                 rotated=None, vertices=None, offsets=None, angle=None):
+        n = len(ids)
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.types = np.asarray(types, dtype=np.int8)
+        self.width = np.asarray(width, dtype=np.int64)
+        self.height = np.asarray(height, dtype=np.int64)
+        self.radius = np.asarray(radius, dtype=np.int64)
+        self.x = np.full(n, NO_POS, dtype=np.int64) if x is None else np.asarray(x, dtype=np.int64)
+        self.y = np.full(n, NO_POS, dtype=np.int64) if y is None else np.asarray(y, dtype=np.int64)
+        self.rotated = np.zeros(n, dtype=bool) if rotated is None else np.asarray(rotated, dtype=bool)
+        if vertices is None:
+            vertices = np.zeros((0, 2), dtype=np.int64)
+        self.vertices = np.asarray(vertices, dtype=np.int64).reshape(-1, 2)
+        self.offsets = (np.zeros(n + 1, dtype=np.int64) if offsets is None
+                        else np.asarray(offsets, dtype=np.int64))
+        self.angle = (np.where(self.rotated, 90, 0).astype(np.int16) if angle is None
+                      else np.asarray(angle, dtype=np.int16))
+
+    @classmethod
+    def from_figures(cls, figures):
+        """Собирает набор из списка объектов Figure (или совместимых)."""
+        n = len(figures)
+        ids = np.empty(n, dtype=np.int64)
+        types = np.empty(n, dtype=np.int8)
+        width = np.empty(n, dtype=np.int64)
+        height = np.empty(n, dtype=np.int64)
+        radius = np.zeros(n, dtype=np.int64)
+        x = np.full(n, NO_POS, dtype=np.int64)
+        y = np.full(n, NO_POS, dtype=np.int64)
+        angle = np.zeros(n, dtype=np.int16)
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        vertices = []
+
+        for i, f in enumerate(figures):
+            ids[i] = f.id
+            types[i] = TYPE_CODES[f.type]
+            width[i], height[i] = f.width, f.height
+            if f.type == 'circle':
+                radius[i] = f.radius
+            elif f.type in ('triangle', 'polygon'):
+                vertices.extend(f.vertices)
+            if f.x is not None:
+                x[i], y[i] = f.x, f.y
+            angle[i] = getattr(f, 'angle', 90 if getattr(f, 'rotated', False) else 0)
+            offsets[i + 1] = len(vertices)
+
+        return cls(ids, types, width, height, radius, x, y, angle != 0, vertices, offsets, angle)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return FigureView(self, index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield FigureView(self, i)
+
+    def copy(self):
+        """Независимая копия набора — копирование массивов."""
+        return FigureSet(*(getattr(self, name).copy() for name in self.COLUMNS))
+
+    def take(self, indices):
+        """Новый набор из строк indices (в указанном порядке)."""
+        indices = np.asarray(indices, dtype=np.int64)
+        starts, ends = self.offsets[indices], self.offsets[indices + 1]
+        counts = ends - starts
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        rows = np.repeat(starts - offsets[:-1], counts) + np.arange(offsets[-1])
+        return FigureSet(self.ids[indices], self.types[indices], self.width[indices],
+                         self.height[indices], self.radius[indices], self.x[indices],
+                         self.y[indices], self.rotated[indices], self.vertices[rows], offsets,
+                         self.angle[indices])
+
+    def set_placement(self, rows, x, y, width, height, rotated, angle=None):
+        """
+        Записывает позиции строк rows столбцами (как utils.apply_placement):
+        вершины многоугольников поворачиваются на разницу углов angle,
+        а без angle — на 90°, если стороны габарита поменялись местами.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        rotated = np.broadcast_to(np.asarray(rotated, dtype=bool), rows.shape)
+        if angle is None:
+            turns = (np.asarray(width) != self.width[rows]).astype(np.int64)
+            angle = np.where(rotated, 90, 0)
+        else:
+            turns = (np.asarray(angle, dtype=np.int64) - self.angle[rows]) // 90
+        turned = (self.types[rows] >= TYPE_CODES['triangle']) & (turns % 4 != 0)
+        for row, k in zip(rows[turned], turns[turned]):
+            view = self[row]
+            view.vertices = rotate_vertices(view.vertices, int(k))
+        self.x[rows], self.y[rows] = x, y
+        self.width[rows], self.height[rows] = width, height
+        self.rotated[rows] = rotated
+        self.angle[rows] = angle
+
+    @classmethod
+    def concatenate(cls, sets):
+        """Склеивает несколько наборов в один (строки идут подряд)."""
+        if not sets:
+            return cls([], [], [], [], [])
+        offsets = [np.zeros(1, dtype=np.int64)]
+        shift = 0
+        for s in sets:
+            offsets.append(s.offsets[1:] + shift)
+            shift += len(s.vertices)
+        columns = {name: np.concatenate([getattr(s, name) for s in sets])
+                   for name in cls.COLUMNS if name != 'offsets'}
+        return cls(**columns, offsets=np.concatenate(offsets))
+
+    def to_figures(self):
+        """Превращает набор обратно в список объектов Figure."""
+        figures = []
+        for view in self:
+            if view.type == 'rectangle':
+                f = Figure(view.id, view.type, view.width, view.height)
+            elif view.type == 'circle':
+                f = Figure(view.id, view.type, view.radius)
+            else:
+                f = Figure(view.id, view.type, vertices=view.vertices)
+            f.width, f.height = view.width, view.height
+            f.x, f.y, f.angle = view.x, view.y, view.angle
+            figures.append(f)
+        return figures
@@ -0,0 +1,343 @@
+import numpy as np
+from spatial_index import SpatialIndex
+import profiling
+
+
+class Rect:
+    def __init__(self, x, y, width, height):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+    def fits(self, w, h):
+        return self.width >= w and self.height >= h
+
+    def intersects(self, other):
+        return not (self.x + self.width <= other.x or
+                    other.x + other.width <= self.x or
+                    self.y + self.height <= other.y or
+                    other.y + other.height <= self.y)
+
+    def contains(self, other):
+        return (self.x <= other.x and self.y <= other.y and
+                self.x + self.width >= other.x + other.width and
+                self.y + self.height >= other.y + other.height)
+
+    def split(self, used):
+        result = []
+        if not self.intersects(used):
+            return [self]
+
+        if used.x > self.x:
+            result.append(Rect(self.x, self.y, used.x - self.x, self.height))
+        if used.x + used.width < self.x + self.width:
+            result.append(Rect(used.x + used.width, self.y,
+                               self.x + self.width - (used.x + used.width), self.height))
+        if used.y > self.y:
+            top_width = min(self.width, used.width)
+            result.append(Rect(self.x, self.y, top_width, used.y - self.y))
+        if used.y + used.height < self.y + self.height:
+            bottom_width = min(self.width, used.width)
+            result.append(Rect(self.x, used.y + used.height, bottom_width,
+                               self.y + self.height - (used.y + used.height)))
+        return result
+
+
+# Эвристики выбора свободного прямоугольника (MaxRects):
+# bssf — лучшая посадка по короткой стороне, blsf — по длинной стороне,
+# baf — по площади, bl — bottom-left, cp — максимальный периметр касания,
+# ff — первый подходящий в порядке списка свободных прямоугольников
+# (как в исходной реализации: кусочки встают на место разрезанного).
+HEURISTICS = ('ff', 'bssf', 'blsf', 'baf', 'bl', 'cp')
+
+# Шаг между рангами (порядком списка) соседних свободных прямоугольников
+RANK_GAP = 1 << 20
+
+
+class FreeRectangles:
+    """
+    Свободное пространство MaxRects в виде столбцов NumPy (x, y, w, h):
+    - Свободные прямоугольники лежат в слотах массивов, маска alive
+      отмечает занятые слоты; освободившиеся слоты используются повторно.
+    - Пространственный индекс (SpatialIndex) по номерам слотов находит
+      прямоугольники, пересекающие новую деталь, и возможные «поглотители»
+      новых кусочков, поэтому обновление после размещения локально.
+    - Выбор позиции оценивает все прямоугольники и обе ориентации детали
+      одним векторизованным проходом.
+    - Столбец rank хранит порядок прямоугольников в списке исходной
+      реализации: кусочки разрезанного прямоугольника получают ранги
+      в промежутке между его рангом и следующим, при нехватке промежутка
+      ранги перенумеровываются.
+    """
+    def __init__(self, sheet_w, sheet_h, cell_size, capacity=64):
+        self.sheet_w = sheet_w
+        self.sheet_h = sheet_h
+        self.index = SpatialIndex(cell_size)
+        self.x = np.zeros(capacity, dtype=np.int64)
+        self.y = np.zeros(capacity, dtype=np.int64)
+        self.w = np.zeros(capacity, dtype=np.int64)
+        self.h = np.zeros(capacity, dtype=np.int64)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.rank = np.zeros(capacity, dtype=np.int64)
+        self._next_rank = 0
+        self._slots = list(range(capacity - 1, -1, -1))
+        # Занятые прямоугольники (с отступами) — нужны эвристике касания.
+        # Хранятся так же, слотами столбцов (x0, y0, x1, y1) со своим
+        # индексом: касание ищется только среди соседей кандидата.
+        # used: (x0, y0, x1, y1) -> слот; занятое место можно освободить (release)
+        self.used = {}
+        self.used_index = SpatialIndex(cell_size)
+        self.used_box = np.zeros((capacity, 4), dtype=np.int64)
+        self._used_slots = list(range(capacity - 1, -1, -1))
+        self.add(Rect(0, 0, sheet_w, sheet_h))
+
+    def __len__(self):
+        return len(self.index)
+
+    def __iter__(self):
+        for slot in np.flatnonzero(self.alive):
+            yield self.rect(slot)
+
+    def rect(self, slot):
+        return Rect(int(self.x[slot]), int(self.y[slot]), int(self.w[slot]), int(self.h[slot]))
+
+    def _grow(self):
+        n = len(self.alive)
+        for name in ('x', 'y', 'w', 'h', 'alive', 'rank'):
+            column = getattr(self, name)
+            setattr(self, name, np.concatenate([column, np.zeros_like(column)]))
+        self._slots.extend(range(2 * n - 1, n - 1, -1))
+
+    def add(self, r, rank=None):
+        """
+        Добавляет свободный прямоугольник, возвращает номер слота.
+        Без rank прямоугольник встаёт в конец списка.
+        """
+        if not self._slots:
+            self._grow()
+        slot = self._slots.pop()
+        if rank is None:
+            rank = self._next_rank
+        self._next_rank = max(self._next_rank, rank + RANK_GAP)
+        self.x[slot], self.y[slot] = r.x, r.y
+        self.w[slot], self.h[slot] = r.width, r.height
+        self.rank[slot] = rank
+        self.alive[slot] = True
+        self.index.insert(slot, r.x, r.y, r.x + r.width, r.y + r.height)
+        return slot
+
+    def remove(self, slot):
+        self.alive[slot] = False
+        self.index.remove(slot)
+        self._slots.append(slot)
+
+    def _renumber(self):
+        """Равномерная перенумерация рангов живых прямоугольников с сохранением порядка."""
+        slots = np.flatnonzero(self.alive)
+        slots = slots[np.argsort(self.rank[slots], kind='stable')]
+        self.rank[slots] = np.arange(len(slots), dtype=np.int64) * RANK_GAP
+        self._next_rank = len(slots) * RANK_GAP
+
+    def _piece_ranks(self, slot, count):
+        """Ранги для count кусочков, встающих на место прямоугольника slot."""
+        alive = np.flatnonzero(self.alive)
+        rank = int(self.rank[slot])
+        later = self.rank[alive][self.rank[alive] > rank]
+        end = int(later.min()) if later.size else rank + RANK_GAP
+        if (end - rank) // max(count, 1) < 1:
+            self._renumber()
+            return self._piece_ranks(slot, count)
+        step = (end - rank) // max(count, 1)
+        return [rank + i * step for i in range(count)]
+
+    def mark_used(self, r):
+        """Запоминает занятый прямоугольник r для эвристики касания."""
+        key = (r.x, r.y, r.x + r.width, r.y + r.height)
+        if key in self.used:
+            return
+        if not self._used_slots:
+            n = len(self.used_box)
+            self.used_box = np.concatenate([self.used_box, np.zeros_like(self.used_box)])
+            self._used_slots.extend(range(2 * n - 1, n - 1, -1))
+        slot = self._used_slots.pop()
+        self.used_box[slot] = key
+        self.used_index.insert(slot, *key)
+        self.used[key] = slot
+
+    def unmark_used(self, r):
+        """Забывает занятый прямоугольник r (после release)."""
+        slot = self.used.pop((r.x, r.y, r.x + r.width, r.y + r.height), None)
+        if slot is not None:
+            self.used_index.remove(slot)
+            self._used_slots.append(slot)
+
+    def place(self, used):
+        """
+        Вычитает занятый прямоугольник used из свободного пространства.
+        Разрезаются только пересекающие его прямоугольники; вложенными
+        могут оказаться только новые кусочки, их и проверяем по индексу.
+        Возвращает слоты оставшихся новых кусочков.
+        """
+        self.mark_used(used)
+        hits = self.index.query(used.x, used.y, used.x + used.width, used.y + used.height)
+        pieces = []
+        for slot in sorted(hits, key=lambda slot: self.rank[slot]):
+            r = self.rect(slot)
+            split = r.split(used)
+            ranks = self._piece_ranks(slot, len(split))
+            self.remove(slot)
+            pieces.extend(self.add(piece, rank) for piece, rank in zip(split, ranks))
+
+        kept = []
+        for slot in pieces:
+            piece = self.rect(slot)
+            neighbours = self.index.query(piece.x, piece.y,
+                                          piece.x + piece.width, piece.y + piece.height)
+            if any(o != slot and self.rect(o).contains(piece) for o in neighbours):
+                self.remove(slot)
+            else:
+                kept.append(slot)
+
+        rec = profiling.current
+        if rec is not None:
+            rec.count('maxrects.splits', len(hits))
+            rec.count('maxrects.pieces', len(pieces))
+            rec.count('maxrects.prunes', len(pieces) - len(kept))
+            rec.sample('maxrects.free_rects', len(self))
+        return kept
+
+    def _expand(self, r, blockers, horizontal_first):
+        """
+        Растягивает свободный прямоугольник r, пока не упрётся в занятые
+        прямоугольники blockers (SpatialIndex) или края листа: сначала
+        по одной оси, затем по другой.
+        """
+        x0, y0, x1, y1 = r.x, r.y, r.x + r.width, r.y + r.height
+        for axis in ((0, 1) if horizontal_first else (1, 0)):
+            if axis == 0:
+                lo, hi = 0, self.sheet_w
+                for key in blockers.query(0, y0, self.sheet_w, y1):
+                    bx0, _, bx1, _ = blockers.boxes[key]
+                    if bx1 <= x0:
+                        lo = max(lo, bx1)
+                    elif bx0 >= x1:
+                        hi = min(hi, bx0)
+                x0, x1 = lo, hi
+            else:
+                lo, hi = 0, self.sheet_h
+                for key in blockers.query(x0, 0, x1, self.sheet_h):
+                    _, by0, _, by1 = blockers.boxes[key]
+                    if by1 <= y0:
+                        lo = max(lo, by1)
+                    elif by0 >= y1:
+                        hi = min(hi, by0)
+                y0, y1 = lo, hi
+        return Rect(x0, y0, x1 - x0, y1 - y0)
+
+    def release(self, freed, blockers):
+        """
+        Возвращает занятый прямоугольник freed в свободное пространство.
+        blockers — SpatialIndex оставшихся занятых прямоугольников.
+        Освобождённый прямоугольник и касающиеся его свободные растягиваются
+        до упора (в двух порядках осей), новые прямоугольники добавляются,
+        поглощённые ими — удаляются. Работа идёт только по соседям freed;
+        все прямоугольники остаются свободными, но полный набор
+        максимальных прямоугольников не гарантируется.
+        Возвращает слоты добавленных прямоугольников.
+        """
+        self.unmark_used(freed)
+        x0, y0 = freed.x, freed.y
+        x1, y1 = x0 + freed.width, y0 + freed.height
+        seeds = [freed] + [self.rect(slot)
+                           for slot in sorted(self.index.query(x0 - 1, y0 - 1, x1 + 1, y1 + 1))]
+
+        grown = {}
+        for r in seeds:
+            for horizontal_first in (True, False):
+                g = self._expand(r, blockers, horizontal_first)
+                grown[(g.x, g.y, g.width, g.height)] = g
+
+        added = []
+        for g in grown.values():
+            near = self.index.query(g.x, g.y, g.x + g.width, g.y + g.height)
+            if any(self.rect(o).contains(g) for o in near):
+                continue
+            for o in near:
+                if g.contains(self.rect(o)):
+                    self.remove(o)
+            added.append(self.add(g))
+        return added
+
+    def _contact(self, cx, cy, cw, ch):
+        """
+        Длина общих границ кандидатов с краями листа и занятыми прямоугольниками.
+        Для каждого кандидата по индексу берутся только занятые прямоугольники,
+        задевающие его окрестность шириной 1, затем все пары (кандидат,
+        сосед) оцениваются одним векторизованным проходом.
+        """
+        contact = (np.where(cx == 0, ch, 0) + np.where(cy == 0, cw, 0) +
+                   np.where(cx + cw == self.sheet_w, ch, 0) +
+                   np.where(cy + ch == self.sheet_h, cw, 0))
+        if not self.used:
+            return contact
+        rows, slots = [], []
+        query = self.used_index.query
+        for k, (x0, y0, w, h) in enumerate(zip(cx.tolist(), cy.tolist(), cw.tolist(), ch.tolist())):
+            near = query(x0 - 1, y0 - 1, x0 + w + 1, y0 + h + 1)
+            rows.extend([k] * len(near))
+            slots.extend(near)
+        if not slots:
+            return contact
+        rows = np.array(rows, dtype=np.int64)
+        ux0, uy0, ux1, uy1 = self.used_box[slots].T
+        x0, y0 = cx[rows], cy[rows]
+        x1, y1 = x0 + cw[rows], y0 + ch[rows]
+        y_overlap = np.clip(np.minimum(y1, uy1) - np.maximum(y0, uy0), 0, None)
+        x_overlap = np.clip(np.minimum(x1, ux1) - np.maximum(x0, ux0), 0, None)
+        vertical = ((ux1 == x0) | (ux0 == x1)) * y_overlap
+        horizontal = ((uy1 == y0) | (uy0 == y1)) * x_overlap
+        return contact + np.bincount(rows, vertical + horizontal, minlength=len(cx)).astype(np.int64)
+
+    def find_best(self, w, h, heuristic='bssf', rotate=True):
+        """
+        Лучшая позиция для прямоугольника w×h (уже с отступами).
+        Оцениваются все свободные прямоугольники и обе ориентации сразу.
+        Возвращает (x, y, rotated) левого верхнего угла или None.
+        """
+        if heuristic not in HEURISTICS:
+            raise ValueError(f"Unknown heuristic: {heuristic}")
+        slots = np.flatnonzero(self.alive)
+        sizes = [(w, h, False), (h, w, True)] if rotate and w != h else [(w, h, False)]
+
+        cand = []
+        for cw, ch, rotated in sizes:
+            ok = slots[(self.w[slots] >= cw) & (self.h[slots] >= ch)]
+            cand.append((ok, np.full(len(ok), cw), np.full(len(ok), ch),
+                         np.full(len(ok), rotated)))
+        slot, cw, ch, rotated = (np.concatenate(c) for c in zip(*cand))
+        if profiling.current is not None:
+            profiling.current.count('maxrects.candidates', len(slot))
+        if not len(slot):
+            return None
+
+        cx, cy = self.x[slot], self.y[slot]
+        leftover_w, leftover_h = self.w[slot] - cw, self.h[slot] - ch
+        short = np.minimum(leftover_w, leftover_h)
+        long = np.maximum(leftover_w, leftover_h)
+
+        # np.lexsort сортирует по последнему ключу, затем по предыдущим
+        if heuristic == 'bssf':
+            keys = (cx, cy, long, short)
+        elif heuristic == 'blsf':
+            keys = (cx, cy, short, long)
+        elif heuristic == 'baf':
+            keys = (cx, cy, short, self.w[slot] * self.h[slot] - cw * ch)
+        elif heuristic == 'bl':
+            keys = (cx, cy + ch)
+        elif heuristic == 'ff':
+            keys = (rotated, self.rank[slot])
+        else:
+            keys = (cx, cy, -self._contact(cx, cy, cw, ch))
+        best = np.lexsort(keys)[0]
+        return int(cx[best]), int(cy[best]), bool(rotated[best])
@@ -0,0 +1,167 @@
+import json
+import os
+import numpy as np
+
+# Двоичный формат раскладки: MAGIC, затем записи фиксированной длины RECORD.
+# Число записей определяется по размеру файла, поэтому запись можно
+# дописывать потоком, не зная заранее, сколько фигур будет размещено.
+MAGIC = b'LAYOUT1\0'
+RECORD = np.dtype([('id', '<i8'), ('x', '<i8'), ('y', '<i8'),
+                   ('sheet', '<i4'), ('rotated', 'u1')], align=True)
+
+# Раскладки с углом поворота в градусах (0, 90, 180, 270) — у растрового
+# движка; пишутся, только если в fields есть 'angle' (ANGLE_FIELDS)
+MAGIC_ANGLE = b'LAYOUT2\0'
+RECORD_ANGLE = np.dtype([('id', '<i8'), ('x', '<i8'), ('y', '<i8'),
+                         ('sheet', '<i4'), ('rotated', 'u1'), ('angle', '<i2')], align=True)
+
+FORMATS = ('json', 'jsonl', 'binary')
+DEFAULT_FIELDS = ('id', 'x', 'y', 'rotated')
+ANGLE_FIELDS = DEFAULT_FIELDS + ('angle',)
+
+# Сколько двоичных записей копится в буфере перед записью на диск
+BUFFER_SIZE = 4096
+
+_encode = json.JSONEncoder().encode
+
+
+def format_for(path):
+    """Формат по расширению: .jsonl — JSON Lines, .bin/.lay — двоичный, иначе JSON."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.jsonl':
+        return 'jsonl'
+    if ext in ('.bin', '.lay'):
+        return 'binary'
+    return 'json'
+
+
+def angle_of(f):
+    """
+    Угол поворота фигуры в градусах (Figure.angle, FigureView.angle).
+    Для объектов без угла — 90° или 0° по флагу rotated.
+    """
+    angle = getattr(f, 'angle', None)
+    if angle is None:
+        angle = 90 if getattr(f, 'rotated', False) else 0
+    return int(angle)
+
+
+class LayoutWriter:
+    """
+    Потоковая запись раскладки: каждая фигура записывается сразу
+    в write(), без промежуточного списка словарей.
+    - json   — массив в прежнем виде (json.dump(..., indent=2)), но потоком;
+    - jsonl  — по объекту JSON на строку;
+    - binary — записи RECORD (id, x, y, sheet, rotated).
+    fields задаёт поля текстовых форматов; у двоичного набор полей
+    постоянный, и только 'angle' в fields выбирает RECORD_ANGLE.
+    """
+
+    def __init__(self, path, format=None, fields=DEFAULT_FIELDS):
+        self.path = path
+        self.format = format or format_for(path)
+        if self.format not in FORMATS:
+            raise ValueError(f"Unknown output format: {self.format}. Available: {', '.join(FORMATS)}")
+        self.fields = fields
+        self.count = 0
+        if self.format == 'binary':
+            self._angles = 'angle' in fields
+            self._file = open(path, 'wb')
+            self._file.write(MAGIC_ANGLE if self._angles else MAGIC)
+            self._buffer = np.zeros(BUFFER_SIZE, dtype=RECORD_ANGLE if self._angles else RECORD)
+            self._used = 0
+        else:
+            self._file = open(path, 'w')
+            if self.format == 'json':
+                self._file.write('[')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _entry(self, f, sheet):
+        entry = {}
+        for name in self.fields:
+            if name == 'sheet':
+                entry[name] = sheet
+            elif name == 'rotated':
+                entry[name] = getattr(f, 'rotated', False)
+            elif name == 'angle':
+                entry[name] = angle_of(f)
+            else:
+                entry[name] = getattr(f, name)
+        return entry
+
+    def write(self, f, sheet=0):
+        """Записывает одну размещённую фигуру."""
+        if self.format == 'binary':
+            record = (f.id, f.x, f.y, sheet, getattr(f, 'rotated', False))
+            self._buffer[self._used] = record + (angle_of(f),) if self._angles else record
+            self._used += 1
+            if self._used == BUFFER_SIZE:
+                self._flush()
+        elif self.format == 'jsonl':
+            self._file.write(json.dumps(self._entry(f, sheet)) + '\n')
+        else:
+            # Тот же текст, что даёт json.dump(..., indent=2) для списка словарей
+            lines = ',\n'.join(f'    "{name}": {_encode(value)}'
+                                for name, value in self._entry(f, sheet).items())
+            self._file.write((',\n' if self.count else '\n') + '  {\n' + lines + '\n  }')
+        self.count += 1
+
+    def write_many(self, figures, sheet=0):
+        for f in figures:
+            self.write(f, sheet)
+
+    def _flush(self):
+        self._buffer[:self._used].tofile(self._file)
+        self._used = 0
+
+    def close(self):
+        if self._file.closed:
+            return
+        if self.format == 'binary':
+            self._flush()
+        elif self.format == 'json':
+            self._file.write('\n]' if self.count else ']')
+        self._file.close()
+
+
+def write_output(figures, path='output.json', fields=DEFAULT_FIELDS, format=None):
+    """Записывает размещённые фигуры одного листа и сообщает об этом."""
+    with LayoutWriter(path, format, fields) as writer:
+        writer.write_many(figures)
+    print(f"✅ Output written to {path}.")
+
+
+def write_sheets(sheets, path='output.json', fields=DEFAULT_FIELDS + ('sheet',), format=None):
+    """Записывает раскладку нескольких листов [(sheet_w, sheet_h, placed), ...]."""
+    with LayoutWriter(path, format, fields) as writer:
+        for number, (_, _, placed) in enumerate(sheets):
+            writer.write_many(placed, number)
+    print(f"✅ Output written to {path}.")
+
+
+def read_layout(path, format=None):
+    """
+    Читает раскладку обратно. Двоичный файл открывается через np.memmap
+    (структурированный массив RECORD или RECORD_ANGLE, без копирования),
+    текстовые форматы — списком словарей.
+    """
+    format = format or format_for(path)
+    if format == 'binary':
+        with open(path, 'rb') as f:
+            magic = f.read(len(MAGIC))
+        if magic not in (MAGIC, MAGIC_ANGLE):
+            raise ValueError(f"{path} is not a binary layout file")
+        record = RECORD if magic == MAGIC else RECORD_ANGLE
+        count = (os.path.getsize(path) - len(MAGIC)) // record.itemsize
+        if count == 0:
+            return np.zeros(0, dtype=record)
+        return np.memmap(path, dtype=record, mode='r', offset=len(MAGIC), shape=(count,))
+    with open(path) as f:
+        if format == 'jsonl':
+            return [json.loads(line) for line in f if line.strip()]
+        return json.load(f)
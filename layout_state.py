@@ -0,0 +1,173 @@
+import json
+from utils import Figure
+from spatial_index import SpatialIndex, cell_size_for
+from free_rectangles import Rect, FreeRectangles, HEURISTICS
+from maximal_rectangles_packer import place_figure
+
+
+class LayoutState:
+    """
+    Раскладка одного листа, которую можно менять по частям:
+    - add(figures) дозаполняет лист новыми фигурами (MaxRects);
+    - remove(ids) снимает фигуры и возвращает их место в свободное
+      пространство;
+    - compact() сдвигает фигуры к левому верхнему углу, где это возможно.
+    Между вызовами хранится состояние MaxRects (FreeRectangles) и индекс
+    занятых прямоугольников, поэтому стоимость изменения зависит от
+    числа затронутых фигур, а не от заполненности листа.
+    Состояние сохраняется в JSON (save) и загружается обратно (load).
+    """
+
+    def __init__(self, sheet_w, sheet_h, padding, heuristic='bssf', cell_size=None):
+        if heuristic not in HEURISTICS:
+            raise ValueError(f"Unknown heuristic: {heuristic}")
+        self.sheet_w = sheet_w
+        self.sheet_h = sheet_h
+        self.padding = padding
+        self.heuristic = heuristic
+        self.cell_size = cell_size
+        self.figures = {}
+        self.free_rects = None
+        self.occupied = None
+
+    def __len__(self):
+        return len(self.figures)
+
+    def __contains__(self, fig_id):
+        return fig_id in self.figures
+
+    def _init(self, figures):
+        # Размер клеток выбирается по первой партии фигур
+        self.cell_size = self.cell_size or cell_size_for(figures, self.padding)
+        self.free_rects = FreeRectangles(self.sheet_w, self.sheet_h, self.cell_size)
+        self.occupied = SpatialIndex(self.cell_size)
+
+    def _box(self, f):
+        p = self.padding
+        return Rect(f.x - p, f.y - p, f.width + 2 * p, f.height + 2 * p)
+
+    def _occupy(self, f):
+        box = self._box(f)
+        self.occupied.insert(f.id, box.x, box.y, box.x + box.width, box.y + box.height)
+        self.figures[f.id] = f
+
+    def add(self, figures):
+        """
+        Размещает новые фигуры в свободном месте, крупные первыми.
+        Уже размещённые фигуры не двигаются.
+        Возвращает (placed, not_placed).
+        """
+        for f in figures:
+            if f.id in self.figures:
+                raise ValueError(f"Figure ID {f.id} is already in the layout")
+        if self.free_rects is None:
+            self._init(figures)
+
+        placed = []
+        not_placed = []
+        for f in sorted(figures, key=lambda f: max(f.width, f.height), reverse=True):
+            if place_figure(self.free_rects, f, self.padding, self.heuristic):
+                self._occupy(f)
+                placed.append(f)
+            else:
+                not_placed.append(f)
+        return placed, not_placed
+
+    def _release(self, f):
+        self.occupied.remove(f.id)
+        self.free_rects.release(self._box(f), self.occupied)
+
+    def remove(self, ids):
+        """Снимает фигуры с листа, возвращает список снятых фигур."""
+        removed = []
+        for fig_id in ids:
+            f = self.figures.pop(fig_id, None)
+            if f is None:
+                continue
+            self._release(f)
+            f.x = f.y = None
+            removed.append(f)
+        return removed
+
+    def compact(self, ids=None):
+        """
+        Локальное уплотнение: каждая фигура (все или только ids), по порядку
+        сверху вниз, снимается и ставится в самую верхнюю-левую свободную
+        позицию (эвристика bl, ориентация сохраняется), если она лучше
+        текущей. Возвращает число сдвинутых фигур.
+        """
+        if ids is None:
+            ids = list(self.figures)
+        figures = sorted((self.figures[i] for i in ids if i in self.figures),
+                         key=lambda f: (f.y, f.x))
+        p = self.padding
+        moved = 0
+        for f in figures:
+            self._release(f)
+            box = self._box(f)
+            best = self.free_rects.find_best(box.width, box.height, 'bl', rotate=False)
+            if best is not None and (best[1], best[0]) < (box.y, box.x):
+                f.x, f.y = best[0] + p, best[1] + p
+                box = self._box(f)
+                moved += 1
+            self.free_rects.place(box)
+            self.occupied.insert(f.id, box.x, box.y, box.x + box.width, box.y + box.height)
+        return moved
+
+    def placed(self):
+        return list(self.figures.values())
+
+    def save(self, path):
+        """Сохраняет раскладку и свободное пространство в JSON."""
+        figures = []
+        for f in self.figures.values():
+            entry = {'id': f.id, 'type': f.type, 'x': f.x, 'y': f.y,
+                     'width': f.width, 'height': f.height,
+                     'rotated': getattr(f, 'rotated', False)}
+            if f.type == 'circle':
+                entry['radius'] = f.radius
+            elif f.type in ('triangle', 'polygon'):
+                entry['vertices'] = [list(v) for v in f.vertices]
+            figures.append(entry)
+
+        data = {
+            'sheet_w': self.sheet_w, 'sheet_h': self.sheet_h, 'padding': self.padding,
+            'heuristic': self.heuristic, 'cell_size': self.cell_size,
+            'figures': figures,
+            'free': ([[r.x, r.y, r.width, r.height] for r in self.free_rects]
+                     if self.free_rects is not None else None),
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f)
+
+    @classmethod
+    def load(cls, path):
+        """Загружает состояние, сохранённое save(), без повторной упаковки."""
+        with open(path) as f:
+            data = json.load(f)
+        state = cls(data['sheet_w'], data['sheet_h'], data['padding'],
+                    data['heuristic'], data['cell_size'])
+        if data['free'] is None:
+            return state
+
+        state.free_rects = FreeRectangles(state.sheet_w, state.sheet_h, state.cell_size)
+        for slot in list(state.free_rects.index.boxes):
+            state.free_rects.remove(slot)
+        for x, y, w, h in data['free']:
+            state.free_rects.add(Rect(x, y, w, h))
+        state.occupied = SpatialIndex(state.cell_size)
+
+        for entry in data['figures']:
+            if entry['type'] == 'rectangle':
+                w, h = entry['width'], entry['height']
+                f = Figure(entry['id'], 'rectangle', *((h, w) if entry['rotated'] else (w, h)))
+            elif entry['type'] == 'circle':
+                f = Figure(entry['id'], 'circle', entry['radius'])
+            else:
+                f = Figure(entry['id'], entry['type'], vertices=[tuple(v) for v in entry['vertices']])
+            f.width, f.height = entry['width'], entry['height']
+            f.x, f.y, f.rotated = entry['x'], entry['y'], entry['rotated']
+            state._occupy(f)
+            box = state._box(f)
+            state.free_rects.mark_used(box)
+        return state
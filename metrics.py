@@ -0,0 +1,174 @@
+import math
+import numpy as np
+from figure_set import FigureSet, TYPE_CODES
+from render import shape_mask
+
+
+def _as_set(figures):
+    return figures if isinstance(figures, FigureSet) else FigureSet.from_figures(figures)
+
+
+def shape_areas(figures):
+    """
+    Точные площади фигур (без отступов) одним проходом NumPy:
+    прямоугольники — w × h, круги — π r², треугольники и многоугольники —
+    формула шнурования по общему буферу вершин набора.
+    Площадь не зависит от положения и поворота, поэтому её можно посчитать
+    один раз на набор и передавать в layout_metrics(areas=...).
+    """
+    fs = _as_set(figures)
+    areas = fs.width.astype(np.float64) * fs.height
+    circles = fs.types == TYPE_CODES['circle']
+    areas[circles] = math.pi * fs.radius[circles].astype(np.float64) ** 2
+
+    polygons = (fs.types == TYPE_CODES['triangle']) | (fs.types == TYPE_CODES['polygon'])
+    if polygons.any() and len(fs.vertices):
+        starts, ends = fs.offsets[:-1], fs.offsets[1:]
+        # Номер следующей вершины: последняя вершина фигуры замыкается на первую
+        following = np.arange(1, len(fs.vertices) + 1)
+        closed = ends > starts
+        following[ends[closed] - 1] = starts[closed]
+        vx, vy = fs.vertices[:, 0], fs.vertices[:, 1]
+        cross = vx * vy[following] - vx[following] * vy
+        # Целочисленные суммы по отрезкам буфера — без потери точности
+        sums = np.concatenate([[0], np.cumsum(cross)])
+        areas[polygons] = np.abs(sums[ends] - sums[starts])[polygons] / 2
+    return areas
+
+
+def largest_free_rectangle(sheet_w, sheet_h, x, y, w, h):
+    """
+    Наибольший свободный прямоугольник листа среди габаритов (x, y, w, h).
+    Координаты сжимаются до границ габаритов, свободные ячейки сжатой сетки
+    перебираются построчно методом «гистограммы со стеком».
+    Возвращает ((x, y, w, h) или None, свободная площадь). Стоимость —
+    O(X · Y) по числу различных границ, поэтому считается по запросу.
+    """
+    x0 = np.clip(x, 0, sheet_w)
+    y0 = np.clip(y, 0, sheet_h)
+    x1 = np.clip(x + w, 0, sheet_w)
+    y1 = np.clip(y + h, 0, sheet_h)
+    xs = np.unique(np.concatenate([[0, sheet_w], x0, x1]))
+    ys = np.unique(np.concatenate([[0, sheet_h], y0, y1]))
+    nx, ny = len(xs) - 1, len(ys) - 1
+
+    # Занятость ячеек через двумерный разностный массив
+    diff = np.zeros((ny + 1, nx + 1), dtype=np.int64)
+    i0, i1 = np.searchsorted(ys, y0), np.searchsorted(ys, y1)
+    j0, j1 = np.searchsorted(xs, x0), np.searchsorted(xs, x1)
+    np.add.at(diff, (i0, j0), 1)
+    np.add.at(diff, (i0, j1), -1)
+    np.add.at(diff, (i1, j0), -1)
+    np.add.at(diff, (i1, j1), 1)
+    free = diff.cumsum(axis=0).cumsum(axis=1)[:ny, :nx] == 0
+    dx, dy = np.diff(xs), np.diff(ys)
+    free_area = int((free * dy[:, None] * dx[None, :]).sum())
+
+    best, best_area = None, 0
+    heights = np.zeros(nx, dtype=np.int64)
+    for i in range(ny):
+        heights = np.where(free[i], heights + dy[i], 0)
+        bottom = int(ys[i + 1])
+        column_heights = heights.tolist()
+        stack = []  # (номер первого столбца, высота)
+        for j in range(nx + 1):
+            height = column_heights[j] if j < nx else 0
+            start = j
+            while stack and stack[-1][1] >= height:
+                start, top = stack.pop()
+                area = top * int(xs[j] - xs[start])
+                if area > best_area:
+                    best_area = area
+                    best = (int(xs[start]), bottom - top, int(xs[j] - xs[start]), top)
+            if height:
+                stack.append((start, height))
+    return best, free_area
+
+
+def coverage(sheet_w, sheet_h, figures, scale=1.0):
+    """
+    Доля листа (%), покрытая настоящими формами фигур, по растру с
+    scale пикселей на единицу. Перекрытия считаются один раз.
+    """
+    nx, ny = max(1, int(round(sheet_w * scale))), max(1, int(round(sheet_h * scale)))
+    covered = np.zeros((ny, nx), dtype=bool)
+    for f in figures:
+        x0, y0 = max(int(f.x * scale), 0), max(int(f.y * scale), 0)
+        x1 = min(int(math.ceil((f.x + f.width) * scale)), nx)
+        y1 = min(int(math.ceil((f.y + f.height) * scale)), ny)
+        if x0 >= x1 or y0 >= y1:
+            continue
+        vertices = f.vertices if f.type in ('triangle', 'polygon') else None
+        radius = f.radius if f.type == 'circle' else 0
+        covered[y0:y1, x0:x1] |= shape_mask(f.type, f.width, f.height, radius, vertices,
+                                            scale, x0, y0, x1 - x0, y1 - y0, f.x, f.y)
+    return float(covered.mean() * 100)
+
+
+def layout_metrics(sheet_w, sheet_h, placed, areas=None, padding=0, free_space=False,
+                   raster_scale=None):
+    """
+    Метрики раскладки placed (список фигур или FigureSet размещённых строк):
+    - used_area / percent — точная площадь фигур и доля листа;
+    - envelope_area — площадь габаритов, envelope_waste — габариты минус
+      фигуры (материал, потерянный на форме деталей);
+    - free_space=True — largest_free (x, y, w, h) и largest_free_area
+      среди габаритов, расширенных на padding, и fragmentation =
+      1 − наибольший свободный / вся свободная площадь (0 — одно окно);
+    - raster_scale — coverage: покрытие листа настоящими формами по растру.
+    areas — заранее посчитанные shape_areas для placed: без free_space и
+    растра остаются только суммы по столбцам, что дёшево в горячих циклах.
+    """
+    fs = _as_set(placed)
+    if areas is None:
+        areas = shape_areas(fs)
+    sheet_area = sheet_w * sheet_h
+    used_area = float(areas.sum())
+    envelope_area = float((fs.width * fs.height).sum())
+    result = {
+        'sheet_area': sheet_area,
+        'placed': len(fs),
+        'used_area': used_area,
+        'percent': used_area / sheet_area * 100 if sheet_area > 0 else 0.0,
+        'envelope_area': envelope_area,
+        'envelope_waste': envelope_area - used_area,
+    }
+
+    if free_space:
+        rect, free_area = largest_free_rectangle(
+            sheet_w, sheet_h, fs.x - padding, fs.y - padding,
+            fs.width + 2 * padding, fs.height + 2 * padding)
+        largest = rect[2] * rect[3] if rect else 0
+        result['largest_free'] = rect
+        result['largest_free_area'] = largest
+        result['fragmentation'] = 1 - largest / free_area if free_area else 0.0
+
+    if raster_scale:
+        result['coverage'] = coverage(sheet_w, sheet_h, fs, raster_scale)
+    return result
+
+
+def calculate_area_stats(sheet_w, sheet_h, placed, total_count, not_placed, padding,
+                         free_space=False):
+    """
+    Печатает статистику раскладки — общая для всех упаковщиков.
+    free_space=True добавляет наибольшее свободное окно и фрагментацию
+    (largest_free_rectangle — долго на тысячах деталей, поэтому по запросу;
+    в консольных запусках — флаг --free-space).
+    """
+    m = layout_metrics(sheet_w, sheet_h, placed, padding=padding, free_space=free_space)
+
+    print(f"\n📊 Статистика упаковки:")
+    print(f"🧾 Общая площадь листа: {m['sheet_area']}")
+    print(f"🟩 Занятая площадь фигурами: {m['used_area']:.2f}")
+    print(f"📈 Заполнено: {m['percent']:.2f}%")
+    print(f"📦 Площадь габаритов: {m['envelope_area']:.2f} (потери на форме: {m['envelope_waste']:.2f})")
+    if m.get('largest_free'):
+        x, y, w, h = m['largest_free']
+        print(f"⬜ Наибольшее свободное окно: {w}×{h} в ({x}, {y}), "
+              f"фрагментация: {m['fragmentation']:.2f}")
+    print(f"✔️ Размещено фигур: {len(placed)} из {total_count}")
+    print(f"❌ Не влезло: {len(not_placed)}")
+    if not_placed:
+        print(f"❗️ ID неразмещённых фигур: {[f.id for f in not_placed]}")
+    print()
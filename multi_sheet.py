@@ -0,0 +1,128 @@
+import heapq
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from figure_set import FigureSet
+from utils import apply_placement
+from packers import get_packer
+
+# Доля площади листа, на которую рассчитываем при раздаче фигур по листам
+ROUND_FILL = 0.9
+
+
+def _pack_sheet(algorithm, sheet_w, sheet_h, padding, figure_set, params):
+    """
+    Упаковывает один лист (выполняется в рабочем процессе).
+    Возвращает номера размещённых строк набора в порядке размещения
+    и их итоговые x, y, width, height, rotated, angle.
+    """
+    views = list(figure_set)
+    placed, _ = get_packer(algorithm)(sheet_w, sheet_h, padding, views, **params)
+    order = np.array([f.index for f in placed], dtype=np.int64)
+    return (order, figure_set.x[order], figure_set.y[order],
+            figure_set.width[order], figure_set.height[order], figure_set.rotated[order],
+            figure_set.angle[order])
+
+
+def _sheet_size(sheets, number):
+    """Размер листа с номером number; последний размер повторяется."""
+    return sheets[min(number, len(sheets) - 1)]
+
+
+def _split_round(figure_set, remaining, sizes, padding):
+    """
+    Раздаёт оставшиеся фигуры по независимым листам sizes так, чтобы
+    доля заполнения по площади габаритов была примерно одинаковой.
+    Внутри каждой части сохраняется исходный порядок фигур.
+    """
+    area = ((figure_set.width[remaining] + padding) *
+            (figure_set.height[remaining] + padding)).astype(np.float64)
+    capacity = [w * h * ROUND_FILL for w, h in sizes]
+    heap = [(0.0, k) for k in range(len(sizes))]
+    owner = np.empty(len(remaining), dtype=np.int64)
+    for pos in np.argsort(-area, kind='stable'):
+        load, k = heapq.heappop(heap)
+        owner[pos] = k
+        heapq.heappush(heap, (load + area[pos] / capacity[k], k))
+    return [remaining[owner == k] for k in range(len(sizes))]
+
+
+def multi_sheet_pack(sheets, padding, figures, algorithm='maxrects', workers=None, **params):
+    """
+    Упаковка на несколько листов: новые листы открываются, пока все фигуры
+    не будут размещены. Лист, на который не встала ни одна фигура (слишком
+    мал для оставшихся), пропускается и в результат не попадает; упаковка
+    останавливается, только когда ничего не встаёт на чистый лист
+    последнего размера — он повторяется, и других размеров впереди нет.
+
+    sheets — размер листа (w, h) или список размеров по порядку листов
+    (последний повторяется). algorithm — имя из packers.PACKERS.
+
+    Без workers листы заполняются по очереди, каждый — всеми оставшимися
+    фигурами. При workers > 1 фигуры раздаются по нескольким независимым
+    листам сразу (по оценке площади), листы упаковываются параллельно
+    в ProcessPoolExecutor, а неразместившиеся фигуры переходят в следующий раунд.
+
+    Возвращает ([(sheet_w, sheet_h, placed), ...], not_placed).
+    """
+    if isinstance(sheets[0], (int, np.integer)):
+        sheets = [sheets]
+    get_packer(algorithm)
+
+    figure_set = figures if isinstance(figures, FigureSet) else FigureSet.from_figures(figures)
+    remaining = np.arange(len(figure_set))
+    layouts = []
+    number = 0  # номер очередного листа в sheets, пропущенные тоже считаются
+
+    executor = ProcessPoolExecutor(workers) if workers and workers > 1 else None
+    try:
+        while remaining.size:
+            if executor is None:
+                count = 1
+            else:
+                count, area, total = 0, 0, float(((figure_set.width[remaining] + padding) *
+                                                  (figure_set.height[remaining] + padding)).sum())
+                while count < workers and area < total:
+                    w, h = _sheet_size(sheets, number + count)
+                    area += w * h * ROUND_FILL
+                    count += 1
+            sizes = [_sheet_size(sheets, number + k) for k in range(count)]
+            chunks = [remaining] if count == 1 else _split_round(figure_set, remaining, sizes, padding)
+
+            jobs = [(algorithm, w, h, padding, figure_set.take(chunk), params)
+                    for (w, h), chunk in zip(sizes, chunks)]
+            if executor is None:
+                results = [_pack_sheet(*job) for job in jobs]
+            else:
+                results = list(executor.map(_pack_sheet, *zip(*jobs)))
+
+            left = []
+            for (w, h), chunk, (order, x, y, fw, fh, rotated, angle) in zip(sizes, chunks, results):
+                rows = chunk[order]
+                figure_set.set_placement(rows, x, y, fw, fh, rotated, angle)
+                if rows.size:
+                    layouts.append((w, h, rows))
+                left.append(chunk[~np.isin(chunk, rows)])
+
+            placed_now = len(remaining) - sum(len(chunk) for chunk in left)
+            remaining = np.concatenate(left)
+            # Раунд только из листов последнего размера ничего не разместил:
+            # каждая оставшаяся фигура не встала на такой чистый лист
+            if placed_now == 0 and number >= len(sheets) - 1:
+                break
+            number += count
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    if isinstance(figures, FigureSet):
+        items = list(figures)
+    else:
+        items = figures
+        for layout in layouts:
+            for row in layout[2]:
+                apply_placement(figures[row], figure_set.x[row], figure_set.y[row],
+                                figure_set.width[row], figure_set.height[row],
+                                figure_set.rotated[row], figure_set.angle[row])
+
+    sheets_out = [(w, h, [items[row] for row in rows]) for w, h, rows in layouts]
+    return sheets_out, [items[row] for row in remaining]
@@ -0,0 +1,184 @@
+import math
+import numpy as np
+import profiling
+
+
+class OccupancyGrid:
+    """
+    Битовая карта занятости листа с таблицей префиксных сумм (summed-area table):
+    - Каждая размещённая фигура помечает свой габарит, расширенный на padding.
+    - Проверка «свободно ли окно w×h в точке (x, y)» выполняется за O(1).
+    - Поиск первой свободной позиции в строке и на всём листе векторизован.
+    Семантика совпадает с can_place: окно [x, x+w) × [y, y+h) не должно
+    пересекаться с областью [pf.x - padding, pf.x + pf.width + padding) × ...
+    """
+    def __init__(self, sheet_w, sheet_h, padding):
+        self.sheet_w = sheet_w
+        self.sheet_h = sheet_h
+        self.padding = padding
+
+        dtype = np.int32 if sheet_w * sheet_h < 2 ** 31 else np.int64
+        self.occupied = np.zeros((sheet_h, sheet_w), dtype=np.uint8)
+        # sat[i, j] — число занятых клеток в прямоугольнике [0, j) × [0, i)
+        self.sat = np.zeros((sheet_h + 1, sheet_w + 1), dtype=dtype)
+
+    def add(self, f):
+        """Помечает размещённую фигуру (с учётом padding) как занятую."""
+        self.mark(f.x, f.y, f.width, f.height)
+
+    def mark(self, x, y, w, h):
+        p = self.padding
+        x0, y0 = max(x - p, 0), max(y - p, 0)
+        x1, y1 = min(x + w + p, self.sheet_w), min(y + h + p, self.sheet_h)
+        if x0 >= x1 or y0 >= y1:
+            return
+        self.occupied[y0:y1, x0:x1] = 1
+
+        # Пересчитываем префиксные суммы только начиная с изменённой строки
+        rows = np.cumsum(self.occupied[y0:], axis=1, dtype=self.sat.dtype)
+        np.cumsum(rows, axis=0, out=rows)
+        self.sat[y0 + 1:, 1:] = self.sat[y0, 1:] + rows
+
+    def _in_sheet(self, x, y, w, h):
+        p = self.padding
+        return (x >= p and y >= p and
+                x + w + p <= self.sheet_w and y + h + p <= self.sheet_h)
+
+    def window_sum(self, x, y, w, h):
+        s = self.sat
+        return int(s[y + h, x + w] - s[y, x + w] - s[y + h, x] + s[y, x])
+
+    def is_free(self, x, y, w, h):
+        """Свободно ли окно w×h в точке (x, y), включая отступы и границы листа."""
+        if not self._in_sheet(x, y, w, h):
+            return False
+        return self.window_sum(x, y, w, h) == 0
+
+    def _row_sums(self, ys, w, h):
+        """Суммы окон w×h для строк ys и всех допустимых x (матрица len(ys) × nx)."""
+        p = self.padding
+        s = self.sat
+        xs = slice(p, self.sheet_w - w - p + 1)
+        xe = slice(p + w, self.sheet_w - p + 1)
+        top, bottom = s[ys], s[ys + h]
+        return bottom[:, xe] - top[:, xe] - bottom[:, xs] + top[:, xs]
+
+    def first_free_in_row(self, y, w, h):
+        """Наименьший x, при котором окно w×h в строке y свободно, иначе None."""
+        p = self.padding
+        if y < p or y + h + p > self.sheet_h or w + 2 * p > self.sheet_w:
+            return None
+        sums = self._row_sums(np.array([y]), w, h)[0]
+        free = np.flatnonzero(sums == 0)
+        return int(free[0]) + p if free.size else None
+
+    def find_first(self, w, h, block_rows=256):
+        """
+        Первая свободная позиция в порядке перебора greedy_pack:
+        y от sheet_h - h - padding вниз до padding, x слева направо.
+        Строки обрабатываются блоками, чтобы ограничить расход памяти.
+        Возвращает (x, y) или None.
+        """
+        p = self.padding
+        y_top = self.sheet_h - h - p
+        if y_top < p or w + 2 * p > self.sheet_w:
+            return None
+
+        for y_hi in range(y_top, p - 1, -block_rows):
+            ys = np.arange(y_hi, max(y_hi - block_rows, p - 1), -1)
+            if profiling.current is not None:
+                profiling.current.count('grid.rows_checked', len(ys))
+            free = self._row_sums(ys, w, h) == 0
+            rows = np.flatnonzero(free.any(axis=1))
+            if rows.size:
+                row = rows[0]
+                return int(np.argmax(free[row])) + p, int(ys[row])
+        return None
+
+
+# Наибольшее число клеток грубой сетки MultiResGrid при автоматическом выборе шага
+MAX_COARSE_CELLS = 1_000_000
+
+
+class MultiResGrid:
+    """
+    Поиск позиции «от грубого к точному» для больших листов
+    (например, в единицах 0.1 мм):
+    - Грубая сетка (OccupancyGrid с шагом cell) помечает клетку занятой,
+      если её задевает хоть одна занятая точка листа: фигура с отступом,
+      поле листа шириной padding или область за краем листа.
+    - Размеры фигуры округляются вверх до клеток, поэтому свободное грубое
+      окно гарантированно свободно и в исходных единицах.
+    - Найденное окно уточняется в исходных единицах: в его окрестности
+      (на клетку шире) перебираются только позиции-кандидаты у краёв
+      соседних фигур, каждая проверяется по SpatialIndex точно.
+    Время зависит от размера грубой сетки и числа соседей, а не от
+    диапазона координат. Фигуры, которые помещаются только в щель уже
+    грубой клетки, могут остаться неразмещёнными.
+    """
+    def __init__(self, sheet_w, sheet_h, padding, index, cell=None):
+        self.sheet_w = sheet_w
+        self.sheet_h = sheet_h
+        self.padding = padding
+        self.index = index
+        self.cell = max(1, int(cell or math.ceil(math.sqrt(sheet_w * sheet_h / MAX_COARSE_CELLS))))
+        c = self.cell
+        self.coarse = OccupancyGrid(-(-sheet_w // c), -(-sheet_h // c), 0)
+
+        # Поля листа и хвост последней клетки за краем листа
+        p = padding
+        cols_w, rows_h = self.coarse.sheet_w * c, self.coarse.sheet_h * c
+        self._block(0, 0, cols_w, p)
+        self._block(0, 0, p, rows_h)
+        self._block(sheet_w - p, 0, cols_w, rows_h)
+        self._block(0, sheet_h - p, cols_w, rows_h)
+
+    def _block(self, x0, y0, x1, y1):
+        """Помечает занятыми грубые клетки, задевающие [x0, x1) × [y0, y1)."""
+        c = self.cell
+        if x0 >= x1 or y0 >= y1:
+            return
+        cx0, cy0 = x0 // c, y0 // c
+        self.coarse.mark(cx0, cy0, -(-x1 // c) - cx0, -(-y1 // c) - cy0)
+
+    def add(self, f):
+        p = self.padding
+        self._block(f.x - p, f.y - p, f.x + f.width + p, f.y + f.height + p)
+
+    def _refine(self, x, y, w, h):
+        """
+        Лучшая в порядке greedy_pack (больший y, затем меньший x) свободная
+        позиция окна w×h в окрестности грубой позиции (x, y). Оптимум
+        упирается в край окрестности или в край соседней фигуры.
+        """
+        c, p = self.cell, self.padding
+        x0, y0 = max(x - c, p), max(y - c, p)
+        x1 = min(x + w + c, self.sheet_w - p)
+        y1 = min(y + h + c, self.sheet_h - p)
+        boxes = [self.index.boxes[key] for key in self.index.query(x0, y0, x1, y1)]
+
+        ys = {y1 - h} | {by0 - h for _, by0, _, _ in boxes}
+        xs = sorted({x0} | {bx1 for _, _, bx1, _ in boxes if bx1 > x0})
+        checks = 0
+        try:
+            for cy in sorted((v for v in ys if y0 <= v <= y1 - h), reverse=True):
+                if cy < y:
+                    break
+                for cx in xs:
+                    if cx > x1 - w or (cy == y and cx >= x):
+                        break
+                    checks += 1
+                    if not self.index.intersects(cx, cy, cx + w, cy + h):
+                        return cx, cy
+            return x, y
+        finally:
+            if profiling.current is not None:
+                profiling.current.count('multires.refine_checks', checks)
+
+    def find_first(self, w, h):
+        """Свободная позиция (x, y) окна w×h в исходных единицах или None."""
+        c = self.cell
+        pos = self.coarse.find_first(-(-w // c), -(-h // c))
+        if pos is None:
+            return None
+        return self._refine(pos[0] * c, pos[1] * c, w, h)
@@ -0,0 +1,131 @@
+import heapq
+import itertools
+import sys
+import time
+from utils import iter_input
+from shelf_packer import Shelf
+from maximal_rectangles_packer import place_figure
+from free_rectangles import FreeRectangles, HEURISTICS
+from spatial_index import cell_size_for
+
+METHODS = ('shelf', 'maxrects')
+
+# Не больше MIN_CELLS клеток индекса на сторону листа, пока размер фигур неизвестен
+MIN_CELLS = 64
+
+
+class Packer:
+    """
+    Потоковая (онлайн) упаковка на один лист: фигуры подаются по одной
+    или итератором, и каждая размещается сразу, без сортировки всего
+    списка заранее.
+
+    method — 'shelf' (полки, как в shelf_pack) или 'maxrects'
+    (свободные прямоугольники, как в maximal_rectangles_packer).
+    lookahead — размер окна: сессия держит до lookahead фигур и первой
+    ставит самую крупную из них (по высоте для полок, по большей стороне
+    для MaxRects) — приближение сортировки офлайн-упаковщиков.
+    При lookahead=0 фигура ставится в момент поступления.
+
+    Память ограничена окном и состоянием листа: списки размещённых
+    фигур не хранятся, ведутся только счётчики.
+    """
+
+    def __init__(self, sheet_w, sheet_h, padding, method='maxrects', heuristic='bssf',
+                 lookahead=0, cell_size=None):
+        if method not in METHODS:
+            raise ValueError(f"Unknown method: {method}. Available: {', '.join(METHODS)}")
+        if heuristic not in HEURISTICS:
+            raise ValueError(f"Unknown heuristic: {heuristic}")
+        self.sheet_w = sheet_w
+        self.sheet_h = sheet_h
+        self.padding = padding
+        self.method = method
+        self.heuristic = heuristic
+        self.lookahead = lookahead
+        self.cell_size = cell_size
+        self.placed_count = 0
+        self.not_placed_count = 0
+        self._state = Shelf(sheet_w, sheet_h, padding) if method == 'shelf' else None
+        self._window = []
+        self._order = itertools.count()
+
+    def _key(self, f):
+        return f.height if self.method == 'shelf' else max(f.width, f.height)
+
+    def _place(self, f):
+        if self._state is None:
+            # Размер клетки индекса оценивается по первым поступившим фигурам;
+            # снизу он ограничен долей листа, чтобы по одной-двум мелким
+            # фигурам не получить слишком мелкую сетку
+            cell_size = self.cell_size or max(
+                cell_size_for([f] + [item[2] for item in self._window], self.padding),
+                max(self.sheet_w, self.sheet_h) // MIN_CELLS)
+            self._state = FreeRectangles(self.sheet_w, self.sheet_h, cell_size)
+
+        if self.method == 'shelf':
+            ok = self._state.place(f)
+        else:
+            ok = place_figure(self._state, f, self.padding, self.heuristic)
+        if ok:
+            self.placed_count += 1
+        else:
+            self.not_placed_count += 1
+        return f, ok
+
+    def _pop(self):
+        return heapq.heappop(self._window)[2]
+
+    def add(self, f):
+        """
+        Принимает фигуру. Возвращает список решений [(figure, placed)],
+        ставших известными сейчас: пустой, пока окно не заполнено.
+        """
+        if self.lookahead <= 0:
+            return [self._place(f)]
+        heapq.heappush(self._window, (-self._key(f), next(self._order), f))
+        if len(self._window) > self.lookahead:
+            return [self._place(self._pop())]
+        return []
+
+    def flush(self):
+        """Размещает все фигуры, оставшиеся в окне."""
+        decisions = []
+        while self._window:
+            decisions.append(self._place(self._pop()))
+        return decisions
+
+    def pack(self, figures):
+        """
+        Генератор: размещает фигуры из итератора (или пакетов-списков)
+        по мере поступления и сразу отдаёт (figure, placed).
+        В конце дозавершает окно.
+        """
+        for item in figures:
+            batch = item if hasattr(item, '__iter__') else (item,)
+            for f in batch:
+                yield from self.add(f)
+        yield from self.flush()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Использование: python online_packer.py input.txt [lookahead]")
+        sys.exit(1)
+
+    sheet_w, sheet_h, padding, figures = iter_input(sys.argv[1])
+    lookahead = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    session = Packer(sheet_w, sheet_h, padding, lookahead=lookahead)
+
+    start = time.perf_counter()
+    first = None
+    for f, ok in session.pack(figures):
+        if first is None:
+            first = time.perf_counter() - start
+        if ok:
+            print(f"{f.id}: x={f.x}, y={f.y}" + (" (повёрнута)" if f.rotated else ""))
+        else:
+            print(f"{f.id}: не помещается")
+
+    print(f"\n⏱ Первое размещение через {first * 1000:.2f} мс" if first is not None else "")
+    print(f"✅ Размещено: {session.placed_count}, ❌ не размещено: {session.not_placed_count}")
@@ -0,0 +1,222 @@
+import math
+import os
+import sys
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from utils import read_input
+from figure_set import FigureSet, TYPE_CODES
+from packers import get_packer
+from metrics import shape_areas
+from maximal_rectangles_packer import write_output, calculate_area_stats
+from visualize import visualize
+
+OBJECTIVES = ('sheets', 'area')
+
+# Порядок, в котором упаковщики сортируют фигуры сами (стартовая точка поиска)
+SORT_KEYS = {
+    'shelf': lambda width, height: height,
+    'greedy': np.maximum,
+    'maxrects': np.maximum,
+    'skyline': np.maximum,
+}
+
+# Задача рабочего процесса: передаётся один раз при запуске процесса
+_job = None
+
+
+def _init_worker(job):
+    global _job
+    _job = job
+
+
+def _oriented(figure_set, order, flips):
+    """Копия строк order, у прямоугольников с флагом flips стороны переставлены."""
+    run = figure_set.take(order)
+    swap = flips[order] & (run.types == TYPE_CODES['rectangle'])
+    run.width[swap], run.height[swap] = run.height[swap], run.width[swap]
+    return run
+
+
+def evaluate(job, order, flips):
+    """
+    Быстрая оценка одного порядка: упаковка без сортировки, статистики
+    и отрисовки. Меньше — лучше.
+    objective='sheets' — число листов при последовательной упаковке плюс
+    заполнение последнего листа (почти пустой последний лист лучше);
+    objective='area' — минус доля площади одного листа под размещёнными фигурами.
+    Площади точные (metrics.shape_areas), посчитаны один раз на задание.
+    """
+    figure_set, areas, sheet_w, sheet_h, padding, algorithm, params, objective, max_sheets = job
+    packer = get_packer(algorithm)
+    remaining = list(_oriented(figure_set, order, flips))
+    # Строка копии i — это фигура order[i] исходного набора
+    run_areas = areas[order]
+    sheet_area = sheet_w * sheet_h
+
+    def filled(placed):
+        return run_areas[[f.index for f in placed]].sum() / sheet_area
+
+    if objective == 'area':
+        placed, _ = packer(sheet_w, sheet_h, padding, remaining, sort=False, **params)
+        return -filled(placed)
+
+    sheets = 0
+    fill = 0.0
+    while remaining and sheets < max_sheets:
+        placed, remaining = packer(sheet_w, sheet_h, padding, remaining, sort=False, **params)
+        if not placed:
+            break
+        sheets += 1
+        fill = filled(placed)
+    # Фигуры, которые не встали даже на пустой лист, штрафуются одинаково
+    return sheets + fill + len(remaining)
+
+
+def _evaluate_in_worker(order, flips):
+    return evaluate(_job, order, flips)
+
+
+def _neighbour(rng, order, flips, rectangles):
+    """Соседнее решение: перестановка двух фигур, перенос отрезка или поворот."""
+    order, flips = order.copy(), flips.copy()
+    n = len(order)
+    move = rng.integers(3) if len(rectangles) else rng.integers(2)
+    if move == 0:
+        i, j = rng.integers(n, size=2)
+        order[i], order[j] = order[j], order[i]
+    elif move == 1:
+        i, j = sorted(rng.integers(n, size=2))
+        k = rng.integers(n - (j - i))
+        segment = order[i:j + 1]
+        rest = np.concatenate([order[:i], order[j + 1:]])
+        order = np.concatenate([rest[:k], segment, rest[k:]])
+    else:
+        r = rectangles[rng.integers(len(rectangles))]
+        flips[r] = not flips[r]
+    return order, flips
+
+
+def optimize_order(sheet_w, sheet_h, padding, figures, algorithm='maxrects', objective='sheets',
+                   budget=10.0, workers=None, batch=None, patience=30, seed=0,
+                   temperature=0.05, cooling=0.97, max_sheets=1000, **params):
+    """
+    Поиск порядка фигур и поворотов прямоугольников имитацией отжига.
+    На каждом шаге строится пакет соседних решений (по числу процессов),
+    пакет оценивается параллельно в ProcessPoolExecutor, лучший сосед
+    принимается по правилу Метрополиса. Поиск начинается с собственного
+    порядка упаковщика, поэтому результат не хуже обычного запуска.
+    Остановка — по бюджету времени budget (с) или если лучший результат
+    не улучшался patience шагов.
+
+    Возвращает словарь: order (номера фигур figures), flips (повороты),
+    score, baseline (оценка исходного порядка), steps, evaluations, elapsed.
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective: {objective}. Available: {', '.join(OBJECTIVES)}")
+    get_packer(algorithm)
+    start = time.perf_counter()
+    figure_set = figures if isinstance(figures, FigureSet) else FigureSet.from_figures(figures)
+    n = len(figure_set)
+    workers = workers or os.cpu_count() or 1
+    batch = batch or max(workers, 4)
+    rng = np.random.default_rng(seed)
+    job = (figure_set, shape_areas(figure_set), sheet_w, sheet_h, padding, algorithm, params,
+           objective, max_sheets)
+
+    key = SORT_KEYS[algorithm](figure_set.width, figure_set.height)
+    order = np.argsort(-key, kind='stable')
+    flips = np.zeros(n, dtype=bool)
+    rectangles = np.flatnonzero(figure_set.types == TYPE_CODES['rectangle'])
+
+    score = baseline = evaluate(job, order, flips)
+    best = (score, order, flips)
+    steps = evaluations = stale = 0
+    if n < 2:
+        return _result(best, baseline, steps, 1, start)
+
+    executor = (ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(job,))
+                if workers > 1 else None)
+    try:
+        while time.perf_counter() - start < budget and stale < patience:
+            candidates = [_neighbour(rng, order, flips, rectangles) for _ in range(batch)]
+            if executor is None:
+                scores = [evaluate(job, *c) for c in candidates]
+            else:
+                scores = list(executor.map(_evaluate_in_worker, *zip(*candidates)))
+            evaluations += len(candidates)
+            steps += 1
+
+            k = int(np.argmin(scores))
+            delta = scores[k] - score
+            if delta <= 0 or rng.random() < math.exp(-delta / max(temperature, 1e-12)):
+                score, (order, flips) = scores[k], candidates[k]
+            temperature *= cooling
+
+            if score < best[0]:
+                best = (score, order, flips)
+                stale = 0
+            else:
+                stale += 1
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return _result(best, baseline, steps, evaluations + 1, start)
+
+
+def _result(best, baseline, steps, evaluations, start):
+    score, order, flips = best
+    return {
+        'order': order,
+        'flips': flips,
+        'score': score,
+        'baseline': baseline,
+        'steps': steps,
+        'evaluations': evaluations,
+        'elapsed': time.perf_counter() - start,
+    }
+
+
+def apply_order(figures, order, flips):
+    """
+    Список фигур в найденном порядке; у прямоугольников с флагом flips
+    стороны переставлены. Результат передаётся упаковщику с sort=False,
+    после упаковки флаг rotated исправляется через finish_rotation.
+    """
+    result = []
+    for i in order:
+        f = figures[i]
+        if flips[i] and f.type == 'rectangle':
+            f.width, f.height = f.height, f.width
+        result.append(f)
+    return result
+
+
+def finish_rotation(figures, order, flips):
+    """Учитывает предварительный поворот: rotated = поворот упаковщика XOR flips."""
+    for i in order:
+        f = figures[i]
+        if flips[i] and f.type == 'rectangle':
+            f.rotated = not f.rotated
+
+
+if __name__ == "__main__":
+    input_file = input("Введите имя входного файла (например, input.txt): ").strip()
+    if not input_file or not os.path.exists(input_file):
+        print(f"Файл '{input_file}' не найден. Завершение.")
+        sys.exit(1)
+
+    sheet_w, sheet_h, padding, figures = read_input(input_file)
+    result = optimize_order(sheet_w, sheet_h, padding, figures, objective='area')
+    print(f"\n🔎 Оценка: {result['baseline']:.4f} → {result['score']:.4f} "
+          f"(шагов: {result['steps']}, вариантов: {result['evaluations']}, "
+          f"{result['elapsed']:.2f} с)")
+
+    ordered = apply_order(figures, result['order'], result['flips'])
+    placed, not_placed = get_packer('maxrects')(sheet_w, sheet_h, padding, ordered, sort=False)
+    finish_rotation(figures, result['order'], result['flips'])
+    write_output(placed, path='output_optimized.json')
+    calculate_area_stats(sheet_w, sheet_h, placed, len(figures), not_placed, padding,
+                         free_space='--free-space' in sys.argv)
+    visualize(sheet_w, sheet_h, placed, padding, output_file='layout_optimized.png')
@@ -0,0 +1,334 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit
+
+# Размер очереди заданий: при переполнении новое задание отклоняется (429)
+QUEUE_SIZE = 64
+
+# Наибольший размер тела запроса
+MAX_BODY = 64 * 2**20
+
+REASONS = {200: 'OK', 202: 'Accepted', 400: 'Bad Request', 404: 'Not Found',
+           405: 'Method Not Allowed', 409: 'Conflict', 413: 'Payload Too Large',
+           429: 'Too Many Requests'}
+
+
+def _warm_up():
+    """Импорт упаковщиков в рабочем процессе — один раз, до первого задания."""
+    import packers  # noqa: F401
+    return os.getpid()
+
+
+def run_job(spec):
+    """
+    Выполняет одно задание в рабочем процессе.
+    spec: algorithm, params, и либо path (входной файл), либо sheet_w,
+    sheet_h, padding и figures — строки фигур в формате входного файла.
+    Возвращает размещение (id, type, x, y, width, height, rotated),
+    неразмещённые id, метрики и время упаковки.
+    """
+    from utils import read_input, parse_figure
+    from packers import get_packer
+    from metrics import layout_metrics
+
+    if 'path' in spec:
+        sheet_w, sheet_h, padding, figures = read_input(spec['path'])
+    else:
+        sheet_w, sheet_h, padding = spec['sheet_w'], spec['sheet_h'], spec.get('padding', 0)
+        figures = [parse_figure(line) for line in spec['figures']]
+    packer = get_packer(spec.get('algorithm', 'maxrects'))
+
+    start = time.perf_counter()
+    placed, not_placed = packer(sheet_w, sheet_h, padding, figures, **spec.get('params', {}))
+    elapsed = time.perf_counter() - start
+
+    return {
+        'sheet_w': sheet_w,
+        'sheet_h': sheet_h,
+        'padding': padding,
+        'placed': [{'id': f.id, 'type': f.type, 'x': f.x, 'y': f.y, 'width': f.width,
+                    'height': f.height, 'rotated': bool(getattr(f, 'rotated', False))}
+                   for f in placed],
+        'not_placed': [f.id for f in not_placed],
+        'metrics': layout_metrics(sheet_w, sheet_h, placed),
+        'time': elapsed,
+    }
+
+
+class Job:
+    def __init__(self, job_id, spec):
+        self.id = job_id
+        self.spec = spec
+        self.status = 'queued'
+        self.result = None
+        self.error = None
+        self.future = None
+        self.submitted = time.time()
+        self.finished = None
+
+    def to_dict(self, result=True):
+        data = {'id': self.id, 'status': self.status, 'algorithm': self.spec.get('algorithm', 'maxrects'),
+                'submitted': self.submitted, 'finished': self.finished}
+        if self.error is not None:
+            data['error'] = self.error
+        if result and self.result is not None:
+            data['result'] = self.result
+        return data
+
+
+class PackService:
+    """
+    Локальный сервис упаковки:
+    - задания принимаются в ограниченную очередь asyncio.Queue; если она
+      полна, задание отклоняется сразу (обратное давление на клиента);
+    - диспетчеры (по одному на процесс) передают задания в заранее
+      запущенный ProcessPoolExecutor, где упаковщики уже импортированы;
+    - состояние задания: queued → running → done / failed / cancelled.
+    Отмена задания в очереди снимает его до запуска. Выполняющееся
+    задание переходит в cancelling: процесс пула доводит упаковку до
+    конца, и всё это время диспетчер занят им (новое задание на этот
+    процесс не передаётся); после этого результат отбрасывается и
+    задание становится cancelled.
+    Завершённые задания рассылаются подписчикам потока /stream; хранится
+    не больше keep завершённых заданий.
+    """
+
+    def __init__(self, workers=None, queue_size=QUEUE_SIZE, keep=1000):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue = asyncio.Queue(queue_size)
+        self.jobs = {}
+        self.keep = keep
+        self.pool = None
+        self._ids = itertools.count(1)
+        self._subscribers = set()
+        self._dispatchers = []
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        self.pool = ProcessPoolExecutor(self.workers)
+        # Прогрев: все процессы пула запускаются и импортируют упаковщики заранее
+        await asyncio.gather(*(loop.run_in_executor(self.pool, _warm_up)
+                               for _ in range(self.workers)))
+        self._dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._dispatchers:
+            task.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+
+    def submit(self, spec):
+        """Ставит задание в очередь; None, если очередь полна."""
+        job = Job(next(self._ids), spec)
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            return None
+        self.jobs[job.id] = job
+        return job
+
+    def cancel(self, job):
+        """
+        Отменяет задание: в очереди — сразу (cancelled), выполняющееся —
+        после того как процесс пула закончит (cancelling → cancelled).
+        False, если задание уже завершено или уже отменяется.
+        """
+        if job.status in ('done', 'failed', 'cancelled', 'cancelling'):
+            return False
+        if job.status == 'queued':
+            job.status = 'cancelled'
+            self._finish(job)
+        else:
+            job.status = 'cancelling'
+            # Задание, которое пул ещё не начал, снимается сразу
+            job.future.cancel()
+        return True
+
+    def _finish(self, job):
+        job.finished = time.time()
+        self._publish(job)
+        self._forget_old()
+
+    def _forget_old(self):
+        """Хранит не больше keep завершённых заданий."""
+        finished = [j for j in self.jobs.values() if j.status in ('done', 'failed', 'cancelled')]
+        for job in finished[:max(0, len(finished) - self.keep)]:
+            del self.jobs[job.id]
+
+    def _publish(self, job):
+        for subscriber in self._subscribers:
+            subscriber.put_nowait(job)
+
+    async def _dispatch(self):
+        while True:
+            job = await self.queue.get()
+            try:
+                if job.status == 'cancelled':
+                    continue
+                job.status = 'running'
+                job.future = self.pool.submit(run_job, job.spec)
+                try:
+                    # Ожидание не прерывается отменой задания: пока процесс
+                    # пула считает, диспетчер не берёт следующее
+                    result = await asyncio.wrap_future(job.future)
+                except asyncio.CancelledError:
+                    # Отменён сам диспетчер (stop), а не задание до запуска
+                    if not job.future.cancelled():
+                        raise
+                except Exception as e:
+                    if job.status != 'cancelling':
+                        job.status = 'failed'
+                        job.error = f"{type(e).__name__}: {e}"
+                else:
+                    if job.status != 'cancelling':
+                        job.result = result
+                        job.status = 'done'
+                if job.status == 'cancelling':
+                    job.status = 'cancelled'
+                self._finish(job)
+            finally:
+                self.queue.task_done()
+
+    async def wait(self, job):
+        """Ждёт завершения задания (для GET /jobs/<id>?wait=1)."""
+        if job.status in ('done', 'failed', 'cancelled'):
+            return
+        updates = asyncio.Queue()
+        self._subscribers.add(updates)
+        try:
+            while job.status not in ('done', 'failed', 'cancelled'):
+                await updates.get()
+        finally:
+            self._subscribers.discard(updates)
+
+    # --- HTTP ---
+
+    async def handle(self, reader, writer):
+        try:
+            request = await self._read_request(reader)
+            if request is None:
+                return
+            method, target, body = request
+            url = urlsplit(target)
+            await self._route(writer, method, url.path.rstrip('/') or '/', url.query, body)
+        except ValueError as e:
+            await self._respond(writer, 400, {'error': str(e)})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, _ = line.decode('latin-1').split()
+        except ValueError:
+            raise ValueError("Malformed request line")
+        length = 0
+        while True:
+            header = await reader.readline()
+            if header in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = header.decode('latin-1').partition(':')
+            if name.strip().lower() == 'content-length':
+                length = int(value)
+        if length > MAX_BODY:
+            raise ValueError("Request body too large")
+        body = await reader.readexactly(length) if length else b''
+        return method.upper(), target, body
+
+    async def _respond(self, writer, status, data):
+        payload = json.dumps(data, ensure_ascii=False).encode()
+        writer.write(f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                     f"Content-Type: application/json\r\n"
+                     f"Content-Length: {len(payload)}\r\n"
+                     f"Connection: close\r\n\r\n".encode() + payload)
+        await writer.drain()
+
+    async def _route(self, writer, method, path, query, body):
+        parts = path.strip('/').split('/')
+        if parts == ['jobs'] and method == 'POST':
+            spec = json.loads(body or b'{}')
+            if not isinstance(spec, dict) or not ('path' in spec or 'figures' in spec):
+                raise ValueError("Job must contain 'path' or 'figures'")
+            job = self.submit(spec)
+            if job is None:
+                return await self._respond(writer, 429, {'error': 'queue is full',
+                                                         'queued': self.queue.qsize()})
+            return await self._respond(writer, 202, job.to_dict())
+        if parts == ['jobs'] and method == 'GET':
+            return await self._respond(writer, 200, {
+                'queued': self.queue.qsize(), 'workers': self.workers,
+                'jobs': [job.to_dict(result=False) for job in self.jobs.values()]})
+        if parts == ['stream'] and method == 'GET':
+            return await self._stream(writer)
+        if len(parts) == 2 and parts[0] == 'jobs':
+            job = self.jobs.get(int(parts[1])) if parts[1].isdigit() else None
+            if job is None:
+                return await self._respond(writer, 404, {'error': 'no such job'})
+            if method == 'GET':
+                if 'wait=1' in query.split('&'):
+                    await self.wait(job)
+                return await self._respond(writer, 200, job.to_dict())
+            if method == 'DELETE':
+                if not self.cancel(job):
+                    return await self._respond(writer, 409, job.to_dict(result=False))
+                # Выполняющееся задание отменится, когда процесс пула закончит
+                status = 202 if job.status == 'cancelling' else 200
+                return await self._respond(writer, status, job.to_dict(result=False))
+            return await self._respond(writer, 405, {'error': 'method not allowed'})
+        return await self._respond(writer, 404, {'error': 'not found'})
+
+    async def _stream(self, writer):
+        """Поток JSON Lines: по строке на каждое завершённое задание."""
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n"
+                     b"Connection: close\r\n\r\n")
+        await writer.drain()
+        updates = asyncio.Queue()
+        self._subscribers.add(updates)
+        try:
+            while True:
+                job = await updates.get()
+                writer.write(json.dumps(job.to_dict(), ensure_ascii=False).encode() + b'\n')
+                await writer.drain()
+        finally:
+            self._subscribers.discard(updates)
+
+
+async def serve(host='127.0.0.1', port=8765, unix=None, workers=None, queue_size=QUEUE_SIZE):
+    service = PackService(workers, queue_size)
+    await service.start()
+    if unix:
+        server = await asyncio.start_unix_server(service.handle, path=unix)
+        where = unix
+    else:
+        server = await asyncio.start_server(service.handle, host, port)
+        where = f"http://{host}:{port}"
+    print(f"🚀 Сервис упаковки: {where} (процессов: {service.workers}, очередь: {queue_size})")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Локальный сервис упаковки (HTTP + JSON)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help="путь Unix-сокета вместо TCP")
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--queue', type=int, default=QUEUE_SIZE)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, args.workers, args.queue))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,21 @@
+from shelf_packer import shelf_pack
+from greedy_packer import greedy_pack
+from maximal_rectangles_packer import maximal_rectangles_packer
+from skyline_packer import skyline_pack
+from raster_packer import raster_pack
+
+# Все упаковщики имеют сигнатуру (sheet_w, sheet_h, padding, figures, **params)
+# и возвращают (placed, not_placed)
+PACKERS = {
+    'shelf': shelf_pack,
+    'greedy': greedy_pack,
+    'maxrects': maximal_rectangles_packer,
+    'skyline': skyline_pack,
+    'raster': raster_pack,
+}
+
+
+def get_packer(name):
+    if name not in PACKERS:
+        raise ValueError(f"Unknown algorithm: {name}. Available: {', '.join(PACKERS)}")
+    return PACKERS[name]
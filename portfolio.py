@@ -0,0 +1,208 @@
+import multiprocessing
+import os
+import sys
+import time
+import numpy as np
+from multiprocessing.connection import wait
+from utils import read_input, apply_placement
+from figure_set import FigureSet
+from packers import PACKERS, get_packer
+from metrics import shape_areas
+from maximal_rectangles_packer import write_output, calculate_area_stats
+from visualize import visualize
+
+
+def _engine_process(conn, algorithm, params, sheet_w, sheet_h, padding, figure_set):
+    """
+    Рабочий процесс одного движка: упаковка и отправка результата
+    в собственный канал conn (один на движок, поэтому остановка другого
+    процесса посреди отправки не портит этот канал).
+    """
+    try:
+        figures = list(figure_set)
+        start = time.perf_counter()
+        placed, _ = get_packer(algorithm)(sheet_w, sheet_h, padding, figures, **params)
+        elapsed = time.perf_counter() - start
+        order = np.array([f.index for f in placed], dtype=np.int64)
+        message = (None, elapsed, order, figure_set.x, figure_set.y,
+                   figure_set.width, figure_set.height, figure_set.rotated, figure_set.angle)
+    except Exception as e:
+        message = (f"{type(e).__name__}: {e}", None, None, None, None, None, None, None, None)
+    conn.send(message)
+    conn.close()
+
+
+def _receive(conn, label, process, status, timings):
+    """
+    Читает результат движка из его канала и отмечает состояние.
+    Возвращает (elapsed, order, columns) или None, если движок упал.
+    """
+    try:
+        error, elapsed, order, *columns = conn.recv()
+    except EOFError:
+        # Процесс завершился, ничего не отправив
+        process.join()
+        status[label] = f'failed: exit code {process.exitcode}'
+        return None
+    if error is not None:
+        status[label] = f'failed: {error}'
+        return None
+    status[label] = 'done'
+    timings[label] = elapsed
+    return elapsed, order, columns
+
+
+def default_engines():
+    """Все зарегистрированные упаковщики с параметрами по умолчанию."""
+    return [(name, name, {}) for name in PACKERS]
+
+
+def race(sheet_w, sheet_h, padding, figures, deadline=0.5, engines=None):
+    """
+    Запускает движки одновременно, каждый в своём процессе, и по мере
+    завершения отдаёт улучшения: сначала самый быстрый результат,
+    затем каждый лучший (по числу размещённых, затем по заполнению).
+    Каждый движок отдаёт результат через собственный канал (Pipe).
+    К дедлайну (deadline секунд) уже отправленные результаты забираются
+    без ожидания, ещё считающие процессы останавливаются.
+
+    engines — список (метка, имя упаковщика, параметры); по умолчанию
+    все packers.PACKERS. Генератор отдаёт словари с ключами engine,
+    placed (номера строк набора в порядке размещения), utilization,
+    columns (x, y, width, height, rotated, angle) и timings — время движков,
+    завершившихся к этому моменту. После дедлайна отдаётся итог с
+    ключом final=True и состоянием всех движков в status: 'done',
+    'failed: ...' (ошибка или процесс завершился без результата) или
+    'cancelled' (остановлен по дедлайну).
+    """
+    start = time.perf_counter()
+    engines = engines or default_engines()
+    for _, algorithm, _ in engines:
+        get_packer(algorithm)
+    figure_set = figures if isinstance(figures, FigureSet) else FigureSet.from_figures(figures)
+    areas = shape_areas(figure_set)
+
+    processes = {}
+    pending = {}  # канал -> метка движка, результат которого ещё не прочитан
+    for label, algorithm, params in engines:
+        reader, writer = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(
+            target=_engine_process, daemon=True,
+            args=(writer, algorithm, params, sheet_w, sheet_h, padding, figure_set))
+        process.start()
+        # Своя копия конца для записи закрывается: если процесс упадёт,
+        # чтение получит EOFError, а не будет ждать вечно
+        writer.close()
+        processes[label] = process
+        pending[reader] = label
+    channels = list(pending)
+
+    timings = {}
+    status = {label: 'running' for label in processes}
+    best = None
+
+    def consider(label, received):
+        nonlocal best
+        if received is None:
+            return False
+        _, order, columns = received
+        # Заполнение — по точной площади фигур
+        utilization = float(areas[order].sum()) / (sheet_w * sheet_h) * 100
+        if best is None or (len(order), utilization) > (len(best['placed']), best['utilization']):
+            best = {'engine': label, 'placed': order, 'utilization': utilization,
+                    'columns': columns}
+            return True
+        return False
+
+    try:
+        while pending:
+            left = deadline - (time.perf_counter() - start)
+            if left <= 0:
+                break
+            for reader in wait(list(pending), timeout=left):
+                label = pending.pop(reader)
+                if consider(label, _receive(reader, label, processes[label], status, timings)):
+                    yield dict(best, timings=dict(timings), final=False)
+
+        # Дедлайн: без ожидания забираем результаты, которые уже отправлены,
+        # но ещё не прочитаны (например, пока вызывающий код обрабатывал
+        # предыдущее улучшение). Если в канале есть данные, движок уже
+        # досчитал и дописывает результат — recv дождётся только его конца
+        for reader, label in list(pending.items()):
+            process = processes[label]
+            alive = process.is_alive()
+            if reader.poll():
+                del pending[reader]
+                if consider(label, _receive(reader, label, process, status, timings)):
+                    yield dict(best, timings=dict(timings), final=False)
+            elif not alive:
+                del pending[reader]
+                process.join()
+                status[label] = f'failed: exit code {process.exitcode}'
+    finally:
+        # Остались только движки, которые ещё считают
+        for label in pending.values():
+            process = processes[label]
+            if process.is_alive():
+                process.terminate()
+            status[label] = 'cancelled'
+        for process in processes.values():
+            process.join()
+        for reader in channels:
+            reader.close()
+
+    yield dict(best or {'engine': None, 'placed': np.zeros(0, dtype=np.int64),
+                        'utilization': 0.0, 'columns': None},
+               timings=timings, status=status, final=True,
+               elapsed=time.perf_counter() - start)
+
+
+def solve(sheet_w, sheet_h, padding, figures, deadline=0.5, engines=None, on_result=None):
+    """
+    Лучшая раскладка, найденная портфелем движков за deadline секунд.
+    on_result(result) вызывается на каждом промежуточном улучшении.
+    Позиции лучшего результата записываются в фигуры figures.
+    Возвращает (placed, not_placed, report): report содержит engine,
+    utilization, timings, status и elapsed.
+    """
+    for result in race(sheet_w, sheet_h, padding, figures, deadline, engines):
+        if result['final']:
+            break
+        if on_result is not None:
+            on_result(result)
+
+    items = list(figures)
+    order = result['placed']
+    if result['columns'] is not None:
+        x, y, width, height, rotated, angle = result['columns']
+        for row in order:
+            apply_placement(items[row], x[row], y[row], width[row], height[row], rotated[row],
+                            angle[row])
+    placed = [items[row] for row in order]
+    rest = np.setdiff1d(np.arange(len(items)), order)
+    not_placed = [items[row] for row in rest]
+
+    report = {key: result[key] for key in ('engine', 'utilization', 'timings', 'status', 'elapsed')}
+    return placed, not_placed, report
+
+
+if __name__ == "__main__":
+    input_file = input("Введите имя входного файла (например, input.txt): ").strip()
+    if not input_file or not os.path.exists(input_file):
+        print(f"Файл '{input_file}' не найден. Завершение.")
+        sys.exit(1)
+
+    sheet_w, sheet_h, padding, figures = read_input(input_file)
+    placed, not_placed, report = solve(
+        sheet_w, sheet_h, padding, figures, deadline=0.5,
+        on_result=lambda r: print(f"⚡ {r['engine']}: размещено {len(r['placed'])}, "
+                                  f"заполнено {r['utilization']:.2f}%"))
+
+    print(f"\n🏁 Лучший движок: {report['engine']} ({report['elapsed']:.3f} с)")
+    for label, state in report['status'].items():
+        took = report['timings'].get(label)
+        print(f"{label:<12} | {state:<10} | " + (f"{took:.4f} с" if took is not None else "—"))
+    write_output(placed, path='output_portfolio.json')
+    calculate_area_stats(sheet_w, sheet_h, placed, len(figures), not_placed, padding,
+                         free_space='--free-space' in sys.argv)
+    visualize(sheet_w, sheet_h, placed, padding, output_file='layout_portfolio.png')
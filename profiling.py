@@ -0,0 +1,102 @@
+import cProfile
+import json
+import pstats
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+
+# Активный регистратор. Упаковщики читают его один раз за вызов и сообщают
+# счётчики, только если он задан, — без регистратора накладных расходов нет.
+current = None
+
+
+class Recorder:
+    """
+    Регистратор профиля упаковки:
+    - counters — счётчики событий (проверенные позиции, проверки пересечений,
+      разрезания и отсечения свободных прямоугольников и т. п.);
+    - series — значения во времени (например, число свободных прямоугольников
+      после каждого размещения);
+    - phases — суммарное время фаз (parse, sort, pack, stats, render).
+    При profile=True на время записи включается cProfile; его статистику
+    можно сохранить в формате pstats (dump_stats).
+    """
+
+    def __init__(self, profile=False):
+        self.counters = defaultdict(int)
+        self.series = defaultdict(list)
+        self.phases = defaultdict(float)
+        self.profiler = cProfile.Profile() if profile else None
+        self._previous = None
+
+    def __enter__(self):
+        global current
+        self._previous, current = current, self
+        if self.profiler is not None:
+            self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc):
+        global current
+        if self.profiler is not None:
+            self.profiler.disable()
+        current = self._previous
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def sample(self, name, value):
+        self.series[name].append(value)
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] += time.perf_counter() - start
+
+    def to_dict(self):
+        return {
+            'counters': dict(self.counters),
+            'phases': dict(self.phases),
+            'series': {name: {'count': len(values), 'max': max(values), 'last': values[-1]}
+                       for name, values in self.series.items() if values},
+        }
+
+    def merge(self, data):
+        """Добавляет результаты to_dict() другого регистратора (например, из рабочего процесса)."""
+        for name, value in data['counters'].items():
+            self.counters[name] += value
+        for name, value in data['phases'].items():
+            self.phases[name] += value
+
+    def save_json(self, path, series=False):
+        """Сохраняет счётчики и фазы в JSON; series=True — с полными рядами значений."""
+        data = self.to_dict()
+        if series:
+            data['series'] = dict(self.series)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+    def dump_stats(self, path):
+        """Сохраняет профиль cProfile в файл, который читает pstats / snakeviz."""
+        if self.profiler is None:
+            raise ValueError("Recorder was created without profile=True")
+        self.profiler.dump_stats(path)
+
+    def print_stats(self, limit=20, sort='cumulative'):
+        if self.profiler is not None:
+            pstats.Stats(self.profiler).sort_stats(sort).print_stats(limit)
+
+
+def phase(name):
+    """Таймер фазы активного регистратора; без регистратора — пустой контекст."""
+    return current.phase(name) if current is not None else nullcontext()
+
+
+def format_counters(data):
+    """Короткая строка 'имя=значение' по счётчикам и рядам (максимум) из to_dict()."""
+    items = sorted(data['counters'].items())
+    items += [(f"{name}.max", summary['max']) for name, summary in sorted(data['series'].items())]
+    return ', '.join(f"{name}={value}" for name, value in items)
@@ -0,0 +1,211 @@
+import math
+import os
+import sys
+from collections import OrderedDict
+from functools import lru_cache
+import numpy as np
+from utils import read_input, rotate_vertices
+from visualize import visualize
+from render import shape_mask
+from maximal_rectangles_packer import calculate_area_stats
+import layout_io
+import profiling
+
+# Повороты фигур (в градусах), которые перебирает движок
+ROTATIONS = (0, 90, 180, 270)
+
+# Число проб на сторону клетки при растеризации: клетка занята,
+# если внутрь фигуры попала хотя бы одна проба
+SUPERSAMPLE = 4
+
+# Память под кэш спектров масок SheetMask, байт. Каждый спектр — rfft2
+# размером с лист (complex128, ≈ 8 байт на клетку листа), поэтому число
+# спектров в кэше зависит от размера листа; хотя бы один держится всегда
+KERNEL_CACHE_BYTES = 256 * 2**20
+
+
+def _dilate(mask, r):
+    """Расширение маски на r клеток кругом — так в маску входит отступ."""
+    if r <= 0:
+        return mask
+    h, w = mask.shape
+    out = np.zeros((h + 2 * r, w + 2 * r), dtype=bool)
+    for dy in range(-r, r + 1):
+        for dx in range(-r, r + 1):
+            if dx * dx + dy * dy <= r * r:
+                out[r + dy:r + dy + h, r + dx:r + dx + w] |= mask
+    return out
+
+
+@lru_cache(maxsize=4096)
+def shape_masks(kind, width, height, radius, vertices, cell, pad_cells):
+    """
+    Маски фигуры в клетках размера cell (кэшируются):
+    core — сама фигура, padded — фигура, расширенная на pad_cells клеток.
+    vertices — кортеж вершин для треугольников и многоугольников.
+    """
+    rows, cols = max(1, math.ceil(height / cell)), max(1, math.ceil(width / cell))
+    s = SUPERSAMPLE
+    fine = shape_mask(kind, width, height, radius, list(vertices) if vertices else None,
+                      s / cell, 0, 0, cols * s, rows * s, 0, 0)
+    core = fine.reshape(rows, s, cols, s).any(axis=(1, 3))
+    return core, _dilate(core, pad_cells)
+
+
+def _variants(f, rotations, cell, pad_cells):
+    """
+    Варианты поворота фигуры: (угол, width, height, vertices, core, padded).
+    Совпадающие маски (например, прямоугольник на 180°) отбрасываются.
+    """
+    result = []
+    seen = set()
+    for angle in rotations:
+        turns = angle // 90
+        if f.type == 'circle':
+            if angle:
+                continue
+            w = h = 2 * f.radius
+            vertices = None
+        elif f.type == 'rectangle':
+            w, h = (f.height, f.width) if turns % 2 else (f.width, f.height)
+            vertices = None
+        else:
+            vertices = tuple(rotate_vertices(f.vertices, turns))
+            w = max(x for x, _ in vertices)
+            h = max(y for _, y in vertices)
+        core, padded = shape_masks(f.type, w, h, getattr(f, 'radius', 0) if f.type == 'circle' else 0,
+                                   vertices, cell, pad_cells)
+        key = (core.shape, core.tobytes())
+        if key in seen:
+            continue
+        seen.add(key)
+        result.append((angle, w, h, vertices, core, padded))
+    return result
+
+
+class SheetMask:
+    """
+    Маска занятости листа в клетках размера cell.
+    Столкновения маски фигуры со всеми позициями листа считаются одной
+    взаимной корреляцией через FFT. Спектр листа пересчитывается только
+    после размещения, спектры масок фигур кэшируются (LRU в пределах
+    KERNEL_CACHE_BYTES).
+    """
+
+    def __init__(self, sheet_w, sheet_h, cell):
+        self.rows, self.cols = sheet_h // cell, sheet_w // cell
+        self.occupied = np.zeros((self.rows, self.cols), dtype=np.float64)
+        self._spectrum = None
+        self._kernels = OrderedDict()
+        # Размер одного спектра: rfft2 хранит cols // 2 + 1 столбцов
+        kernel_bytes = 16 * self.rows * (self.cols // 2 + 1)
+        self._kernel_limit = max(1, KERNEL_CACHE_BYTES // max(1, kernel_bytes))
+
+    def add(self, core, row, col):
+        h, w = core.shape
+        self.occupied[row:row + h, col:col + w][core] = 1.0
+        self._spectrum = None
+
+    def _kernel(self, padded):
+        key = (padded.shape, padded.tobytes())
+        kernel = self._kernels.get(key)
+        if kernel is None:
+            # Перевёрнутая маска: свёртка с ней — это корреляция
+            kernel = np.fft.rfft2(padded[::-1, ::-1].astype(np.float64),
+                                  s=self.occupied.shape)
+            self._kernels[key] = kernel
+            if len(self._kernels) > self._kernel_limit:
+                self._kernels.popitem(last=False)
+        else:
+            self._kernels.move_to_end(key)
+        return kernel
+
+    def free_positions(self, padded):
+        """
+        Булев массив допустимых позиций левого верхнего угла padded-маски
+        (позиции, где маска не задевает ни одной занятой клетки).
+        Размер листа достаточен для циклической свёртки: в допустимой
+        области «заворот» не возникает.
+        """
+        kh, kw = padded.shape
+        if kh > self.rows or kw > self.cols:
+            return None
+        if self._spectrum is None:
+            self._spectrum = np.fft.rfft2(self.occupied)
+        hits = np.fft.irfft2(self._spectrum * self._kernel(padded), s=self.occupied.shape)
+        return hits[kh - 1:, kw - 1:] < 0.5
+
+
+def raster_pack(sheet_w, sheet_h, padding, figures, cell=1, rotations=ROTATIONS, sort=True):
+    """
+    Раскрой по настоящей форме фигур (растровые маски):
+    - каждая фигура растеризуется в маску с клеткой cell (единиц на клетку),
+      отступ добавляется расширением маски; маски кэшируются;
+    - допустимые позиции на листе ищутся корреляцией через FFT для каждого
+      варианта поворота из rotations;
+    - выбирается позиция с наименьшим нижним краем, затем самая левая.
+    Круги, треугольники и многоугольники стыкуются по контуру, а не по габаритам.
+    Фигуры и лист отделены отступом не меньше padding (с точностью до клетки).
+    Позиция записывается как обычно: f.x, f.y — левый верхний угол габарита;
+    угол поворота (из rotations) — в f.angle (у Figure и FigureView это
+    одно состояние с флагом rotated: f.rotated = angle != 0);
+    у повёрнутых многоугольников обновляются vertices, width и height.
+    """
+    cell = max(1, int(cell))
+    pad_cells = math.ceil(padding / cell)
+    sheet = SheetMask(sheet_w, sheet_h, cell)
+    placed = []
+    not_placed = []
+    rec = profiling.current
+
+    if sort:
+        with profiling.phase('sort'):
+            figures = sorted(figures, key=lambda f: max(f.width, f.height), reverse=True)
+
+    for f in figures:
+        best = None
+        for variant in _variants(f, rotations, cell, pad_cells):
+            padded = variant[5]
+            free = sheet.free_positions(padded)
+            if rec is not None:
+                rec.count('raster.correlations')
+            if free is None:
+                continue
+            # Наименьший нижний край — первая строка со свободной позицией
+            free_rows = free.any(axis=1)
+            if not free_rows.any():
+                continue
+            row = int(np.argmax(free_rows))
+            col = int(np.argmax(free[row]))
+            key = (row + padded.shape[0], col)
+            if best is None or key < best[0]:
+                best = (key, row + pad_cells, col + pad_cells, variant)
+
+        if best is None:
+            not_placed.append(f)
+            continue
+
+        _, row, col, (angle, w, h, vertices, core, _) = best
+        sheet.add(core, row, col)
+        if vertices is not None:
+            f.vertices = list(vertices)
+        f.width, f.height = w, h
+        f.x, f.y = col * cell, row * cell
+        f.angle = angle
+        placed.append(f)
+
+    return placed, not_placed
+
+
+if __name__ == "__main__":
+    input_file = input("Введите имя входного файла (например, input.txt): ").strip()
+    if not input_file or not os.path.exists(input_file):
+        print(f"Файл '{input_file}' не найден. Завершение.")
+        sys.exit(1)
+
+    sheet_w, sheet_h, padding, figures = read_input(input_file)
+    placed, not_placed = raster_pack(sheet_w, sheet_h, padding, figures)
+    layout_io.write_output(placed, 'output_raster.json', layout_io.ANGLE_FIELDS)
+    calculate_area_stats(sheet_w, sheet_h, placed, len(figures), not_placed, padding,
+                         free_space='--free-space' in sys.argv)
+    visualize(sheet_w, sheet_h, placed, padding, output_file='layout_raster.png')
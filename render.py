@@ -0,0 +1,213 @@
+import struct
+import zlib
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from xml.sax.saxutils import escape
+
+# Цвета те же, что и в matplotlib-визуализации
+COLORS = {
+    'rectangle': (135, 206, 235),   # skyblue
+    'circle': (144, 238, 144),      # lightgreen
+    'triangle': (240, 128, 128),    # lightcoral
+    'polygon': (255, 165, 0),       # orange
+}
+COLOR_NAMES = {'rectangle': 'skyblue', 'circle': 'lightgreen',
+               'triangle': 'lightcoral', 'polygon': 'orange'}
+
+# Наибольшая сторона растрового изображения в пикселях
+MAX_PIXELS = 4000
+
+# Растровый шрифт 3×5 для номеров фигур
+DIGITS = {
+    '0': ('111', '101', '101', '101', '111'),
+    '1': ('010', '110', '010', '010', '111'),
+    '2': ('111', '001', '111', '100', '111'),
+    '3': ('111', '001', '111', '001', '111'),
+    '4': ('101', '101', '111', '001', '001'),
+    '5': ('111', '100', '111', '001', '111'),
+    '6': ('111', '100', '111', '101', '111'),
+    '7': ('111', '001', '010', '010', '010'),
+    '8': ('111', '101', '111', '101', '111'),
+    '9': ('111', '101', '111', '001', '111'),
+    '-': ('000', '000', '111', '000', '000'),
+}
+
+
+def shapes(figures):
+    """
+    Компактное описание размещённых фигур для отрисовки:
+    (type, id, x, y, width, height, radius, vertices).
+    Его дёшево передавать в рабочие процессы.
+    """
+    result = []
+    for f in figures:
+        if f.x is None:
+            continue
+        radius = f.radius if f.type == 'circle' else 0
+        vertices = f.vertices if f.type in ('triangle', 'polygon') else None
+        result.append((f.type, f.id, f.x, f.y, f.width, f.height, radius, vertices))
+    return result
+
+
+def _label_position(kind, x, y, w, h, radius, vertices):
+    if kind == 'circle':
+        return x + radius, y + radius
+    if vertices:
+        # Центр тяжести вершин (приблизительный, без учёта площади)
+        return (x + sum(vx for vx, _ in vertices) / len(vertices),
+                y + sum(vy for _, vy in vertices) / len(vertices))
+    return x + w / 2, y + h / 2
+
+
+def render_svg(sheet_w, sheet_h, figures, padding, output_file='layout.svg'):
+    """Записывает раскладку в SVG напрямую, без matplotlib."""
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="-2 -2 {sheet_w + 4} {sheet_h + 4}" '
+             f'width="{sheet_w + 4}" height="{sheet_h + 4}">']
+    for kind, fid, x, y, w, h, radius, vertices in shapes(figures):
+        style = f'fill="{COLOR_NAMES[kind]}" stroke="black" stroke-width="1"'
+        if kind == 'rectangle':
+            parts.append(f'<rect x="{x}" y="{y}" width="{w}" height="{h}" {style}/>')
+        elif kind == 'circle':
+            parts.append(f'<circle cx="{x + radius}" cy="{y + radius}" r="{radius}" {style}/>')
+        else:
+            points = ' '.join(f'{x + vx},{y + vy}' for vx, vy in vertices)
+            parts.append(f'<polygon points="{points}" {style}/>')
+        lx, ly = _label_position(kind, x, y, w, h, radius, vertices)
+        parts.append(f'<text x="{lx}" y="{ly}" font-size="8" text-anchor="middle" '
+                     f'dominant-baseline="central">{escape(str(fid))}</text>')
+    parts.append(f'<rect x="0" y="0" width="{sheet_w}" height="{sheet_h}" '
+                 f'fill="none" stroke="red" stroke-width="2"/>')
+    parts.append('</svg>')
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(parts))
+    return output_file
+
+
+def shape_mask(kind, w, h, radius, vertices, scale, x0, y0, nx, ny, x, y):
+    """Маска фигуры на участке пикселей [x0, x0 + nx) × [y0, y0 + ny)."""
+    px = (np.arange(x0, x0 + nx) + 0.5) / scale - x
+    py = (np.arange(y0, y0 + ny) + 0.5) / scale - y
+    u, v = np.meshgrid(px, py)
+    if kind == 'rectangle':
+        return (u >= 0) & (u < w) & (v >= 0) & (v < h)
+    if kind == 'circle':
+        return (u - radius) ** 2 + (v - radius) ** 2 <= radius ** 2
+
+    # Правило чётности пересечений для многоугольника
+    inside = np.zeros(u.shape, dtype=bool)
+    for (ax, ay), (bx, by) in zip(vertices, vertices[1:] + vertices[:1]):
+        if ay == by:
+            continue
+        crosses = (ay > v) != (by > v)
+        at_x = ax + (v - ay) * (bx - ax) / (by - ay)
+        inside ^= crosses & (u < at_x)
+    return inside
+
+
+def _outline(mask):
+    inner = mask.copy()
+    inner[1:, :] &= mask[:-1, :]
+    inner[:-1, :] &= mask[1:, :]
+    inner[:, 1:] &= mask[:, :-1]
+    inner[:, :-1] &= mask[:, 1:]
+    inner[0, :] = inner[-1, :] = False
+    inner[:, 0] = inner[:, -1] = False
+    return mask & ~inner
+
+
+def _draw_text(image, text, cx, cy, size):
+    glyphs = [DIGITS[c] for c in text if c in DIGITS]
+    if not glyphs:
+        return
+    width = (4 * len(glyphs) - 1) * size
+    left, top = int(cx - width / 2), int(cy - 5 * size / 2)
+    for k, glyph in enumerate(glyphs):
+        for row, bits in enumerate(glyph):
+            for col, bit in enumerate(bits):
+                if bit == '1':
+                    gx = left + (4 * k + col) * size
+                    gy = top + row * size
+                    image[max(gy, 0):max(gy + size, 0), max(gx, 0):max(gx + size, 0)] = 0
+
+
+def rasterize(sheet_w, sheet_h, figures, scale=1.5):
+    """Растровое изображение раскладки (массив H × W × 3, uint8)."""
+    scale = min(scale, MAX_PIXELS / max(sheet_w, sheet_h, 1))
+    width, height = max(1, int(round(sheet_w * scale))), max(1, int(round(sheet_h * scale)))
+    image = np.full((height, width, 3), 255, dtype=np.uint8)
+    font = max(1, int(round(2 * scale / 1.5)))
+
+    for kind, fid, x, y, w, h, radius, vertices in shapes(figures):
+        x0, y0 = max(int(x * scale) - 1, 0), max(int(y * scale) - 1, 0)
+        x1 = min(int((x + w) * scale) + 2, width)
+        y1 = min(int((y + h) * scale) + 2, height)
+        if x0 >= x1 or y0 >= y1:
+            continue
+        mask = shape_mask(kind, w, h, radius, vertices, scale, x0, y0, x1 - x0, y1 - y0, x, y)
+        region = image[y0:y1, x0:x1]
+        region[mask] = COLORS[kind]
+        region[_outline(mask)] = 0
+
+        lx, ly = _label_position(kind, x, y, w, h, radius, vertices)
+        if 5 * font < h * scale:
+            _draw_text(image, str(fid), lx * scale, ly * scale, font)
+
+    # Граница листа
+    image[:2, :] = image[-2:, :] = image[:, :2] = image[:, -2:] = (255, 0, 0)
+    return image
+
+
+def write_png(image, output_file):
+    """Кодирует массив H × W × 3 в PNG (zlib + struct, без сторонних библиотек)."""
+    height, width, _ = image.shape
+    raw = np.concatenate([np.zeros((height, 1), dtype=np.uint8),
+                          image.reshape(height, width * 3)], axis=1).tobytes()
+
+    def chunk(tag, data):
+        return (struct.pack('>I', len(data)) + tag + data +
+                struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff))
+
+    with open(output_file, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b'IDAT', zlib.compress(raw, 6)))
+        f.write(chunk(b'IEND', b''))
+    return output_file
+
+
+def render_png(sheet_w, sheet_h, figures, padding, output_file='layout.png', scale=1.5):
+    """Записывает раскладку в PNG через растр NumPy, без matplotlib."""
+    return write_png(rasterize(sheet_w, sheet_h, figures, scale), output_file)
+
+
+def render(sheet_w, sheet_h, figures, padding, output_file='layout.png'):
+    """Выбирает формат по расширению файла: .svg — SVG, иначе PNG."""
+    if output_file.lower().endswith('.svg'):
+        return render_svg(sheet_w, sheet_h, figures, padding, output_file)
+    return render_png(sheet_w, sheet_h, figures, padding, output_file)
+
+
+class _Shape:
+    """Фигура, восстановленная из компактного описания в рабочем процессе."""
+    __slots__ = ('type', 'id', 'x', 'y', 'width', 'height', 'radius', 'vertices')
+
+    def __init__(self, kind, fid, x, y, width, height, radius, vertices):
+        self.type, self.id, self.x, self.y = kind, fid, x, y
+        self.width, self.height, self.radius, self.vertices = width, height, radius, vertices
+
+
+def _render_job(sheet_w, sheet_h, items, padding, output_file):
+    figures = [_Shape(*item) for item in items]
+    return render(sheet_w, sheet_h, figures, padding, output_file)
+
+
+def render_batch(jobs, workers=None):
+    """
+    Отрисовка множества раскладок в пуле процессов.
+    jobs — список (sheet_w, sheet_h, figures, padding, output_file).
+    Возвращает пути к файлам в порядке jobs.
+    """
+    payload = [(w, h, shapes(figures), padding, output_file)
+               for w, h, figures, padding, output_file in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_render_job, *zip(*payload))) if payload else []
@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from packers import get_packer
+from utils import apply_placement
+from layout_io import angle_of
+
+
+def _shape(f):
+    """Геометрия фигуры без id — по ней фигуры считаются взаимозаменяемыми."""
+    if f.type == 'circle':
+        return (f.type, f.radius)
+    if f.type in ('triangle', 'polygon'):
+        return (f.type, tuple(tuple(v) for v in f.vertices))
+    return (f.type, f.width, f.height)
+
+
+def job_key(algorithm, params, sheet_w, sheet_h, padding, figures):
+    """
+    Канонический ключ задания: SHA-256 от (алгоритм, параметры, лист,
+    отступ, мультимножество геометрий фигур). Порядок фигур и их id
+    в ключ не входят.
+    Возвращает (key, order): order — номера фигур figures в каноническом
+    порядке (отсортированных по геометрии).
+    """
+    shapes = [_shape(f) for f in figures]
+    order = sorted(range(len(figures)), key=shapes.__getitem__)
+    payload = json.dumps([algorithm, sorted(params.items()), sheet_w, sheet_h, padding,
+                          [shapes[i] for i in order]], separators=(',', ':'))
+    return hashlib.sha256(payload.encode()).hexdigest(), order
+
+
+class ResultCache:
+    """
+    Кэш результатов упаковки с двумя уровнями:
+    - в памяти — LRU на max_entries заданий;
+    - на диске — по файлу JSON на задание в directory; при превышении
+      max_bytes удаляются файлы, к которым дольше всего не обращались.
+    Результат хранится по каноническим номерам фигур и при попадании
+    переносится на фигуры вызывающего (с их id). Фигуры одинаковой
+    геометрии взаимозаменяемы, поэтому при повторе с другим порядком
+    одинаковые детали могут поменяться местами.
+    directory=None — только память.
+    """
+
+    def __init__(self, directory='.pack_cache', max_entries=128, max_bytes=256 * 2**20):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._disk_bytes = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._disk_bytes = sum(os.path.getsize(path) for path in self._files())
+
+    def _files(self):
+        return [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                if name.endswith('.json')]
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.json')
+
+    def _remember(self, key, entry):
+        self.memory[key] = entry
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def _load(self, key):
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            return self.memory[key]
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        os.utime(path)
+        self._remember(key, entry)
+        return entry
+
+    def _store(self, key, entry):
+        self._remember(key, entry)
+        if not self.directory:
+            return
+        path = self._path(key)
+        if os.path.exists(path):
+            self._disk_bytes -= os.path.getsize(path)
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(entry, f, separators=(',', ':'))
+        os.replace(tmp, path)
+        self._disk_bytes += os.path.getsize(path)
+        self._evict()
+
+    def _evict(self):
+        if self._disk_bytes <= self.max_bytes:
+            return
+        files = sorted(self._files(), key=os.path.getmtime)
+        for path in files:
+            if self._disk_bytes <= self.max_bytes:
+                break
+            self._disk_bytes -= os.path.getsize(path)
+            os.remove(path)
+
+    def clear(self):
+        self.memory.clear()
+        if self.directory:
+            for path in self._files():
+                os.remove(path)
+            self._disk_bytes = 0
+
+    def _restore(self, entry, figures, order):
+        placed = []
+        # angle (седьмое поле) есть только в записях после его появления
+        for position, x, y, w, h, rotated, *angle in entry['placed']:
+            f = figures[order[position]]
+            apply_placement(f, x, y, w, h, rotated, *angle)
+            placed.append(f)
+        not_placed = [figures[order[position]] for position in entry['not_placed']]
+        return placed, not_placed
+
+    def get(self, algorithm, sheet_w, sheet_h, padding, figures, **params):
+        """
+        Результат из кэша в виде (placed, not_placed) для фигур figures
+        (позиции записываются в сами фигуры) или None.
+        """
+        key, order = job_key(algorithm, params, sheet_w, sheet_h, padding, figures)
+        entry = self._load(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._restore(entry, figures, order)
+
+    def pack(self, algorithm, sheet_w, sheet_h, padding, figures, **params):
+        """Упаковка через кэш: при промахе запускается упаковщик и результат сохраняется."""
+        key, order = job_key(algorithm, params, sheet_w, sheet_h, padding, figures)
+        entry = self._load(key)
+        if entry is not None:
+            self.hits += 1
+            return self._restore(entry, figures, order)
+        self.misses += 1
+
+        position = {id(figures[i]): k for k, i in enumerate(order)}
+        placed, not_placed = get_packer(algorithm)(sheet_w, sheet_h, padding, figures, **params)
+        entry = {
+            'placed': [[position[id(f)], f.x, f.y, f.width, f.height,
+                        bool(getattr(f, 'rotated', False)), angle_of(f)] for f in placed],
+            'not_placed': [position[id(f)] for f in not_placed],
+        }
+        self._store(key, entry)
+        return placed, not_placed
@@ -0,0 +1,176 @@
+from utils import read_input
+from visualize import visualize
+import profiling
+from maximal_rectangles_packer import write_output, calculate_area_stats
+import numpy as np
+import os
+import sys
+
+class Skyline:
+    """
+    Огибающая (skyline) уже размещённых фигур:
+    - Хранится как высота каждой единичной ячейки по x (cells); отрезки
+      огибающей — участки одинаковой высоты, начиная с x = padding.
+    - Каждая деталь занимает габарит, расширенный на padding справа и снизу,
+      а сама огибающая начинается с отступа padding от краёв листа.
+    Для запросов поддерживаются на месте, без перестроения:
+    - уровни levels[k][i] = максимум высот на [i, i + 2^k): деталь
+      поднимает огибающую не ниже текущего максимума под собой, поэтому
+      каждый уровень обновляется одной операцией np.maximum по срезу —
+      O(log W) векторных операций на размещение (W — ширина листа);
+    - префиксные суммы высот (площадь под огибающей).
+    Максимум на любом окне [x, x + bw) — два обращения к уровню
+    k = floor(log2(bw)), площадь — разность префиксных сумм: O(1) на
+    кандидата вместо перестроения таблицы O(S log S) после каждой детали.
+    """
+    def __init__(self, sheet_w, sheet_h, padding):
+        self.sheet_w = sheet_w
+        self.sheet_h = sheet_h
+        self.padding = padding
+        self.cells = np.full(sheet_w, padding, dtype=np.int64)
+        self.levels = [self.cells]
+        span = 1
+        while 2 * span <= sheet_w:
+            prev = self.levels[-1]
+            self.levels.append(np.maximum(prev[:-span], prev[span:]))
+            span *= 2
+        self.area = np.concatenate([[0], np.cumsum(self.cells)])
+        self._starts = None
+
+    def _segments(self):
+        """Начала и концы отрезков огибающей (кэшируются до raise_to)."""
+        if self._starts is None:
+            tail = self.cells[self.padding:]
+            changes = np.flatnonzero(tail[1:] != tail[:-1]) + self.padding + 1
+            self._starts = np.concatenate([[self.padding], changes])
+        starts = self._starts
+        return starts, np.append(starts[1:], self.sheet_w)
+
+    def window_max(self, x, bw):
+        """Максимум высот на окнах [x, x + bw) для массива x."""
+        k = bw.bit_length() - 1
+        level = self.levels[k]
+        return np.maximum(level[x], level[x + bw - (1 << k)])
+
+    def candidates(self, sizes):
+        """
+        Оценивает все позиции для блоков sizes = [(bw, bh, rotated), ...].
+        Кандидаты по x — начала отрезков и позиции, прижатые к их правому концу.
+        Возвращает массивы x, y, bh, waste, rotated для допустимых позиций.
+        """
+        starts, ends = self._segments()
+        out = []
+        for bw, bh, rotated in sizes:
+            if bw > self.sheet_w - self.padding:
+                continue
+            # Оба массива уже отсортированы: слияние и удаление повторов
+            # дешевле np.unique
+            x = np.concatenate([starts, ends - bw])
+            x.sort(kind='stable')
+            x = x[np.concatenate([[True], x[1:] != x[:-1]])]
+            x = x[(x >= self.padding) & (x + bw <= self.sheet_w)]
+            if not len(x):
+                continue
+            y = self.window_max(x, bw)
+            # Площадь под огибающей на [x, x + bw)
+            waste = bw * y - (self.area[x + bw] - self.area[x])
+
+            ok = y + bh <= self.sheet_h
+            n = int(ok.sum())
+            out.append((x[ok], y[ok], np.full(n, bh), waste[ok], np.full(n, rotated)))
+        if not out:
+            return None
+        return [np.concatenate(column) for column in zip(*out)]
+
+    def height_at(self, x):
+        return int(self.cells[x])
+
+    def raise_to(self, x, bw, top):
+        """
+        Поднимает огибающую на отрезке [x, x + bw) до высоты top;
+        top не ниже текущего максимума на этом отрезке.
+        """
+        end = min(x + bw, self.sheet_w)
+        delta = np.cumsum(top - self.cells[x:end])
+        self.area[x + 1:end + 1] += delta
+        self.area[end + 1:] += delta[-1]
+        span = 1
+        for level in self.levels:
+            part = level[max(x - span + 1, 0):end]
+            np.maximum(part, top, out=part)
+            span *= 2
+        self._starts = None
+
+
+def _first_min(*keys):
+    """
+    Индекс первого минимума по ключам в порядке важности — то же, что
+    np.lexsort(keys[::-1])[0], но без полной сортировки кандидатов.
+    """
+    index = np.arange(len(keys[0]))
+    for key in keys:
+        values = key[index]
+        index = index[values == values.min()]
+    return index[0]
+
+
+def skyline_pack(sheet_w, sheet_h, padding, figures, heuristic='bottom_left', sort=True):
+    """
+    Упаковка по огибающей (skyline):
+    heuristic='bottom_left' — самая низкая позиция, затем самая левая;
+    heuristic='min_waste' — минимум площади, теряемой под деталью.
+    Прямоугольники могут поворачиваться, остальные фигуры — по габаритам.
+    sort=False — фигуры ставятся в переданном порядке (без сортировки).
+    """
+    if heuristic not in ('bottom_left', 'min_waste'):
+        raise ValueError(f"Unknown heuristic: {heuristic}")
+
+    skyline = Skyline(sheet_w, sheet_h, padding)
+    rec = profiling.current
+    placed = []
+    not_placed = []
+
+    if sort:
+        with profiling.phase('sort'):
+            figures = sorted(figures, key=lambda f: max(f.width, f.height), reverse=True)
+
+    for f in figures:
+        f.rotated = False
+        sizes = [(f.width + padding, f.height + padding, False)]
+        if f.type == 'rectangle' and f.width != f.height:
+            sizes.append((f.height + padding, f.width + padding, True))
+
+        found = skyline.candidates(sizes)
+        if rec is not None:
+            rec.count('skyline.candidates', 0 if found is None else len(found[0]))
+        if found is None or not len(found[0]):
+            not_placed.append(f)
+            continue
+
+        x, y, bh, waste, rotated = found
+        if heuristic == 'bottom_left':
+            best = _first_min(y + bh, x)
+        else:
+            best = _first_min(waste, y, x)
+
+        if rotated[best]:
+            f.width, f.height = f.height, f.width
+            f.rotated = True
+        f.x, f.y = int(x[best]), int(y[best])
+        skyline.raise_to(f.x, f.width + padding, f.y + f.height + padding)
+        placed.append(f)
+
+    return placed, not_placed
+
+if __name__ == "__main__":
+    input_file = input("Введите имя входного файла (например, input.txt): ").strip()
+    if not input_file or not os.path.exists(input_file):
+        print(f"Файл '{input_file}' не найден. Завершение.")
+        sys.exit(1)
+
+    sheet_w, sheet_h, padding, figures = read_input(input_file)
+    placed, not_placed = skyline_pack(sheet_w, sheet_h, padding, figures)
+    write_output(placed, path='output_skyline.json')
+    calculate_area_stats(sheet_w, sheet_h, placed, len(figures), not_placed, padding,
+                         free_space='--free-space' in sys.argv)
+    visualize(sheet_w, sheet_h, placed, padding, output_file='layout_skyline.png')
@@ -0,0 +1,93 @@
+from collections import defaultdict
+
+
+class SpatialIndex:
+    """
+    Пространственный индекс — равномерная сетка корзин:
+    - Каждый прямоугольник [x0, x1) × [y0, y1) регистрируется во всех
+      клетках сетки, которые он задевает.
+    - Запрос перебирает только клетки запрашиваемой области, поэтому его
+      стоимость зависит от числа соседей, а не от общего числа объектов.
+    Ключом может быть любой хешируемый объект (например, сама фигура).
+    Клетки могут быть вытянутыми (cell_h отличается от cell_size), например
+    полосами на всю ширину листа для запросов по горизонтальным полосам.
+    """
+    def __init__(self, cell_size, cell_h=None):
+        self.cell_size = max(1, cell_size)
+        self.cell_h = max(1, cell_h) if cell_h is not None else self.cell_size
+        self.cells = defaultdict(list)
+        self.boxes = {}
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def __contains__(self, key):
+        return key in self.boxes
+
+    def _cells(self, x0, y0, x1, y1):
+        cw, ch = self.cell_size, self.cell_h
+        cx0, cy0 = int(x0 // cw), int(y0 // ch)
+        cx1 = max(int(-(-x1 // cw)), cx0 + 1)
+        cy1 = max(int(-(-y1 // ch)), cy0 + 1)
+        for cy in range(cy0, cy1):
+            for cx in range(cx0, cx1):
+                yield cx, cy
+
+    def insert(self, key, x0, y0, x1, y1):
+        self.boxes[key] = (x0, y0, x1, y1)
+        for cell in self._cells(x0, y0, x1, y1):
+            self.cells[cell].append(key)
+
+    def remove(self, key):
+        box = self.boxes.pop(key)
+        for cell in self._cells(*box):
+            bucket = self.cells[cell]
+            bucket.remove(key)
+            if not bucket:
+                del self.cells[cell]
+
+    def query(self, x0, y0, x1, y1):
+        """Ключи всех прямоугольников, пересекающихся с [x0, x1) × [y0, y1)."""
+        cells = self.cells
+        buckets = [cells[cell] for cell in self._cells(x0, y0, x1, y1) if cell in cells]
+        if not buckets:
+            return []
+        keys = buckets[0] if len(buckets) == 1 else set().union(*buckets)
+        boxes = self.boxes
+        return [key for key in keys
+                if (box := boxes[key])[0] < x1 and x0 < box[2] and box[1] < y1 and y0 < box[3]]
+
+    def intersects(self, x0, y0, x1, y1):
+        """Есть ли хотя бы один прямоугольник, пересекающийся с [x0, x1) × [y0, y1)."""
+        boxes = self.boxes
+        for cell in self._cells(x0, y0, x1, y1):
+            for key in self.cells.get(cell, ()):
+                bx0, by0, bx1, by1 = boxes[key]
+                if bx0 < x1 and x0 < bx1 and by0 < y1 and y0 < by1:
+                    return True
+        return False
+
+    def insert_figure(self, f, padding):
+        """Добавляет размещённую фигуру по её габариту, расширенному на padding."""
+        self.insert(f, f.x - padding, f.y - padding,
+                    f.x + f.width + padding, f.y + f.height + padding)
+
+
+def cell_size_for(figures, padding):
+    """Размер клетки индекса: средний габарит фигуры вместе с отступами."""
+    if not figures:
+        return 1
+    mean = sum(max(f.width, f.height) for f in figures) / len(figures)
+    return max(1, int(mean) + 2 * padding)
+
+
+def can_place(f, x, y, index, sheet_w, sheet_h, padding):
+    """
+    Можно ли поставить фигуру f в точку (x, y): она должна помещаться
+    на листе с отступом и не пересекать фигуры из индекса (с их отступами).
+    """
+    if x < padding or y < padding:
+        return False
+    if x + f.width + padding > sheet_w or y + f.height + padding > sheet_h:
+        return False
+    return not index.intersects(x, y, x + f.width, y + f.height)
@@ -0,0 +1,181 @@
+import os
+import sys
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from utils import read_input, apply_placement
+from figure_set import FigureSet, TYPE_CODES
+from packers import get_packer
+from maximal_rectangles_packer import write_output, calculate_area_stats
+from visualize import visualize
+
+# Задача рабочего процесса: передаётся один раз при запуске процесса
+_job = None
+
+
+def _init_worker(job):
+    global _job
+    _job = job
+
+
+def height_bounds(sheet_w, padding, figure_set):
+    """
+    Нижняя граница высоты полосы шириной sheet_w:
+    - по площади: габариты, расширенные на padding, не пересекаются
+      и лежат в [padding, sheet_w) × [padding, sheet_h);
+    - по самой высокой фигуре (прямоугольники можно повернуть).
+    Бросает ValueError, если фигура не помещается по ширине.
+    """
+    w, h = figure_set.width, figure_set.height
+    rectangles = figure_set.types == TYPE_CODES['rectangle']
+    narrow = np.where(rectangles, np.minimum(w, h), w)
+    too_wide = np.flatnonzero(narrow + 2 * padding > sheet_w)
+    if too_wide.size:
+        raise ValueError(f"Figure {figure_set.ids[too_wide[0]]} does not fit the strip width {sheet_w}")
+
+    area = int(((w + padding) * (h + padding)).sum())
+    by_area = padding + -(-area // (sheet_w - padding))
+    tallest = int(np.where(rectangles, np.minimum(w, h), h).max()) + 2 * padding
+    return max(by_area, tallest)
+
+
+def _shelf_layout(sheet_w, padding, figure_set):
+    """
+    Верхняя граница: полочная упаковка на заведомо достаточно высокой полосе.
+    Прямоугольники, не проходящие по ширине, заранее повёрнуты.
+    """
+    run = figure_set.copy()
+    swap = run.width + 2 * padding > sheet_w
+    run.width[swap], run.height[swap] = run.height[swap], run.width[swap]
+    run.rotated[swap] = True
+    tall = int((run.height + padding).sum()) + padding
+    placed, _ = get_packer('shelf')(sheet_w, tall, padding, list(run))
+    return _layout(run, np.arange(len(run)), placed, padding)
+
+
+def _layout(run, rows, placed, padding):
+    """Раскладка в виде (высота, строки исходного набора, x, y, width, height, rotated)."""
+    index = np.array([f.index for f in placed], dtype=np.int64)
+    used = int((run.y[index] + run.height[index]).max()) + padding if index.size else 2 * padding
+    return (used, rows[index], run.x[index], run.y[index], run.width[index],
+            run.height[index], run.rotated[index])
+
+
+def _trial(job, height, order):
+    """
+    Проба одной высоты: сначала в порядке предыдущей удачной раскладки
+    (sort=False), при неудаче — в собственном порядке упаковщика.
+    Возвращает (height, warm, layout) или (height, None, None).
+    """
+    figure_set, sheet_w, padding, algorithm, params = job
+    packer = get_packer(algorithm)
+    for rows, warm in ((order, True), (np.arange(len(figure_set)), False)):
+        run = figure_set.take(rows)
+        placed, not_placed = packer(sheet_w, height, padding, list(run), sort=not warm, **params)
+        if not not_placed:
+            return height, warm, _layout(run, rows, placed, padding)
+    return height, None, None
+
+
+def _trial_in_worker(height, order):
+    return _trial(_job, height, order)
+
+
+def _probe_heights(lo, hi, count):
+    """До count высот, равномерно делящих [lo, hi) (при count=1 — середина)."""
+    heights = {lo + (hi - lo) * (i + 1) // (count + 1) for i in range(count)}
+    return sorted(h for h in heights if lo <= h < hi)
+
+
+def strip_pack(sheet_w, padding, figures, algorithm='greedy', workers=None, **params):
+    """
+    Упаковка в полосу ширины sheet_w минимальной высоты.
+    Границы: снизу — height_bounds, сверху — полочная упаковка. Между
+    ними идёт поиск делением: за раунд проверяется по высоте на процесс
+    (при одном процессе — обычная бисекция), пробы выполняются параллельно
+    в ProcessPoolExecutor. Каждая проба начинается с порядка фигур
+    лучшей найденной раскладки. Удачная проба опускает верхнюю границу
+    до фактически занятой высоты, неудачная поднимает нижнюю.
+    Упаковщики не монотонны по высоте, поэтому найденная высота —
+    наименьшая из проверенных удачных, а не гарантированный минимум.
+    Если упаковщик не укладывается ниже полочной раскладки (например,
+    MaxRects держит детали в 2·padding друг от друга), результатом
+    остаётся полочная раскладка.
+
+    Позиции лучшей раскладки записываются в фигуры figures.
+    Возвращает (sheet_h, placed, report): report содержит lower (нижняя
+    граница), upper (высота полочной упаковки), engine (чья раскладка
+    лучшая: algorithm или 'shelf'), trials, warm (удачные пробы с порядком
+    предыдущей раскладки), rounds и elapsed.
+    """
+    get_packer(algorithm)
+    start = time.perf_counter()
+    figure_set = figures if isinstance(figures, FigureSet) else FigureSet.from_figures(figures)
+    workers = workers or os.cpu_count() or 1
+    items = list(figures)
+
+    report = {'lower': 2 * padding, 'upper': 2 * padding, 'engine': 'shelf',
+              'trials': 0, 'warm': 0, 'rounds': 0}
+    best = None
+    if len(figure_set):
+        lo = report['lower'] = height_bounds(sheet_w, padding, figure_set)
+        best = _shelf_layout(sheet_w, padding, figure_set)
+        hi = report['upper'] = best[0]
+
+        job = (figure_set, sheet_w, padding, algorithm, params)
+        executor = (ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(job,))
+                    if workers > 1 else None)
+        try:
+            while lo < hi:
+                heights = _probe_heights(lo, hi, workers)
+                orders = [best[1]] * len(heights)
+                if executor is None:
+                    trials = [_trial(job, h, best[1]) for h in heights]
+                else:
+                    trials = list(executor.map(_trial_in_worker, heights, orders))
+                report['trials'] += len(trials)
+                report['rounds'] += 1
+
+                feasible = [t for t in trials if t[2] is not None]
+                report['warm'] += sum(t[1] for t in feasible)
+                if feasible:
+                    layout = min((t[2] for t in feasible), key=lambda layout: layout[0])
+                    if layout[0] < best[0]:
+                        best = layout
+                        report['engine'] = algorithm
+                    hi = min(hi, best[0])
+                lowest = min((t[0] for t in feasible), default=hi)
+                failed = [t[0] for t in trials if t[2] is None and t[0] < lowest]
+                if failed:
+                    lo = max(failed) + 1
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    placed = []
+    sheet_h = 2 * padding
+    if best is not None:
+        sheet_h, rows, x, y, width, height, rotated = best
+        for k, row in enumerate(rows):
+            f = items[row]
+            apply_placement(f, x[k], y[k], width[k], height[k], rotated[k])
+            placed.append(f)
+    report['elapsed'] = time.perf_counter() - start
+    return sheet_h, placed, report
+
+
+if __name__ == "__main__":
+    input_file = input("Введите имя входного файла (например, input.txt): ").strip()
+    if not input_file or not os.path.exists(input_file):
+        print(f"Файл '{input_file}' не найден. Завершение.")
+        sys.exit(1)
+
+    sheet_w, _, padding, figures = read_input(input_file)
+    sheet_h, placed, report = strip_pack(sheet_w, padding, figures)
+    print(f"\n📏 Высота полосы: {sheet_h} ({report['engine']}, границы: {report['lower']}…{report['upper']}, "
+          f"проб: {report['trials']}, с тёплым стартом: {report['warm']}, "
+          f"{report['elapsed']:.2f} с)")
+    write_output(placed, path='output_strip.json')
+    calculate_area_stats(sheet_w, sheet_h, placed, len(figures), [], padding,
+                         free_space='--free-space' in sys.argv)
+    visualize(sheet_w, sheet_h, placed, padding, output_file='layout_strip.png')
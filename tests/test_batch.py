@@ -0,0 +1,67 @@
+import os
+import shutil
+from batch import expand_inputs, output_names, run_batch
+from layout_io import read_layout
+from test_packers import ROOT
+
+
+def _touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, 'w').close()
+    return str(path)
+
+
+def test_expand_inputs_directory_glob_and_duplicates(tmp_path):
+    x = _touch(tmp_path / 'a' / 'x.txt')
+    y = _touch(tmp_path / 'a' / 'y.fig')
+    _touch(tmp_path / 'a' / 'z.json')
+    w = _touch(tmp_path / 'a' / 'sub' / 'w.txt')
+    directory = str(tmp_path / 'a')
+
+    # Каталог: только INPUT_EXTENSIONS и без вложенных каталогов
+    assert expand_inputs([directory]) == [x, y]
+    assert expand_inputs([os.path.join(directory, '**', '*.txt')]) == [w, x]
+    # Повторы отбрасываются, порядок первого появления сохраняется
+    assert expand_inputs([y, directory, os.path.join(directory, '*.txt'), y]) == [y, x]
+    # Несуществующий путь остаётся как есть, чтобы main сообщил о нём
+    missing = str(tmp_path / 'missing.txt')
+    assert expand_inputs([missing, x]) == [missing, x]
+
+
+def test_output_names_are_unique():
+    paths = ['a/in.txt', 'b/in.txt', 'c/in.fig', 'in-2.txt', 'other.txt']
+    names = output_names(paths)
+    assert names == {'a/in.txt': 'in', 'b/in.txt': 'in-2', 'c/in.fig': 'in-3',
+                     'in-2.txt': 'in-2-2', 'other.txt': 'other'}
+    assert len(set(names.values())) == len(paths)
+
+
+def test_run_batch_writes_layouts_and_reports_failures(tmp_path):
+    first = str(tmp_path / 'one' / 'input.txt')
+    second = str(tmp_path / 'two' / 'input.txt')
+    for path, name in ((first, 'input4.txt'), (second, 'input2.txt')):
+        os.makedirs(os.path.dirname(path))
+        shutil.copy(os.path.join(ROOT, name), path)
+    broken = str(tmp_path / 'broken.txt')
+    with open(broken, 'w') as f:
+        f.write("Sheet width: 100\nSheet height: nope\n")
+
+    seen = []
+    out_dir = str(tmp_path / 'out')
+    results, summary = run_batch([first, second, broken], ['maxrects', 'shelf'], out_dir,
+                                 'jsonl', workers=1, on_result=seen.append)
+
+    assert seen == results
+    assert (summary['jobs'], summary['failed']) == (6, 2)
+    failed = [r for r in results if 'error' in r]
+    assert {(r['input'], r['algorithm']) for r in failed} == {(broken, 'maxrects'), (broken, 'shelf')}
+    assert all(r['error'].startswith('ValueError') for r in failed)
+
+    done = sorted(((r['input'], r['algorithm']), r) for r in results if 'error' not in r)
+    assert [r['layout'] for _, r in done] == [
+        os.path.join(out_dir, name) for name in
+        ('input.maxrects.jsonl', 'input.shelf.jsonl', 'input-2.maxrects.jsonl', 'input-2.shelf.jsonl')]
+    for _, r in done:
+        layout = read_layout(r['layout'])
+        assert len(layout) == r['placed'] > 0
+        assert r['placed'] + len(r['not_placed']) == r['total']
@@ -0,0 +1,121 @@
+import numpy as np
+import pytest
+from free_rectangles import Rect, FreeRectangles, HEURISTICS
+from spatial_index import SpatialIndex
+
+SHEET_W, SHEET_H = 120, 90
+
+
+def _assert_invariants(free_rects, used):
+    """
+    Свободные прямоугольники лежат на листе, не пересекают занятые (габариты
+    с отступами) и максимальны: ни один не вложен в другой.
+    """
+    rects = list(free_rects)
+    assert len(rects) == len(free_rects)
+    for r in rects:
+        assert r.width > 0 and r.height > 0
+        assert r.x >= 0 and r.y >= 0 and r.x + r.width <= SHEET_W and r.y + r.height <= SHEET_H
+        for u in used:
+            assert not r.intersects(u), ((r.x, r.y, r.width, r.height), (u.x, u.y, u.width, u.height))
+    for i, r in enumerate(rects):
+        for j, o in enumerate(rects):
+            assert i == j or not o.contains(r), ((r.x, r.y, r.width, r.height), (o.x, o.y, o.width, o.height))
+
+
+def _fill(free_rects, rng, heuristic, padding, count=40):
+    used = []
+    for _ in range(count):
+        w, h = int(rng.integers(3, 25)) + 2 * padding, int(rng.integers(3, 25)) + 2 * padding
+        best = free_rects.find_best(w, h, heuristic)
+        if best is None:
+            continue
+        x, y, rotated = best
+        box = Rect(x, y, h, w) if rotated else Rect(x, y, w, h)
+        free_rects.place(box)
+        used.append(box)
+        _assert_invariants(free_rects, used)
+    return used
+
+
+@pytest.mark.parametrize('heuristic', HEURISTICS)
+@pytest.mark.parametrize('seed', range(3))
+def test_place_keeps_free_space_valid(heuristic, seed):
+    rng = np.random.default_rng(seed)
+    free_rects = FreeRectangles(SHEET_W, SHEET_H, 16)
+    used = _fill(free_rects, rng, heuristic, padding=2)
+    assert used
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_release_keeps_free_space_valid(seed):
+    rng = np.random.default_rng(seed)
+    free_rects = FreeRectangles(SHEET_W, SHEET_H, 16)
+    used = _fill(free_rects, rng, 'bssf', padding=1)
+    blockers = SpatialIndex(16)
+    for k, u in enumerate(used):
+        blockers.insert(k, u.x, u.y, u.x + u.width, u.y + u.height)
+
+    for k in rng.permutation(len(used))[:len(used) // 2].tolist():
+        freed, used[k] = used[k], None
+        blockers.remove(k)
+        free_rects.release(freed, blockers)
+        _assert_invariants(free_rects, [u for u in used if u is not None])
+        # Освобождённое место целиком входит в один из свободных прямоугольников
+        assert any(r.contains(freed) for r in free_rects)
+
+    remaining = [u for u in used if u is not None]
+    remaining += _fill(free_rects, rng, 'bl', padding=1, count=20)
+    _assert_invariants(free_rects, remaining)
+
+
+def test_release_restores_empty_sheet():
+    free_rects = FreeRectangles(SHEET_W, SHEET_H, 16)
+    boxes = [Rect(10, 10, 30, 20), Rect(50, 5, 20, 60), Rect(0, 70, 120, 10)]
+    blockers = SpatialIndex(16)
+    for k, box in enumerate(boxes):
+        free_rects.place(box)
+        blockers.insert(k, box.x, box.y, box.x + box.width, box.y + box.height)
+    for k, box in enumerate(boxes):
+        blockers.remove(k)
+        free_rects.release(box, blockers)
+    assert [(r.x, r.y, r.width, r.height) for r in free_rects] == [(0, 0, SHEET_W, SHEET_H)]
+
+
+def _contact_by_sweep(used, cx, cy, cw, ch):
+    """Длина касания каждого кандидата со всеми занятыми и краями листа — перебором."""
+    result = []
+    for x0, y0, w, h in zip(cx.tolist(), cy.tolist(), cw.tolist(), ch.tolist()):
+        x1, y1 = x0 + w, y0 + h
+        total = (h if x0 == 0 else 0) + (w if y0 == 0 else 0)
+        total += (h if x1 == SHEET_W else 0) + (w if y1 == SHEET_H else 0)
+        for u in used:
+            ux1, uy1 = u.x + u.width, u.y + u.height
+            if ux1 == x0 or u.x == x1:
+                total += max(0, min(y1, uy1) - max(y0, u.y))
+            if uy1 == y0 or u.y == y1:
+                total += max(0, min(x1, ux1) - max(x0, u.x))
+        result.append(total)
+    return result
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_contact_matches_sweep(seed):
+    rng = np.random.default_rng(seed)
+    free_rects = FreeRectangles(SHEET_W, SHEET_H, 16)
+    used = _fill(free_rects, rng, 'cp', padding=0, count=25)
+    blockers = SpatialIndex(16)
+    for k, u in enumerate(used):
+        blockers.insert(k, u.x, u.y, u.x + u.width, u.y + u.height)
+    for k in range(0, len(used), 3):
+        blockers.remove(k)
+        free_rects.release(used[k], blockers)
+    remaining = [u for k, u in enumerate(used) if k % 3]
+
+    slots = np.flatnonzero(free_rects.alive)
+    for w, h in [(1, 1), (4, 9), (7, 3)]:
+        ok = slots[(free_rects.w[slots] >= w) & (free_rects.h[slots] >= h)]
+        cx, cy = free_rects.x[ok], free_rects.y[ok]
+        cw, ch = np.full(len(ok), w), np.full(len(ok), h)
+        assert (free_rects._contact(cx, cy, cw, ch).tolist() ==
+                _contact_by_sweep(remaining, cx, cy, cw, ch))
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+from utils import Figure
+from benchmark import KINDS, generate_figures, sheet_for
+from greedy_packer import greedy_pack
+from test_packers import _assert_valid
+
+BACKENDS = [('scan', {}), ('grid', {}), ('candidates', {}), ('multires', {'coarse_cell': 1})]
+
+
+def _layouts(sheet_w, sheet_h, padding, make_figures):
+    """Раскладка каждого бэкенда на свежей копии фигур: (размещение, id неразмещённых)."""
+    layouts = {}
+    for backend, params in BACKENDS:
+        placed, not_placed = greedy_pack(sheet_w, sheet_h, padding, make_figures(),
+                                         backend=backend, **params)
+        layouts[backend] = ([(f.id, f.x, f.y, f.width, f.height, f.rotated) for f in placed],
+                            sorted(f.id for f in not_placed))
+    return layouts
+
+
+@pytest.mark.parametrize('kind', KINDS)
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_backends_place_identically(kind, seed):
+    # slack < 1: часть фигур не помещается, поиск проходит весь лист
+    make = lambda: generate_figures(kind, 40, seed, min_size=5, max_size=25)
+    sheet_w, sheet_h = sheet_for(make(), 2, slack=0.9)
+    layouts = _layouts(sheet_w, sheet_h, 2, make)
+    for backend, _ in BACKENDS[1:]:
+        assert layouts[backend] == layouts['scan'], backend
+
+
+@pytest.mark.parametrize('coarse_cell', [2, 4, 8])
+@pytest.mark.parametrize('kind', KINDS)
+@pytest.mark.parametrize('seed', [0, 1])
+def test_coarse_multires_is_valid(kind, seed, coarse_cell):
+    make = lambda: generate_figures(kind, 40, seed, min_size=5, max_size=25)
+    for slack in (0.9, 1.5):
+        sheet_w, sheet_h = sheet_for(make(), 2, slack=slack)
+        placed, not_placed = greedy_pack(sheet_w, sheet_h, 2, make(), backend='multires',
+                                         coarse_cell=coarse_cell)
+        _assert_valid(placed, sheet_w, sheet_h, 2)
+        assert len(placed) + len(not_placed) == 40
+        if slack > 1:
+            # На просторном листе грубый шаг не теряет фигур, как и scan
+            _, scan_not_placed = greedy_pack(sheet_w, sheet_h, 2, make(), backend='scan')
+            assert not_placed == scan_not_placed == []
+
+
+@pytest.mark.parametrize('coarse_cell', [2, 4])
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_coarse_multires_matches_scan_on_aligned_sizes(seed, coarse_cell):
+    # Размеры, отступ и лист кратны клетке: грубый поиск точен
+    def make():
+        sizes = np.random.default_rng(seed).integers(1, 8, (40, 2)) * coarse_cell
+        return [Figure(i, 'rectangle', int(w), int(h)) for i, (w, h) in enumerate(sizes, 1)]
+    side = 30 * coarse_cell
+    scan = greedy_pack(side, side, coarse_cell, make(), backend='scan')
+    multires = greedy_pack(side, side, coarse_cell, make(), backend='multires',
+                           coarse_cell=coarse_cell)
+    assert scan[1], "лист должен быть заполнен не полностью"
+    for placed, not_placed in (scan, multires):
+        _assert_valid(placed, side, side, coarse_cell)
+    assert [(f.id, f.x, f.y, f.rotated) for f in multires[0]] == \
+           [(f.id, f.x, f.y, f.rotated) for f in scan[0]]
+    assert [f.id for f in multires[1]] == [f.id for f in scan[1]]
+
+
+def test_degenerate_boxes_are_not_placed():
+    def make():
+        figures = generate_figures('mixed', 30, seed=3, min_size=5, max_size=25)
+        return figures + [
+            Figure(101, 'triangle', vertices=[(0, 11), (0, 5), (0, 0)]),
+            Figure(102, 'polygon', vertices=[(0, 0), (4, 4), (8, 8), (2, 2)]),
+            Figure(103, 'rectangle', 0, 7),
+            Figure(104, 'circle', 0),
+        ]
+    sheet_w, sheet_h = sheet_for(make(), 2)
+    layouts = _layouts(sheet_w, sheet_h, 2, make)
+    for backend, _ in BACKENDS:
+        placed, not_placed = layouts[backend]
+        assert not_placed == [101, 103, 104], backend
+        assert placed == layouts['scan'][0], backend
+        # Коллинеарные вершины, но габарит 8×8 — фигура размещается
+        assert 102 in [entry[0] for entry in placed], backend
@@ -0,0 +1,78 @@
+import builtins
+import pytest
+from figure_io import iter_batches, load_input
+from utils import open_input, read_input
+
+HEADER = "sheet_w: 100\nsheet_h: 80\npadding: 2\nfigures:\n"
+
+
+@pytest.fixture
+def opened(monkeypatch):
+    """Файлы, открытые через open() во время теста."""
+    files = []
+    real_open = builtins.open
+
+    def tracking_open(*args, **kwargs):
+        f = real_open(*args, **kwargs)
+        files.append(f)
+        return f
+    monkeypatch.setattr(builtins, 'open', tracking_open)
+    return files
+
+
+@pytest.mark.parametrize('header', [
+    "sheet_w: 100\nsheet_h: 80\n",             # неполный
+    "sheet_w 100\nsheet_h: 80\npadding: 2\nfigures:\n",    # нет ':'
+    "sheet_w: wide\nsheet_h: 80\npadding: 2\nfigures:\n",  # не число
+])
+def test_bad_header_closes_file(tmp_path, opened, header):
+    path = tmp_path / 'input.txt'
+    path.write_text(header + "1 rectangle 10 20\n")
+    with pytest.raises(ValueError):
+        open_input(str(path))
+    assert opened and all(f.closed for f in opened)
+
+
+def test_body_closes_file(tmp_path, opened):
+    path = tmp_path / 'input.txt'
+    path.write_text(HEADER + "1 rectangle 10 20\n\n2 circle 5\n")
+    sheet_w, sheet_h, padding, lines = open_input(str(path))
+    assert (sheet_w, sheet_h, padding) == (100, 80, 2)
+    assert list(lines) == ["1 rectangle 10 20", "2 circle 5"]
+    assert opened[-1].closed
+
+    # Закрытие без перебора тоже закрывает файл
+    _, _, _, lines = open_input(str(path))
+    lines.close()
+    assert opened[-1].closed
+    assert list(lines) == []
+
+
+def test_bad_figure_closes_file(tmp_path, opened):
+    path = tmp_path / 'input.txt'
+    path.write_text(HEADER + "1 rectangle 10 20\n2 hexagon 5\n")
+    for read in (read_input, load_input):
+        with pytest.raises(ValueError):
+            read(str(path))
+        assert all(f.closed for f in opened), read.__name__
+
+
+def test_iter_batches_closes_file_on_malformed_line(tmp_path, opened):
+    path = tmp_path / 'input.txt'
+    path.write_text(HEADER + "1 rectangle 10 20\n2 hexagon 5\n3 circle 5\n")
+    _, _, _, batches = iter_batches(str(path), batch_size=1)
+    assert next(batches).ids.tolist() == [1]
+    assert not opened[-1].closed
+    with pytest.raises(ValueError):
+        next(batches)
+    assert opened[-1].closed
+
+
+def test_iter_batches_closes_file_when_stopped_early(tmp_path, opened):
+    path = tmp_path / 'input.txt'
+    path.write_text(HEADER + "1 rectangle 10 20\n2 circle 5\n")
+    _, _, _, batches = iter_batches(str(path), batch_size=1)
+    for batch in batches:
+        break
+    batches.close()
+    assert opened[-1].closed
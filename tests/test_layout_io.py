@@ -0,0 +1,106 @@
+import json
+import pytest
+import layout_io
+from utils import Figure
+
+
+def _figures():
+    a = Figure(1, 'rectangle', 10, 20)
+    a.x, a.y, a.rotated = 5, 7, True
+    b = Figure(2, 'circle', 4)
+    b.x, b.y = 30, 2
+    return [a, b]
+
+
+def test_default_fields_keep_output_schema(tmp_path):
+    path = tmp_path / 'out.json'
+    layout_io.write_output(_figures(), str(path))
+    assert json.loads(path.read_text()) == [
+        {'id': 1, 'x': 5, 'y': 7, 'rotated': True},
+        {'id': 2, 'x': 30, 'y': 2, 'rotated': False},
+    ]
+    binary = tmp_path / 'out.bin'
+    layout_io.write_output(_figures(), str(binary))
+    assert binary.read_bytes().startswith(layout_io.MAGIC)
+    assert layout_io.read_layout(str(binary)).dtype == layout_io.RECORD
+
+
+def test_angle_is_written_only_when_requested(tmp_path):
+    figures = _figures()
+    path = tmp_path / 'out.jsonl'
+    layout_io.write_output(figures, str(path), layout_io.ANGLE_FIELDS)
+    assert [entry['angle'] for entry in layout_io.read_layout(str(path))] == [90, 0]
+    binary = tmp_path / 'out.bin'
+    layout_io.write_output(figures, str(binary), layout_io.ANGLE_FIELDS)
+    records = layout_io.read_layout(str(binary))
+    assert records.dtype == layout_io.RECORD_ANGLE
+    assert records['angle'].tolist() == [90, 0]
+
+
+def _sheets(count=3, per_sheet=5):
+    sheets = []
+    for number in range(count):
+        placed = []
+        for k in range(per_sheet):
+            f = Figure(number * per_sheet + k + 1, 'rectangle', 10 + k, 5)
+            f.x, f.y, f.rotated = 3 * k, 7 * number, k % 2 == 1
+            placed.append(f)
+        sheets.append((100, 100, placed))
+    return sheets
+
+
+def _expected(sheets, fields):
+    return [{name: number if name == 'sheet' else layout_io.angle_of(f) if name == 'angle'
+             else getattr(f, name) for name in fields}
+            for number, (_, _, placed) in enumerate(sheets) for f in placed]
+
+
+def _as_dicts(layout, fields):
+    if isinstance(layout, list):
+        return layout
+    return [{name: bool(r[name]) if name == 'rotated' else int(r[name]) for name in fields}
+            for r in layout]
+
+
+@pytest.mark.parametrize('fields', [layout_io.DEFAULT_FIELDS + ('sheet',),
+                                    layout_io.ANGLE_FIELDS + ('sheet',)])
+@pytest.mark.parametrize('ext', ['.json', '.jsonl', '.lay'])
+def test_roundtrip(tmp_path, ext, fields):
+    sheets = _sheets()
+    path = str(tmp_path / ('out' + ext))
+    layout_io.write_sheets(sheets, path, fields)
+    assert _as_dicts(layout_io.read_layout(path), fields) == _expected(sheets, fields)
+
+
+def test_json_matches_json_dump(tmp_path):
+    sheets = _sheets()
+    path = tmp_path / 'out.json'
+    layout_io.write_sheets(sheets, str(path))
+    fields = layout_io.DEFAULT_FIELDS + ('sheet',)
+    assert path.read_text() == json.dumps(_expected(sheets, fields), indent=2)
+
+
+def test_binary_roundtrip_spans_buffer_flushes(tmp_path):
+    sheets = _sheets(count=2, per_sheet=layout_io.BUFFER_SIZE + 7)
+    path = str(tmp_path / 'out.bin')
+    layout_io.write_sheets(sheets, path)
+    records = layout_io.read_layout(path)
+    assert len(records) == 2 * (layout_io.BUFFER_SIZE + 7)
+    fields = layout_io.DEFAULT_FIELDS + ('sheet',)
+    assert _as_dicts(records, fields) == _expected(sheets, fields)
+
+
+@pytest.mark.parametrize('ext', ['.json', '.jsonl', '.lay'])
+def test_empty_layout_roundtrip(tmp_path, ext):
+    path = str(tmp_path / ('out' + ext))
+    layout_io.write_output([], path)
+    assert len(layout_io.read_layout(path)) == 0
+
+
+def test_format_errors(tmp_path):
+    with pytest.raises(ValueError):
+        layout_io.LayoutWriter(str(tmp_path / 'out.txt'), 'xml')
+    path = tmp_path / 'out.lay'
+    path.write_bytes(b'NOTALAYOUT')
+    with pytest.raises(ValueError):
+        layout_io.read_layout(str(path))
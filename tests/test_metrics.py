@@ -0,0 +1,23 @@
+import metrics
+from utils import Figure
+
+
+def _placed():
+    a = Figure(1, 'rectangle', 10, 10)
+    a.x, a.y = 0, 0
+    return [a]
+
+
+def test_free_space_analysis_is_opt_in(monkeypatch, capsys):
+    def fail(*args):
+        raise AssertionError("largest_free_rectangle must not run by default")
+
+    monkeypatch.setattr(metrics, 'largest_free_rectangle', fail)
+    metrics.calculate_area_stats(40, 20, _placed(), 1, [], 0)
+    assert 'Наибольшее свободное окно' not in capsys.readouterr().out
+    assert 'largest_free' not in metrics.layout_metrics(40, 20, _placed())
+
+
+def test_free_space_on_request(capsys):
+    metrics.calculate_area_stats(40, 20, _placed(), 1, [], 0, free_space=True)
+    assert 'Наибольшее свободное окно: 30×20 в (10, 0)' in capsys.readouterr().out
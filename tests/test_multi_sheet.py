@@ -0,0 +1,57 @@
+import pytest
+from benchmark import generate_figures, sheet_for
+from multi_sheet import multi_sheet_pack
+from utils import Figure
+from test_packers import _assert_valid
+
+
+def _rectangles():
+    figures = generate_figures('rectangle', 60, seed=3, min_size=20, max_size=40)
+    return figures, sheet_for(figures, 2)
+
+
+def _check(figures, sheets, not_placed, padding=2):
+    for w, h, placed in sheets:
+        assert placed
+        _assert_valid(placed, w, h, padding)
+    ids = [f.id for _, _, placed in sheets for f in placed] + [f.id for f in not_placed]
+    assert sorted(ids) == sorted(f.id for f in figures)
+
+
+@pytest.mark.parametrize('workers', [None, 2])
+def test_too_small_first_sheet_is_skipped(workers):
+    figures, (side, _) = _rectangles()
+    sheets, not_placed = multi_sheet_pack([(10, 10)] * 3 + [(side // 2, side // 2)], 2, figures,
+                                          workers=workers)
+    assert not not_placed
+    assert {(w, h) for w, h, _ in sheets} == {(side // 2, side // 2)}
+    _check(figures, sheets, not_placed)
+
+
+@pytest.mark.parametrize('workers', [None, 2])
+def test_too_small_middle_sheet_is_skipped(workers):
+    figures, (side, _) = _rectangles()
+    sizes = [(side // 2, side // 2)] + [(15, 15)] * 3 + [(side // 2, side // 2)]
+    sheets, not_placed = multi_sheet_pack(sizes, 2, figures, workers=workers)
+    assert not not_placed
+    assert (15, 15) not in {(w, h) for w, h, _ in sheets}
+    _check(figures, sheets, not_placed)
+
+
+@pytest.mark.parametrize('workers', [None, 2])
+def test_stops_when_last_size_fits_nothing(workers):
+    figures, (side, _) = _rectangles()
+    big = Figure(1000, 'rectangle', side, side)
+    sheets, not_placed = multi_sheet_pack([(side // 2, side // 2)], 2, figures + [big],
+                                          workers=workers)
+    assert [f.id for f in not_placed] == [1000]
+    _check(figures + [big], sheets, not_placed)
+
+
+@pytest.mark.parametrize('workers', [None, 2])
+def test_small_last_size_keeps_leftovers(workers):
+    figures, (side, _) = _rectangles()
+    sheets, not_placed = multi_sheet_pack([(side // 2, side // 2), (10, 10)], 2, figures,
+                                          workers=workers)
+    assert len(sheets) == 1 and not_placed
+    _check(figures, sheets, not_placed)
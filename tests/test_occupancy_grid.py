@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+from utils import Figure
+from occupancy_grid import MultiResGrid, OccupancyGrid
+from spatial_index import SpatialIndex, can_place
+
+SHEET_W, SHEET_H = 48, 37
+
+
+def _random_figures(seed, count=12):
+    rng = np.random.default_rng(seed)
+    figures = []
+    for i in range(count):
+        f = Figure(i, 'rectangle', int(rng.integers(1, 10)), int(rng.integers(1, 10)))
+        f.x = int(rng.integers(0, SHEET_W - f.width + 1))
+        f.y = int(rng.integers(0, SHEET_H - f.height + 1))
+        figures.append(f)
+    return figures
+
+
+def _random_sheet(seed, padding, count=12):
+    """Лист со случайными фигурами: OccupancyGrid и SpatialIndex с одинаковым содержимым."""
+    grid = OccupancyGrid(SHEET_W, SHEET_H, padding)
+    index = SpatialIndex(8)
+    for f in _random_figures(seed, count):
+        grid.add(f)
+        index.insert_figure(f, padding)
+    return grid, index
+
+
+def _first_by_sweep(w, h, index, padding):
+    """Первая позиция полным перебором can_place в порядке greedy_pack."""
+    f = Figure(0, 'rectangle', w, h)
+    for y in range(SHEET_H - h - padding, padding - 1, -1):
+        for x in range(padding, SHEET_W - w - padding + 1):
+            if can_place(f, x, y, index, SHEET_W, SHEET_H, padding):
+                return x, y
+    return None
+
+
+@pytest.mark.parametrize('padding', [0, 1, 3])
+@pytest.mark.parametrize('seed', range(4))
+def test_is_free_matches_can_place(seed, padding):
+    grid, index = _random_sheet(seed, padding)
+    for w, h in [(1, 1), (3, 7), (6, 2), (9, 9)]:
+        f = Figure(0, 'rectangle', w, h)
+        for y in range(SHEET_H - h + 1):
+            for x in range(SHEET_W - w + 1):
+                assert grid.is_free(x, y, w, h) == can_place(
+                    f, x, y, index, SHEET_W, SHEET_H, padding), (w, h, x, y)
+
+
+@pytest.mark.parametrize('padding', [0, 1, 3])
+@pytest.mark.parametrize('seed', range(4))
+def test_find_first_matches_sweep(seed, padding):
+    grid, index = _random_sheet(seed, padding)
+    for w, h in [(1, 1), (2, 5), (5, 3), (8, 8), (20, 4), (SHEET_W, 1)]:
+        expected = _first_by_sweep(w, h, index, padding)
+        assert grid.find_first(w, h) == expected, (w, h)
+        # Небольшие блоки строк: позиция не зависит от разбиения
+        assert grid.find_first(w, h, block_rows=3) == expected, (w, h)
+        y = expected[1] if expected else padding
+        row = [x for x in range(padding, SHEET_W - w - padding + 1)
+               if can_place(Figure(0, 'rectangle', w, h), x, y, index, SHEET_W, SHEET_H, padding)]
+        assert grid.first_free_in_row(y, w, h) == (row[0] if row else None), (w, h, y)
+
+
+@pytest.mark.parametrize('cell', [1, 2, 3, 5])
+@pytest.mark.parametrize('padding', [0, 1, 3])
+@pytest.mark.parametrize('seed', range(4))
+def test_multires_find_first_is_free_and_not_before_sweep(seed, padding, cell):
+    index = SpatialIndex(8)
+    grid = MultiResGrid(SHEET_W, SHEET_H, padding, index, cell)
+    for f in _random_figures(seed):
+        index.insert_figure(f, padding)
+        grid.add(f)
+    for w, h in [(1, 1), (2, 5), (5, 3), (8, 8), (20, 4), (SHEET_W, 1)]:
+        expected = _first_by_sweep(w, h, index, padding)
+        pos = grid.find_first(w, h)
+        if cell == 1:
+            assert pos == expected, (w, h)
+        if pos is None:
+            continue
+        # Грубая сетка может пропустить узкие щели, но найденное окно свободно
+        # и не раньше первой свободной позиции в порядке greedy_pack
+        assert expected is not None, (w, h)
+        assert can_place(Figure(0, 'rectangle', w, h), *pos, index, SHEET_W, SHEET_H, padding)
+        assert (-pos[1], pos[0]) >= (-expected[1], expected[0]), (w, h, pos, expected)
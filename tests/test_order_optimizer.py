@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from benchmark import generate_figures, sheet_for
+from figure_set import FigureSet
+from metrics import shape_areas
+from order_optimizer import apply_order, evaluate, finish_rotation, optimize_order
+from packers import get_packer
+from test_packers import _assert_valid
+
+
+def _task(kind='mixed', count=25, seed=0, slack=0.7):
+    figures = generate_figures(kind, count, seed, min_size=5, max_size=30)
+    sheet_w, sheet_h = sheet_for(figures, 2, slack=slack)
+    return sheet_w, sheet_h, figures
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+@pytest.mark.parametrize('objective,slack', [('area', 0.7), ('sheets', 0.4)])
+@pytest.mark.parametrize('algorithm', ['maxrects', 'greedy', 'skyline'])
+def test_result_is_never_worse_than_baseline(algorithm, objective, slack, workers):
+    sheet_w, sheet_h, figures = _task(slack=slack)
+    result = optimize_order(sheet_w, sheet_h, 2, figures, algorithm, objective,
+                            budget=2.0, workers=workers, patience=5)
+    assert result['score'] <= result['baseline']
+
+    # Оценка воспроизводится по возвращённому порядку
+    figure_set = FigureSet.from_figures(figures)
+    job = (figure_set, shape_areas(figure_set), sheet_w, sheet_h, 2, algorithm, {},
+           objective, 1000)
+    assert evaluate(job, result['order'], result['flips']) == pytest.approx(result['score'])
+    assert sorted(result['order'].tolist()) == list(range(len(figures)))
+
+
+def test_applied_order_packs_as_evaluated():
+    sheet_w, sheet_h, figures = _task('rectangle', seed=1)
+    result = optimize_order(sheet_w, sheet_h, 2, figures, objective='area', budget=2.0,
+                            workers=1, patience=10)
+    ordered = apply_order(figures, result['order'], result['flips'])
+    placed, _ = get_packer('maxrects')(sheet_w, sheet_h, 2, ordered, sort=False)
+    finish_rotation(figures, result['order'], result['flips'])
+    _assert_valid(placed, sheet_w, sheet_h, 2)
+    used = sum(f.width * f.height for f in placed) / (sheet_w * sheet_h)
+    assert used == pytest.approx(-result['score'])
+
+
+def test_zero_budget_returns_baseline():
+    sheet_w, sheet_h, figures = _task()
+    result = optimize_order(sheet_w, sheet_h, 2, figures, budget=0.0, workers=1)
+    assert result['steps'] == 0 and result['evaluations'] == 1
+    assert result['score'] == result['baseline']
+
+
+def test_time_budget_is_respected():
+    sheet_w, sheet_h, figures = _task(count=40)
+    budget = 0.5
+    result = optimize_order(sheet_w, sheet_h, 2, figures, budget=budget, workers=1,
+                            patience=10**9)
+    assert result['steps'] > 0
+    # Шаг, начатый до истечения бюджета, доводится до конца
+    step = result['elapsed'] / result['steps']
+    assert result['elapsed'] < budget + 2 * step + 0.1
+
+
+@pytest.mark.parametrize('patience', [0, 1, 5])
+def test_patience_stops_the_search(patience):
+    sheet_w, sheet_h, figures = _task()
+    result = optimize_order(sheet_w, sheet_h, 2, figures, budget=60.0, workers=1,
+                            patience=patience, temperature=0.0)
+    assert result['elapsed'] < 60.0
+    assert result['steps'] >= patience
+    assert result['evaluations'] == 1 + result['steps'] * 4
+    # Поиск детерминирован по seed: тот же запуск делает столько же шагов
+    again = optimize_order(sheet_w, sheet_h, 2, figures, budget=60.0, workers=1,
+                           patience=patience, temperature=0.0)
+    assert again['steps'] == result['steps']
+    assert np.array_equal(again['order'], result['order'])
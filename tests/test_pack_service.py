@@ -0,0 +1,135 @@
+import asyncio
+import json
+import time
+import pack_service
+from pack_service import PackService
+
+SPEC = {'algorithm': 'maxrects', 'sheet_w': 100, 'sheet_h': 100, 'padding': 2,
+        'figures': ['1 rectangle 30 20', '2 circle 10', '3 rectangle 200 10']}
+
+
+def _sleep_job(spec):
+    """Подмена run_job: задание, которое считает spec['sleep'] секунд."""
+    time.sleep(spec['sleep'])
+    return {'slept': spec['sleep']}
+
+
+def _run(test, workers=1, queue_size=8):
+    """Запускает сценарий test(service, port) на сервисе с HTTP-сервером."""
+    async def main():
+        service = PackService(workers, queue_size)
+        await service.start()
+        server = await asyncio.start_server(service.handle, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            async with server:
+                return await asyncio.wait_for(test(service, port), 30)
+        finally:
+            await service.stop()
+    return asyncio.run(main())
+
+
+async def _request(port, method, path, data=None):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    body = json.dumps(data).encode() if data is not None else b''
+    writer.write(f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b'\r\n\r\n')
+    return int(head.split()[1]), json.loads(payload)
+
+
+def test_submit_and_wait():
+    async def test(service, port):
+        status, job = await _request(port, 'POST', '/jobs', SPEC)
+        assert status == 202 and job['status'] in ('queued', 'running')
+        status, job = await _request(port, 'GET', f"/jobs/{job['id']}?wait=1")
+        assert status == 200 and job['status'] == 'done'
+        result = job['result']
+        assert [f['id'] for f in result['placed']] == [1, 2]
+        assert result['not_placed'] == [3]
+        status, _ = await _request(port, 'POST', '/jobs', {'algorithm': 'maxrects'})
+        assert status == 400
+    _run(test)
+
+
+def test_cancel_queued_job(monkeypatch):
+    async def test(service, port):
+        first = service.submit({'sleep': 0.5, 'figures': []})
+        second = service.submit({'sleep': 0.5, 'figures': []})
+        await asyncio.sleep(0.1)
+        status, data = await _request(port, 'DELETE', f'/jobs/{second.id}')
+        assert status == 200 and data['status'] == 'cancelled'
+        status, _ = await _request(port, 'DELETE', f'/jobs/{second.id}')
+        assert status == 409
+        await service.wait(first)
+        assert first.status == 'done'
+        await service.queue.join()
+        assert second.result is None
+    monkeypatch.setattr(pack_service, 'run_job', _sleep_job)
+    _run(test)
+
+
+def test_cancelled_running_job_keeps_worker_busy(monkeypatch):
+    async def test(service, port):
+        running = service.submit({'sleep': 0.6, 'figures': []})
+        await asyncio.sleep(0.1)
+        assert running.status == 'running'
+        status, data = await _request(port, 'DELETE', f'/jobs/{running.id}')
+        assert status == 202 and data['status'] == 'cancelling'
+        following = service.submit({'sleep': 0.0, 'figures': []})
+        await asyncio.sleep(0.2)
+        # Процесс пула ещё считает отменённое задание — следующее ждёт
+        assert running.status == 'cancelling' and following.status == 'queued'
+        await service.wait(running)
+        assert running.status == 'cancelled' and running.result is None
+        await service.wait(following)
+        assert following.status == 'done'
+    monkeypatch.setattr(pack_service, 'run_job', _sleep_job)
+    _run(test)
+
+
+def test_full_queue_is_rejected(monkeypatch):
+    async def test(service, port):
+        service.submit({'sleep': 0.3, 'figures': []})
+        await asyncio.sleep(0.1)
+        service.submit({'sleep': 0.0, 'figures': []})
+        status, data = await _request(port, 'POST', '/jobs', SPEC)
+        assert status == 429 and data['queued'] == 1
+    monkeypatch.setattr(pack_service, 'run_job', _sleep_job)
+    _run(test, queue_size=1)
+
+
+def test_stream_reports_finished_jobs():
+    async def test(service, port):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(b"GET /stream HTTP/1.1\r\n\r\n")
+        await writer.drain()
+        assert (await reader.readline()).startswith(b'HTTP/1.1 200')
+        while await reader.readline() != b'\r\n':
+            pass
+        job = service.submit(SPEC)
+        line = json.loads(await reader.readline())
+        writer.close()
+        assert line['id'] == job.id and line['status'] == 'done'
+        assert len(line['result']['placed']) == 2
+    _run(test)
+
+
+def test_finished_jobs_are_trimmed_on_completion():
+    async def test(service, port):
+        jobs = [service.submit(SPEC) for _ in range(4)]
+        for job in jobs:
+            await service.wait(job)
+        # Новых заданий не было: лишние завершённые удалены по мере завершения
+        assert list(service.jobs) == [jobs[-1].id]
+
+    async def main():
+        service = PackService(1, 8, keep=1)
+        await service.start()
+        try:
+            await asyncio.wait_for(test(service, None), 30)
+        finally:
+            await service.stop()
+    asyncio.run(main())
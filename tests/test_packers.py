@@ -0,0 +1,107 @@
+import os
+import numpy as np
+import pytest
+from benchmark import generate_figures, sheet_for
+from packers import PACKERS
+from utils import read_input
+from maximal_rectangles_packer import maximal_rectangles_packer
+from raster_packer import shape_masks
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _assert_valid(placed, sheet_w, sheet_h, padding):
+    """
+    Все детали на листе с полем padding и не ближе padding друг к другу,
+    вершины многоугольников занимают ровно габарит (повёрнуты вместе с ним).
+    """
+    for f in placed:
+        if f.type in ('triangle', 'polygon'):
+            xs, ys = zip(*f.vertices)
+            assert (min(xs), min(ys), max(xs), max(ys)) == (0, 0, f.width, f.height), f.id
+        assert f.x >= padding and f.y >= padding, f.id
+        assert f.x + f.width + padding <= sheet_w and f.y + f.height + padding <= sheet_h, f.id
+    boxes = sorted((f.x, f.y, f.x + f.width, f.y + f.height, f.id) for f in placed)
+    for i, (x0, y0, x1, y1, fid) in enumerate(boxes):
+        for ox0, oy0, ox1, oy1, oid in boxes[i + 1:]:
+            if ox0 >= x1 + padding:
+                break
+            assert not (oy0 < y1 + padding and y0 < oy1 + padding), (fid, oid)
+
+
+def _assert_valid_shapes(placed, sheet_w, sheet_h, padding):
+    """
+    Проверка растровой раскладки по маскам с клеткой 1: фигура, расширенная
+    на padding, лежит на листе и не задевает ни одной другой фигуры.
+    """
+    cover = np.zeros((sheet_h, sheet_w), dtype=np.int32)
+    masks = []
+    for f in placed:
+        vertices = tuple(f.vertices) if f.type in ('triangle', 'polygon') else None
+        radius = f.radius if f.type == 'circle' else 0
+        core, padded = shape_masks(f.type, f.width, f.height, radius, vertices, 1, padding)
+        assert f.x >= padding and f.y >= padding, f.id
+        assert f.x - padding + padded.shape[1] <= sheet_w, f.id
+        assert f.y - padding + padded.shape[0] <= sheet_h, f.id
+        cover[f.y:f.y + core.shape[0], f.x:f.x + core.shape[1]] += core
+        masks.append((f, core, padded))
+    for f, core, padded in masks:
+        region = cover[f.y - padding:f.y - padding + padded.shape[0],
+                       f.x - padding:f.x - padding + padded.shape[1]]
+        assert int(region[padded].sum()) == int(core.sum()), f.id
+
+
+@pytest.mark.parametrize('algorithm', list(PACKERS))
+@pytest.mark.parametrize('kind', ['rectangle', 'mixed'])
+@pytest.mark.parametrize('padding', [0, 2])
+@pytest.mark.parametrize('seed', range(3))
+def test_layout_is_valid(algorithm, kind, padding, seed):
+    figures = generate_figures(kind, 120, seed, min_size=5, max_size=40)
+    # Тесный лист: часть фигур не помещается
+    sheet_w, sheet_h = sheet_for(figures, padding, slack=0.9)
+    placed, not_placed = PACKERS[algorithm](sheet_w, sheet_h, padding, figures)
+    assert sorted(f.id for f in placed + not_placed) == sorted(f.id for f in figures)
+    assert placed
+    if algorithm == 'raster':
+        # Растровый движок стыкует фигуры по контуру: габариты могут пересекаться
+        _assert_valid_shapes(placed, sheet_w, sheet_h, padding)
+    else:
+        _assert_valid(placed, sheet_w, sheet_h, padding)
+
+
+# Сколько фигур размещала исходная реализация MaxRects (первый подходящий)
+BASELINE_PLACED = {'input1.txt': 23, 'input2.txt': 8, 'input3.txt': 12, 'input4.txt': 12}
+
+
+@pytest.mark.parametrize('name', sorted(BASELINE_PLACED))
+def test_maxrects_default_keeps_baseline_results(name):
+    sheet_w, sheet_h, padding, figures = read_input(os.path.join(ROOT, name))
+    placed, not_placed = maximal_rectangles_packer(sheet_w, sheet_h, padding, figures)
+    assert len(placed) == BASELINE_PLACED[name]
+    _assert_valid(placed, sheet_w, sheet_h, padding)
+
+
+# Раскладки исходной реализации MaxRects: (id, x, y, rotated)
+BASELINE_LAYOUTS = {
+    'input3.txt': [(2, 5, 5, False), (1, 115, 5, False), (4, 215, 5, False), (8, 215, 85, False),
+                   (12, 215, 165, False), (16, 115, 105, False), (6, 115, 185, False),
+                   (10, 5, 115, False), (14, 5, 185, False), (3, 215, 245, False),
+                   (5, 115, 255, False), (9, 5, 255, False)],
+    'input4.txt': [(4, 3, 3, False), (5, 67, 3, False), (8, 131, 3, False), (9, 67, 79, False),
+                   (12, 193, 3, False), (1, 193, 79, True), (2, 193, 144, False),
+                   (6, 131, 79, False), (10, 131, 125, False), (3, 67, 155, False),
+                   (7, 3, 79, False), (11, 3, 120, False)],
+}
+
+
+@pytest.mark.parametrize('name', sorted(BASELINE_LAYOUTS))
+def test_maxrects_default_matches_baseline_layout(name):
+    sheet_w, sheet_h, padding, figures = read_input(os.path.join(ROOT, name))
+    placed, _ = maximal_rectangles_packer(sheet_w, sheet_h, padding, figures)
+    assert [(f.id, f.x, f.y, f.rotated) for f in placed] == BASELINE_LAYOUTS[name]
+
+
+def test_maxrects_places_every_figure_of_input4():
+    sheet_w, sheet_h, padding, figures = read_input(os.path.join(ROOT, 'input4.txt'))
+    placed, not_placed = maximal_rectangles_packer(sheet_w, sheet_h, padding, figures)
+    assert not not_placed
@@ -0,0 +1,34 @@
+import time
+from benchmark import generate_figures, sheet_for
+from portfolio import race, solve
+
+FAST = [('shelf', 'shelf', {}), ('maxrects', 'maxrects', {})]
+
+
+def test_results_read_after_deadline_are_done():
+    # Вызывающий код задерживается на первом улучшении дольше дедлайна:
+    # остальные движки уже досчитали, их результаты лежат в каналах
+    figures = generate_figures('rectangle', 30, seed=0)
+    sheet_w, sheet_h = sheet_for(figures, 2)
+    results = race(sheet_w, sheet_h, 2, figures, deadline=1.0, engines=FAST)
+    first = next(results)
+    assert not first['final']
+    time.sleep(1.2)
+    final = list(results)[-1]
+    assert final['final']
+    assert final['status'] == {'shelf': 'done', 'maxrects': 'done'}
+    assert set(final['timings']) == {'shelf', 'maxrects'}
+
+
+def test_failed_and_cancelled_engines():
+    figures = generate_figures('rectangle', 400, seed=0)
+    sheet_w, sheet_h = sheet_for(figures, 2)
+    engines = FAST + [('broken', 'greedy', {'backend': 'nope'}),
+                      ('slow', 'greedy', {'backend': 'scan'})]
+    placed, not_placed, report = solve(sheet_w, sheet_h, 2, figures, deadline=1.5, engines=engines)
+    status = report['status']
+    assert status['shelf'] == status['maxrects'] == 'done'
+    assert status['broken'].startswith('failed: ValueError')
+    assert status['slow'] == 'cancelled'
+    assert report['engine'] in ('shelf', 'maxrects')
+    assert len(placed) + len(not_placed) == len(figures)
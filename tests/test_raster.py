@@ -0,0 +1,68 @@
+import pytest
+from benchmark import generate_figures, sheet_for
+from figure_set import FigureSet
+from layout_io import angle_of
+from multi_sheet import multi_sheet_pack
+from packers import PACKERS
+from raster_packer import raster_pack
+from result_cache import ResultCache
+from utils import rotate_vertices
+from test_packers import _assert_valid_shapes
+
+
+def _triangles():
+    figures = generate_figures('triangle', 40, seed=2, min_size=8, max_size=30)
+    return figures, sheet_for(figures, 2)
+
+
+def test_raster_is_registered():
+    assert PACKERS['raster'] is raster_pack
+
+
+def test_angle_is_stored_in_figure_set_column():
+    figures, (sheet_w, sheet_h) = _triangles()
+    figure_set = FigureSet.from_figures(figures)
+    placed, _ = raster_pack(sheet_w, sheet_h, 2, list(figure_set), rotations=(270,))
+    assert placed
+    _assert_valid_shapes(placed, sheet_w, sheet_h, 2)
+    rows = [f.index for f in placed]
+    assert figure_set.angle[rows].tolist() == [270] * len(rows)
+    assert figure_set.rotated[rows].all()
+    for f in placed:
+        assert f.vertices == rotate_vertices(figures[f.index].vertices, 3)
+    # Угол переживает копирование набора
+    assert figure_set.take(rows).angle.tolist() == [270] * len(rows)
+    assert [f.angle for f in figure_set.to_figures() if f.x is not None] == [270] * len(rows)
+
+
+def test_angle_does_not_go_stale_after_repacking():
+    figures, (sheet_w, sheet_h) = _triangles()
+    placed, _ = raster_pack(sheet_w, sheet_h, 2, figures, rotations=(180,))
+    assert {angle_of(f) for f in placed} == {180}
+    placed, _ = PACKERS['maxrects'](sheet_w, sheet_h, 2, figures)
+    assert all(angle_of(f) == (90 if f.rotated else 0) for f in placed)
+
+
+@pytest.mark.parametrize('workers', [None, 2])
+def test_multi_sheet_keeps_raster_angles(workers):
+    figures, (sheet_w, sheet_h) = _triangles()
+    original = {f.id: f.vertices for f in figures}
+    sheets, not_placed = multi_sheet_pack((sheet_w // 2, sheet_h // 2), 2, figures, 'raster',
+                                          workers=workers, rotations=(90, 270))
+    assert not not_placed
+    for w, h, placed in sheets:
+        _assert_valid_shapes(placed, w, h, 2)
+        for f in placed:
+            assert f.angle in (90, 270)
+            assert f.vertices == rotate_vertices(original[f.id], f.angle // 90)
+
+
+def test_result_cache_restores_raster_angles():
+    cache = ResultCache(directory=None)
+    figures, (sheet_w, sheet_h) = _triangles()
+    placed, _ = cache.pack('raster', sheet_w, sheet_h, 2, figures, rotations=(180,))
+    fresh, _ = _triangles()
+    restored, _ = cache.pack('raster', sheet_w, sheet_h, 2, fresh, rotations=(180,))
+    assert cache.hits == 1
+    assert [(f.x, f.y, f.angle, f.vertices) for f in restored] == \
+           [(f.x, f.y, f.angle, f.vertices) for f in placed]
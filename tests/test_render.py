@@ -0,0 +1,92 @@
+import struct
+import zlib
+import xml.etree.ElementTree as ET
+import numpy as np
+import pytest
+from render import COLORS, MAX_PIXELS, rasterize, render, render_batch
+from utils import Figure
+
+SVG = '{http://www.w3.org/2000/svg}'
+
+
+def _figures():
+    a = Figure(1, 'rectangle', 40, 20)
+    a.x, a.y = 10, 10
+    b = Figure(2, 'circle', 10)
+    b.x, b.y = 60, 10
+    c = Figure(3, 'triangle', vertices=[(0, 0), (30, 0), (0, 30)])
+    c.x, c.y = 10, 40
+    d = Figure(4, 'polygon', vertices=[(0, 0), (20, 0), (20, 10), (0, 10)])
+    return [a, b, c, d]  # d не размещена и не рисуется
+
+
+def _read_png(path):
+    """Разбор PNG, который пишет write_png: заголовок, проверка CRC, пиксели."""
+    data = open(path, 'rb').read()
+    assert data[:8] == b'\x89PNG\r\n\x1a\n'
+    chunks, pos = {}, 8
+    while pos < len(data):
+        length, = struct.unpack('>I', data[pos:pos + 4])
+        tag, body = data[pos + 4:pos + 8], data[pos + 8:pos + 8 + length]
+        crc, = struct.unpack('>I', data[pos + 8 + length:pos + 12 + length])
+        assert crc == zlib.crc32(tag + body) & 0xffffffff, tag
+        chunks[tag] = body
+        pos += 12 + length
+    assert set(chunks) == {b'IHDR', b'IDAT', b'IEND'}
+    width, height, depth, color, _, _, _ = struct.unpack('>IIBBBBB', chunks[b'IHDR'])
+    assert (depth, color) == (8, 2)
+    raw = np.frombuffer(zlib.decompress(chunks[b'IDAT']), dtype=np.uint8)
+    rows = raw.reshape(height, width * 3 + 1)
+    assert not rows[:, 0].any()  # фильтр None в каждой строке
+    return rows[:, 1:].reshape(height, width, 3)
+
+
+def test_png_matches_raster(tmp_path):
+    figures = _figures()
+    path = str(tmp_path / 'layout.png')
+    assert render(100, 80, figures, 2, path) == path
+    image = _read_png(path)
+    assert image.shape == (120, 150, 3)
+    assert np.array_equal(image, rasterize(100, 80, figures))
+    # Внутренние точки фигур залиты цветом типа, граница листа красная
+    assert tuple(image[20, 20]) == COLORS['rectangle']
+    assert tuple(image[int(20 * 1.5), int(75 * 1.5)]) == COLORS['circle']
+    assert tuple(image[int(45 * 1.5), int(15 * 1.5)]) == COLORS['triangle']
+    assert tuple(image[0, 0]) == (255, 0, 0)
+    assert not (image == COLORS['polygon']).all(axis=2).any()
+
+
+def test_png_size_is_capped():
+    image = rasterize(20000, 100, [])
+    assert image.shape[1] == MAX_PIXELS
+    assert image.shape[0] == round(100 * MAX_PIXELS / 20000)
+
+
+def test_svg_contains_placed_figures(tmp_path):
+    path = str(tmp_path / 'layout.svg')
+    render(100, 80, _figures(), 2, path)
+    root = ET.parse(path).getroot()
+    assert root.get('viewBox') == '-2 -2 104 84'
+    rects = root.findall(SVG + 'rect')
+    assert [(r.get('x'), r.get('y'), r.get('width'), r.get('height')) for r in rects] == \
+           [('10', '10', '40', '20'), ('0', '0', '100', '80')]
+    circle, = root.findall(SVG + 'circle')
+    assert (circle.get('cx'), circle.get('cy'), circle.get('r')) == ('70', '20', '10')
+    polygon, = root.findall(SVG + 'polygon')
+    assert polygon.get('points') == '10,40 40,40 10,70'
+    assert [t.text for t in root.findall(SVG + 'text')] == ['1', '2', '3']
+
+
+@pytest.mark.parametrize('ext', ['.png', '.svg'])
+def test_batch_matches_direct_render(tmp_path, ext):
+    jobs = []
+    for k in range(3):
+        figures = _figures()
+        figures[0].x += k
+        jobs.append((100, 80, figures, 2, str(tmp_path / f'batch{k}{ext}')))
+    paths = render_batch(jobs, workers=2)
+    assert paths == [job[-1] for job in jobs]
+    for k, (w, h, figures, padding, path) in enumerate(jobs):
+        direct = render(w, h, figures, padding, str(tmp_path / f'direct{k}{ext}'))
+        assert open(path, 'rb').read() == open(direct, 'rb').read()
+    assert render_batch([]) == []
@@ -0,0 +1,83 @@
+import os
+import numpy as np
+from benchmark import generate_figures, sheet_for
+from result_cache import ResultCache, job_key, _shape
+from test_packers import _assert_valid
+
+
+def _job(seed, count=30):
+    figures = generate_figures('mixed', count, seed, min_size=5, max_size=25)
+    sheet_w, sheet_h = sheet_for(figures, 2, slack=0.8)
+    return sheet_w, sheet_h, figures
+
+
+def _cells(placed):
+    return sorted((_shape(f), f.x, f.y, f.rotated) for f in placed)
+
+
+def test_hit_with_permuted_and_renamed_figures():
+    cache = ResultCache(directory=None)
+    sheet_w, sheet_h, figures = _job(0)
+    placed, not_placed = cache.pack('maxrects', sheet_w, sheet_h, 2, figures)
+    assert not_placed, "лист должен быть заполнен не полностью"
+
+    _, _, fresh = _job(0)
+    rng = np.random.default_rng(1)
+    fresh = [fresh[i] for i in rng.permutation(len(fresh))]
+    for f in fresh:
+        f.id += 1000
+    restored, restored_not_placed = cache.pack('maxrects', sheet_w, sheet_h, 2, fresh)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Позиции переносятся на фигуры вызывающего той же геометрии
+    assert all(f.id > 1000 for f in restored + restored_not_placed)
+    assert {f.id for f in restored} | {f.id for f in restored_not_placed} == {f.id for f in fresh}
+    assert _cells(restored) == _cells(placed)
+    assert sorted(_shape(f) for f in restored_not_placed) == \
+           sorted(_shape(f) for f in not_placed)
+    _assert_valid(restored, sheet_w, sheet_h, 2)
+
+
+def test_memory_lru_evicts_least_recently_used():
+    cache = ResultCache(directory=None, max_entries=2)
+    jobs = [_job(seed, 10) for seed in range(3)]
+    for sheet_w, sheet_h, figures in jobs[:2]:
+        cache.pack('shelf', sheet_w, sheet_h, 2, figures)
+    assert cache.get('shelf', *jobs[0][:2], 2, jobs[0][2]) is not None
+    cache.pack('shelf', *jobs[2][:2], 2, jobs[2][2])
+
+    assert len(cache.memory) == 2
+    assert cache.get('shelf', *jobs[1][:2], 2, jobs[1][2]) is None
+    assert cache.get('shelf', *jobs[0][:2], 2, jobs[0][2]) is not None
+    assert cache.get('shelf', *jobs[2][:2], 2, jobs[2][2]) is not None
+
+
+def test_disk_eviction_removes_least_recently_used_files(tmp_path):
+    jobs = [_job(seed, 10) for seed in range(4)]
+    keys = [job_key('shelf', {}, sheet_w, sheet_h, 2, figures)[0]
+            for sheet_w, sheet_h, figures in jobs]
+
+    # Размеры файлов заданий — по отдельному кэшу
+    probe = ResultCache(directory=str(tmp_path / 'probe'))
+    for sheet_w, sheet_h, figures in jobs:
+        probe.pack('shelf', sheet_w, sheet_h, 2, figures)
+    sizes = [os.path.getsize(probe._path(key)) for key in keys]
+
+    directory = str(tmp_path / 'cache')
+    cache = ResultCache(directory=directory)
+    for sheet_w, sheet_h, figures in jobs[:3]:
+        cache.pack('shelf', sheet_w, sheet_h, 2, figures)
+    for stamp, key in zip((1000, 2000, 3000), keys):
+        os.utime(cache._path(key), (stamp, stamp))
+
+    # Новый экземпляр: память пуста, чтение с диска обновляет mtime
+    cache = ResultCache(directory=directory, max_bytes=sum(sizes) - 1)
+    assert cache.get('shelf', *jobs[0][:2], 2, jobs[0][2]) is not None
+    cache.pack('shelf', *jobs[3][:2], 2, jobs[3][2])
+
+    remaining = {name[:-len('.json')] for name in os.listdir(directory)}
+    assert remaining == {keys[0], keys[2], keys[3]}
+    assert cache._disk_bytes == sizes[0] + sizes[2] + sizes[3] <= cache.max_bytes
+    fresh = ResultCache(directory=directory)
+    assert fresh.get('shelf', *jobs[1][:2], 2, jobs[1][2]) is None
+    assert fresh.get('shelf', *jobs[0][:2], 2, jobs[0][2]) is not None
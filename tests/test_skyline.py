@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from benchmark import generate_figures, sheet_for
+import skyline_packer
+from skyline_packer import Skyline, skyline_pack
+
+
+def _naive(skyline, sizes):
+    """Перебор всех кандидатов по явному профилю высот (эталон для Skyline)."""
+    cells = skyline.cells.tolist()
+    p, w = skyline.padding, skyline.sheet_w
+    starts = [x for x in range(p, w) if x == p or cells[x] != cells[x - 1]]
+    ends = starts[1:] + [w]
+    rows = []
+    for bw, bh, rotated in sizes:
+        for x in sorted(set(starts) | {e - bw for e in ends}):
+            if x < p or x + bw > w:
+                continue
+            y = max(cells[x:x + bw])
+            if y + bh <= skyline.sheet_h:
+                rows.append((x, y, bh, bw * y - sum(cells[x:x + bw]), rotated))
+    return rows
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_incremental_queries_match_naive(seed):
+    rng = np.random.default_rng(seed)
+    skyline = Skyline(97, 400, 2)
+    for _ in range(60):
+        sizes = [(int(rng.integers(1, 40)), int(rng.integers(1, 30)), False)]
+        found = skyline.candidates(sizes)
+        expected = _naive(skyline, sizes)
+        got = [] if found is None else [tuple(int(v) for v in row) for row in zip(*found)]
+        assert got == expected
+        if not expected:
+            continue
+        x, y, bh, _, _ = expected[int(rng.integers(len(expected)))]
+        skyline.raise_to(x, sizes[0][0], y + bh)
+
+
+class _NaiveSkyline(Skyline):
+    def candidates(self, sizes):
+        rows = _naive(self, sizes)
+        return [np.array(column) for column in zip(*rows)] if rows else None
+
+
+@pytest.mark.parametrize('heuristic', ['bottom_left', 'min_waste'])
+def test_layouts_match_naive_scan(heuristic, monkeypatch):
+    def layout():
+        figures = generate_figures('mixed', 150, 1, min_size=5, max_size=40)
+        sheet_w, sheet_h = sheet_for(figures, 2, slack=0.9)
+        placed, not_placed = skyline_pack(sheet_w, sheet_h, 2, figures, heuristic=heuristic)
+        return [(f.id, f.x, f.y, f.rotated) for f in placed], [f.id for f in not_placed]
+
+    fast = layout()
+    monkeypatch.setattr(skyline_packer, 'Skyline', _NaiveSkyline)
+    assert layout() == fast
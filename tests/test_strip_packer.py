@@ -0,0 +1,40 @@
+import os
+import pytest
+from benchmark import generate_figures
+from figure_set import FigureSet
+from strip_packer import height_bounds, strip_pack
+from utils import read_input
+from test_packers import ROOT, _assert_valid
+
+INPUTS = ['input1.txt', 'input2.txt', 'input3.txt', 'input4.txt']
+
+
+def _check(sheet_w, padding, figures, sheet_h, placed, report):
+    assert report['lower'] == height_bounds(sheet_w, padding, FigureSet.from_figures(figures))
+    assert report['lower'] <= sheet_h <= report['upper']
+    assert sorted(f.id for f in placed) == sorted(f.id for f in figures)
+    _assert_valid(placed, sheet_w, sheet_h, padding)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+@pytest.mark.parametrize('algorithm', ['greedy', 'maxrects'])
+@pytest.mark.parametrize('name', INPUTS)
+def test_sample_inputs_are_valid_and_within_bounds(name, algorithm, workers):
+    sheet_w, _, padding, figures = read_input(os.path.join(ROOT, name))
+    sheet_h, placed, report = strip_pack(sheet_w, padding, figures, algorithm, workers=workers)
+    _check(sheet_w, padding, figures, sheet_h, placed, report)
+    assert report['engine'] in (algorithm, 'shelf')
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_generated_figures_are_valid_and_within_bounds(workers):
+    figures = generate_figures('mixed', 60, seed=4, min_size=5, max_size=40)
+    sheet_h, placed, report = strip_pack(150, 2, figures, workers=workers)
+    _check(150, 2, figures, sheet_h, placed, report)
+    assert report['trials'] > 0
+
+
+def test_too_wide_figure_is_rejected():
+    figures = generate_figures('circle', 5, seed=0, min_size=40, max_size=60)
+    with pytest.raises(ValueError):
+        strip_pack(30, 2, figures, workers=1)
@@ -1,5 +1,6 @@
 # utils.py
-from typing import List, Tuple, Optional
+from typing import Iterator, List, Tuple, Optional
+import profiling
 
 class Figure:
     """
@@ -53,49 +54,158 @@ class Figure:
         # Позиция после упаковки (заполняется алгоритмом)
         self.x = None
         self.y = None
-        self.rotated = False
-
-
-def read_input(file_path: str) -> Tuple[int, int, int, List[Figure]]:
+        self.angle = 0
+
+    @property
+    def rotated(self) -> bool:
+        """
+        Повёрнута ли фигура. Хранится угол поворота angle в градусах:
+        запись флага задаёт 90° или 0°, поэтому угол растрового движка
+        не переживает упаковку другим алгоритмом.
+        """
+        return self.angle != 0
+
+    @rotated.setter
+    def rotated(self, value: bool) -> None:
+        self.angle = 90 if value else 0
+
+
+def rotate_vertices(vertices: List[Tuple[int, int]], quarter_turns: int) -> List[Tuple[int, int]]:
+    """Поворот вершин на quarter_turns × 90° с нормализацией к (0, 0)."""
+    for _ in range(quarter_turns % 4):
+        height = max(y for _, y in vertices)
+        vertices = [(height - y, x) for x, y in vertices]
+    min_x = min(x for x, _ in vertices)
+    min_y = min(y for _, y in vertices)
+    return [(x - min_x, y - min_y) for x, y in vertices]
+
+
+def apply_placement(f, x: int, y: int, width: int, height: int, rotated: bool,
+                    angle: Optional[int] = None) -> None:
     """
-    Считывает данные из входного файла.
-    Возвращает: ширину листа, высоту листа, отступ, список фигур.
+    Записывает в фигуру результат упаковки, полученный столбцами
+    (из другого процесса, кэша или копии набора). Если у треугольника
+    или многоугольника стороны габарита поменялись местами, вершины
+    поворачиваются на 90° вместе с ним.
+    angle — угол поворота в градусах (растровый движок): вершины тогда
+    поворачиваются на разницу с текущим углом фигуры.
+    """
+    if f.type in ('triangle', 'polygon'):
+        turns = (int(angle) - f.angle) // 90 if angle is not None else int(width != f.width)
+        if turns % 4:
+            f.vertices = rotate_vertices(f.vertices, turns)
+    f.x, f.y = int(x), int(y)
+    f.width, f.height = int(width), int(height)
+    f.rotated = bool(rotated)
+    if angle is not None:
+        f.angle = int(angle)
+
+
+def parse_figure(line: str) -> Figure:
+    """Разбирает одну строку с описанием фигуры."""
+    parts = line.split()
+    fig_id = int(parts[0])
+    fig_type = parts[1].lower()
+
+    if fig_type == 'rectangle':
+        w = int(parts[2])
+        h = int(parts[3])
+        return Figure(fig_id, fig_type, w, h)
+
+    elif fig_type == 'circle':
+        r = int(parts[2])
+        return Figure(fig_id, fig_type, r)
+
+    elif fig_type in ('triangle', 'polygon'):
+        coords = list(map(int, parts[2:]))
+        if len(coords) < 6 or len(coords) % 2 != 0:
+            raise ValueError(f"Invalid number of coordinates for {fig_type} ID {fig_id}")
+        vertices = [(coords[i], coords[i+1]) for i in range(0, len(coords), 2)]
+        return Figure(fig_id, fig_type, vertices=vertices)
+
+    else:
+        raise ValueError(f"Unsupported figure type: {fig_type}")
+
+
+class InputLines:
     """
-    figures = []
-    with open(file_path, 'r') as f:
-        lines = [line.strip() for line in f if line.strip()]
-
-    # Чтение параметров листа
-    sheet_w = int(lines[0].split(":")[1])
-    sheet_h = int(lines[1].split(":")[1])
-    padding = int(lines[2].split(":")[1])
-
-    # Пропускаем 4-ю строку с заголовком
-    for line in lines[4:]:
-        parts = line.split()
-        fig_id = int(parts[0])
-        fig_type = parts[1].lower()
-
-        if fig_type == 'rectangle':
-            w = int(parts[2])
-            h = int(parts[3])
-            figures.append(Figure(fig_id, fig_type, w, h))
-
-        elif fig_type == 'circle':
-            r = int(parts[2])
-            figures.append(Figure(fig_id, fig_type, r))
-
-        elif fig_type in ('triangle', 'polygon'):
-            coords = list(map(int, parts[2:]))
-            if len(coords) < 6 or len(coords) % 2 != 0:
-                raise ValueError(f"Invalid number of coordinates for {fig_type} ID {fig_id}")
-            vertices = [(coords[i], coords[i+1]) for i in range(0, len(coords), 2)]
-            figures.append(Figure(fig_id, fig_type, vertices=vertices))
+    Итератор по непустым строкам фигур открытого входного файла.
+    Файл закрывается, когда строки закончились, при close() или при
+    выходе из блока with — в том числе если перебор не начинался.
+    """
+    def __init__(self, f, lines: Iterator[str]):
+        self._file = f
+        self._lines = lines
 
-        else:
-            raise ValueError(f"Unsupported figure type: {fig_type}")
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if self._file.closed:
+            raise StopIteration
+        try:
+            return next(self._lines)
+        except StopIteration:
+            self._file.close()
+            raise
 
-    return sheet_w, sheet_h, padding, figures
+    def close(self):
+        self._file.close()
 
+    def __enter__(self):
+        return self
 
+    def __exit__(self, *exc):
+        self.close()
 
+
+def open_input(file_path: str) -> Tuple[int, int, int, InputLines]:
+    """
+    Открывает входной файл и читает только заголовок.
+    Возвращает: ширину листа, высоту листа, отступ и итератор InputLines
+    по непустым строкам с фигурами. Вызывающий код должен исчерпать
+    итератор или закрыть его (close() или with), иначе файл остаётся
+    открытым до сборки мусора. При ошибке в заголовке файл закрывается
+    сразу и бросается ValueError.
+    """
+    f = open(file_path, 'r')
+    lines = (line.strip() for line in f)
+    lines = (line for line in lines if line)
+    try:
+        header = [next(lines) for _ in range(4)]
+        # Чтение параметров листа
+        sheet_w = int(header[0].split(":")[1])
+        sheet_h = int(header[1].split(":")[1])
+        padding = int(header[2].split(":")[1])
+    except StopIteration:
+        f.close()
+        raise ValueError(f"Incomplete header in {file_path}")
+    except (ValueError, IndexError):
+        f.close()
+        raise ValueError(f"Malformed header in {file_path}")
+
+    # 4-я строка с заголовком пропускается
+    return sheet_w, sheet_h, padding, InputLines(f, lines)
+
+
+def iter_input(file_path: str) -> Tuple[int, int, int, Iterator[Figure]]:
+    """
+    Потоковое чтение входного файла: фигуры разбираются по одной
+    по мере перебора, файл целиком в память не загружается.
+    Возвращает: ширину листа, высоту листа, отступ, итератор фигур.
+    Файл закрывается, когда итератор исчерпан (см. open_input).
+    """
+    sheet_w, sheet_h, padding, lines = open_input(file_path)
+    return sheet_w, sheet_h, padding, map(parse_figure, lines)
+
+
+def read_input(file_path: str) -> Tuple[int, int, int, List[Figure]]:
+    """
+    Считывает данные из входного файла.
+    Возвращает: ширину листа, высоту листа, отступ, список фигур.
+    """
+    with profiling.phase('parse'):
+        sheet_w, sheet_h, padding, lines = open_input(file_path)
+        # with: файл закрывается и при ошибке в строке фигуры
+        with lines:
+            return sheet_w, sheet_h, padding, [parse_figure(line) for line in lines]
@@ -1,7 +1,21 @@
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
+from render import render
+import profiling
+
+def visualize(sheet_w, sheet_h, figures, padding, output_file='layout.png', interactive=False):
+    """
+    Сохраняет раскладку в файл: .svg — векторно, иначе PNG через растр NumPy.
+    matplotlib импортируется только при явном запросе interactive=True:
+    тогда картинка строится через pyplot и показывается в окне.
+    """
+    with profiling.phase('render'):
+        if not interactive:
+            return render(sheet_w, sheet_h, figures, padding, output_file)
+        return _show(sheet_w, sheet_h, figures, padding, output_file)
+
+def _show(sheet_w, sheet_h, figures, padding, output_file):
+    import matplotlib.pyplot as plt
+    import matplotlib.patches as patches
 
-def visualize(sheet_w, sheet_h, figures, padding, output_file='layout.png'):
     fig, ax = plt.subplots(figsize=(sheet_w / 100, sheet_h / 100))
     ax.set_xlim(0, sheet_w)
     ax.set_ylim(0, sheet_h)
@@ -39,4 +53,4 @@ def visualize(sheet_w, sheet_h, figures, padding, output_file='layout.png'):
     plt.tight_layout()
     plt.savefig(output_file, dpi=150)
     plt.show()
-
+    return output_file